@@ -0,0 +1,104 @@
+// Vite plugin that prints the size of every JS and CSS chunk of a production
+// build, raw and gzipped, writes them to bundle-report.json, and fails the
+// build when a chunk is over its budget. Budgets are gzipped KB keyed by chunk
+// name ('index' for the entry, the file name for lazy pages, '<name>.css' for
+// stylesheets); `initial` budgets the JS loaded before first render, i.e. the
+// entry and its static imports. BUNDLE_BUDGET=warn reports without failing.
+
+import fs from 'node:fs'
+import path from 'node:path'
+import zlib from 'node:zlib'
+
+const kb = (bytes) => `${(bytes / 1024).toFixed(1)} KB`
+
+const gzipSize = (source) => zlib.gzipSync(source, {level: zlib.constants.Z_BEST_COMPRESSION}).length
+
+const chunkName = (file) => file.type === 'chunk' ? file.name : (file.names?.[0] ?? file.name ?? path.basename(file.fileName))
+
+const initialFiles = (bundle, entry) => {
+  const seen = new Set()
+  const visit = (fileName) => {
+    if (seen.has(fileName)) {
+      return
+    }
+    seen.add(fileName)
+    bundle[fileName]?.imports?.forEach(visit)
+  }
+  visit(entry.fileName)
+  return seen
+}
+
+export default function bundleBudget({budgets = {}, initial, reportFile = 'bundle-report.json'} = {}) {
+  let root
+
+  return {
+    name: 'texmage-bundle-budget',
+    apply: 'build',
+
+    configResolved(config) {
+      root = config.root
+    },
+
+    generateBundle(options, bundle) {
+      const files = Object.values(bundle)
+        .filter((file) => file.type === 'chunk' || file.fileName.endsWith('.css'))
+        .map((file) => {
+          const source = file.type === 'chunk' ? file.code : file.source
+          return {
+            name: chunkName(file),
+            file: file.fileName,
+            entry: file.type === 'chunk' && file.isEntry,
+            dynamic: file.type === 'chunk' && file.isDynamicEntry,
+            bytes: Buffer.byteLength(source),
+            gzipBytes: gzipSize(source),
+          }
+        })
+        .sort((a, b) => b.gzipBytes - a.gzipBytes)
+
+      const entry = Object.values(bundle).find((file) => file.type === 'chunk' && file.isEntry)
+      const initialSet = entry ? initialFiles(bundle, entry) : new Set()
+      const initialGzip = files.filter((file) => initialSet.has(file.file)).reduce((sum, file) => sum + file.gzipBytes, 0)
+
+      const violations = []
+      for (const file of files) {
+        const budget = budgets[file.name]
+        file.budgetBytes = budget ? budget * 1024 : null
+        if (budget && file.gzipBytes > file.budgetBytes) {
+          violations.push(`${file.name} is ${kb(file.gzipBytes)} gzipped, budget ${kb(file.budgetBytes)}`)
+        }
+      }
+      if (initial && initialGzip > initial * 1024) {
+        violations.push(`initial JS is ${kb(initialGzip)} gzipped, budget ${kb(initial * 1024)}`)
+      }
+      const missing = Object.keys(budgets).filter((name) => !files.some((file) => file.name === name))
+
+      console.log('\nBundle sizes (gzipped):')
+      for (const file of files) {
+        const kind = file.entry ? 'entry' : file.dynamic ? 'lazy' : initialSet.has(file.file) ? 'initial' : ''
+        const budget = file.budgetBytes ? `/ ${kb(file.budgetBytes)}` : ''
+        console.log(`  ${file.name.padEnd(24)} ${kind.padEnd(8)} ${kb(file.bytes).padStart(10)}  gz ${kb(file.gzipBytes).padStart(9)} ${budget}`)
+      }
+      console.log(`  ${'initial JS'.padEnd(33)} gz ${kb(initialGzip).padStart(9)} ${initial ? `/ ${kb(initial * 1024)}` : ''}`)
+      for (const name of missing) {
+        console.warn(`  budget for '${name}' matches no chunk`)
+      }
+
+      fs.writeFileSync(path.resolve(root, reportFile), JSON.stringify({
+        generatedAt: new Date().toISOString(),
+        initialGzipBytes: initialGzip,
+        initialBudgetBytes: initial ? initial * 1024 : null,
+        chunks: files,
+        violations,
+      }, null, 2))
+
+      if (violations.length) {
+        const message = `Bundle budget exceeded:\n  ${violations.join('\n  ')}`
+        if (process.env.BUNDLE_BUDGET === 'warn') {
+          this.warn(message)
+        } else {
+          this.error(message)
+        }
+      }
+    },
+  }
+}
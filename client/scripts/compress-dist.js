@@ -0,0 +1,66 @@
+// Writes .br and .gz siblings for the compressible files in dist/ so the API
+// server can send them without compressing on every request. Runs after
+// `vite build` (see the build script in package.json). Uses only node:zlib.
+
+import fs from 'node:fs/promises'
+import path from 'node:path'
+import zlib from 'node:zlib'
+import { promisify } from 'node:util'
+import { fileURLToPath } from 'node:url'
+
+const brotli = promisify(zlib.brotliCompress)
+const gzip = promisify(zlib.gzip)
+
+const DIST_DIR = path.resolve(path.dirname(fileURLToPath(import.meta.url)), '..', 'dist')
+const COMPRESSIBLE = new Set(['.html', '.js', '.mjs', '.css', '.svg', '.json', '.txt', '.xml', '.map', '.webmanifest'])
+const MIN_BYTES = 1024
+
+const walk = async (dir) => {
+  const entries = await fs.readdir(dir, {withFileTypes: true})
+  const files = await Promise.all(entries.map((entry) => {
+    const full = path.join(dir, entry.name)
+    return entry.isDirectory() ? walk(full) : [full]
+  }))
+  return files.flat()
+}
+
+const compressFile = async (file) => {
+  const source = await fs.readFile(file)
+  const [br, gz] = await Promise.all([
+    brotli(source, {params: {
+      [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY,
+      [zlib.constants.BROTLI_PARAM_SIZE_HINT]: source.length,
+    }}),
+    gzip(source, {level: zlib.constants.Z_BEST_COMPRESSION}),
+  ])
+  // A variant that is not smaller is useless; the server falls back to the original.
+  const written = {}
+  for (const [encoding, data] of [['br', br], ['gz', gz]]) {
+    if (data.length < source.length) {
+      await fs.writeFile(`${file}.${encoding}`, data)
+      written[encoding] = data.length
+    }
+  }
+  return {file, size: source.length, ...written}
+}
+
+const main = async () => {
+  const files = (await walk(DIST_DIR)).filter((file) => COMPRESSIBLE.has(path.extname(file)))
+  const results = []
+  for (const file of files) {
+    const {size} = await fs.stat(file)
+    if (size >= MIN_BYTES) {
+      results.push(await compressFile(file))
+    }
+  }
+  for (const {file, size, br, gz} of results) {
+    const kb = (bytes) => bytes ? `${(bytes / 1024).toFixed(1)} KB` : '-'
+    console.log(`${path.relative(DIST_DIR, file).padEnd(48)} ${kb(size).padStart(10)}  br ${kb(br).padStart(10)}  gz ${kb(gz).padStart(10)}`)
+  }
+  console.log(`Precompressed ${results.length} files in ${path.relative(process.cwd(), DIST_DIR) || '.'}`)
+}
+
+main().catch((error) => {
+  console.error(error)
+  process.exit(1)
+})
@@ -0,0 +1,86 @@
+"""
+Convert the showcase images in src/assets to responsive AVIF/WebP variants.
+
+The originals stay in src/assets as masters; the app imports only the files
+written to src/assets/optimized/ (see responsiveImage() in assets.js):
+
+    <name>-<width>.avif   for every width in WIDTHS not larger than the original
+    <name>-<width>.webp
+    <name>-<width>.jpg    one fallback, at FALLBACK_WIDTH
+
+Re-run after adding or replacing a showcase image (needs Pillow with AVIF support):
+
+    python scripts/optimize_images.py
+"""
+
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / 'src' / 'assets'
+OUTPUT_DIR = ASSETS_DIR / 'optimized'
+
+SHOWCASE_IMAGES = [
+    'genedOne.jpg', 'genedTwo.png', 'genedThree.jpg',
+    'genedFour.png', 'genedFive.jpg', 'genedSix.png',
+    'sample_img_1.png', 'sample_img_2.png',
+]
+WIDTHS = [240, 480, 800]
+FALLBACK_WIDTH = 480
+
+AVIF_QUALITY = 55
+WEBP_QUALITY = 78
+JPEG_QUALITY = 80
+
+
+def resized(image, width):
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def convert(source):
+    image = Image.open(source)
+    image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+    if image.mode == 'RGBA' and image.getchannel('A').getextrema() == (255, 255):
+        image = image.convert('RGB')
+    widths = [w for w in WIDTHS if w < image.width] + [min(image.width, WIDTHS[-1])]
+    written = []
+    for width in sorted(set(widths)):
+        variant = resized(image, width) if width != image.width else image
+        stem = OUTPUT_DIR / f'{source.stem}-{width}'
+        variant.save(f'{stem}.avif', quality=AVIF_QUALITY)
+        variant.save(f'{stem}.webp', quality=WEBP_QUALITY, method=6)
+        written += [f'{stem}.avif', f'{stem}.webp']
+    fallback_width = min(FALLBACK_WIDTH, image.width)
+    fallback = resized(image, fallback_width)
+    if fallback.mode == 'RGBA':
+        # JPEG has no alpha; flatten onto the page background instead of black.
+        background = Image.new('RGB', fallback.size, 'white')
+        background.paste(fallback, mask=fallback.getchannel('A'))
+        fallback = background
+    fallback_path = OUTPUT_DIR / f'{source.stem}-{fallback_width}.jpg'
+    fallback.save(fallback_path, quality=JPEG_QUALITY, optimize=True, progressive=True)
+    written.append(str(fallback_path))
+    return written
+
+
+def main():
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    for old in OUTPUT_DIR.iterdir():
+        old.unlink()
+
+    before = after = 0
+    for name in SHOWCASE_IMAGES:
+        source = ASSETS_DIR / name
+        written = convert(source)
+        size = sum(Path(p).stat().st_size for p in written)
+        print(f"{name:20} {source.stat().st_size // 1024:6} KB -> {len(written)} files, {size // 1024} KB total")
+        before += source.stat().st_size
+        after += size
+    print(f"\nOriginals: {before // 1024} KB, all variants: {after // 1024} KB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
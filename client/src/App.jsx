@@ -1,33 +1,46 @@
-import React, { useContext } from 'react'
+import React, { lazy, Suspense, useContext } from 'react'
 import {Routes, Route} from 'react-router-dom'
 import { ToastContainer } from 'react-toastify';
+import { LazyMotion } from 'framer-motion'
 
 
 import Home from './pages/Home'
-import Result from './pages/Result'
-import BuyCredit from './pages/BuyCredit'
 import Navbar from './components/Navbar'
 import Footer from './components/Footer'
-import Login from './components/Login'
+import PageLoader from './components/PageLoader'
 import { AppContext } from './context/AppContext'
 
+// Only the home page ships in the entry chunk; the other pages and the login
+// modal are downloaded the first time they are shown.
+const Result = lazy(() => import('./pages/Result'))
+const BuyCredit = lazy(() => import('./pages/BuyCredit'))
+const Login = lazy(() => import('./components/Login'))
+
+// Animation features are fetched after first render; until then m.* components
+// render in their initial state.
+const loadMotionFeatures = () => import('./motionFeatures').then((module) => module.default)
+
 const App = () => {
 
 const {showLogin, user} = useContext(AppContext)
 
   return (
+    <LazyMotion features={loadMotionFeatures} strict>
     <div className='px-4 sm:px-10 md:px-14 lg:px-28 min-h-screen bg-gradient-to-b from-[#ffffff] via-[#f2f2f2] to-[#e6e6e6]'>
       <ToastContainer position='bottom-right'/>
       <Navbar/>
-      {showLogin && <Login/>}
-      <Routes>
-        <Route path='/' element={<Home/>}/>
-        <Route path='/result' element={<Result/>}/>
-        <Route path='/pricing' element={<BuyCredit/>}/>  
-      </Routes>
+      {showLogin && <Suspense fallback={null}><Login/></Suspense>}
+      <Suspense fallback={<PageLoader/>}>
+        <Routes>
+          <Route path='/' element={<Home/>}/>
+          <Route path='/result' element={<Result/>}/>
+          <Route path='/pricing' element={<BuyCredit/>}/>
+        </Routes>
+      </Suspense>
       <Footer/>
   </div>
+    </LazyMotion>
   )
 }
 
-export default App
\ No newline at end of file
+export default App
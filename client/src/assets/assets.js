@@ -6,8 +6,6 @@ import instagram_icon from './instagram_icon.svg'
 import twitter_icon from './twitter_icon.svg'
 import star_icon from './star_icon.svg'
 import rating_star from './rating_star.svg'
-import sample_img_1 from './sample_img_1.png'
-import sample_img_2 from './sample_img_2.png'
 import profile_img_1 from './profile_img_1.png'
 import profile_img_2 from './profile_img_2.png'
 import step_icon_1 from './step_icon_1.svg'
@@ -20,12 +18,35 @@ import star_group from './star_group.png'
 import credit_star from './credit_star.svg'
 import profile_icon from './profile_icon.png'
 import heroBg from './heroBg.jpg'
-import genedOne from './genedOne.jpg'
-import genedTwo from './genedTwo.png'
-import genedThree from './genedThree.jpg'
-import genedFour from './genedFour.png'
-import genedFive from './genedFive.jpg'
-import genedSix from './genedSix.png'
+
+// AVIF/WebP variants of the showcase images, written by scripts/optimize_images.py.
+// responsiveImage(name) returns the srcsets for a <picture> plus a JPEG fallback.
+const optimized = import.meta.glob('./optimized/*', {eager: true, query: '?url', import: 'default'})
+
+const responsiveImage = (name) => {
+    const variants = Object.entries(optimized)
+        .map(([path, url]) => {
+            const [, stem, width, format] = path.match(/([^/]+)-(\d+)\.(\w+)$/)
+            return {stem, width: Number(width), format, url}
+        })
+        .filter((variant) => variant.stem === name)
+        .sort((a, b) => a.width - b.width)
+    const srcSet = (format) => variants
+        .filter((variant) => variant.format === format)
+        .map((variant) => `${variant.url} ${variant.width}w`)
+        .join(', ')
+    const fallback = variants.find((variant) => variant.format === 'jpg')
+    return {avif: srcSet('avif'), webp: srcSet('webp'), src: fallback.url, width: fallback.width}
+}
+
+const genedOne = responsiveImage('genedOne')
+const genedTwo = responsiveImage('genedTwo')
+const genedThree = responsiveImage('genedThree')
+const genedFour = responsiveImage('genedFour')
+const genedFive = responsiveImage('genedFive')
+const genedSix = responsiveImage('genedSix')
+const sample_img_1 = responsiveImage('sample_img_1').src
+const sample_img_2 = responsiveImage('sample_img_2').src
 
 export const assets = {
     logo,
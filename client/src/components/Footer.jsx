@@ -4,12 +4,12 @@ import { assets } from '../assets/assets'
 const Footer = () => {
   return (
     <div className='flex items-center justify-between gap-4 py-3 mt-20 '>
-        <img src={assets.logo_image_nobg} alt="" width={150}/>
+        <img src={assets.logo_image_nobg} alt="" width={150} height={150} loading='lazy' decoding='async'/>
         <p className='flex-1 border-l border-gray-400 pl-4 text-sm text-gray-600 max-sm:hidden'>All Rights Reserved. Copyright @Texmage.io</p>
         <div className='flex gap-2.5'>
-            <img src={assets.facebook_icon} alt="" width={35} />
-            <img src={assets.instagram_icon} alt="" width={35} />
-            <img src={assets.twitter_icon} alt="" width={35} />
+            <img src={assets.facebook_icon} alt="" width={35} height={35} loading='lazy' decoding='async' />
+            <img src={assets.instagram_icon} alt="" width={35} height={35} loading='lazy' decoding='async' />
+            <img src={assets.twitter_icon} alt="" width={35} height={35} loading='lazy' decoding='async' />
         </div>
     </div>
   )
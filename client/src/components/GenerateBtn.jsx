@@ -1,6 +1,6 @@
 import React from 'react'
 import { assets } from '../assets/assets'
-import {motion} from 'framer-motion'
+import {m} from 'framer-motion'
 import { useNavigate } from 'react-router-dom';
 import { useContext } from 'react';
 import { AppContext } from '../context/AppContext';
@@ -19,7 +19,7 @@ const GenerateBtn = () => {
     }
 
   return (
-    <motion.div className='pb-16 flex flex-col items-center justify-center'
+    <m.div className='pb-16 flex flex-col items-center justify-center'
       initial={{ opacity: 0.2, y: 100 }} 
       whileInView={{ opacity: 1, y: 0 }} 
       transition={{ duration: 1 }} 
@@ -28,9 +28,9 @@ const GenerateBtn = () => {
         <h1 className='text-2xl md:text-3xl lg:4xl mt-4 font-semibold text-neutral-800 py-6 md:py-16'>See the magic. Try now</h1>
         <button className='inline-flex items-center gap-2 px-12 py-3 rounded-full [background-color:#1abc9c] text-white m-auto hover:scale-105 transition-all duration-500 cursor-pointer' onClick={onClickHandler}>
             Generate Images
-            <img className='h-6' src={assets.star_group} alt="" />
+            <img className='h-6' src={assets.star_group} alt="" loading='lazy' decoding='async' />
         </button>
-    </motion.div>
+    </m.div>
   )
 }
 
@@ -0,0 +1,85 @@
+import React, { useContext, useEffect, useState } from 'react'
+import { AppContext } from '../context/AppContext'
+import imageHistory from '../utils/imageHistory'
+
+// Gallery of the user's earlier generations from the IndexedDB history. Only
+// the small thumbnails are turned into object URLs; the full image is read
+// when one is picked.
+const ImageHistory = ({onSelect}) => {
+  const {user, historyVersion} = useContext(AppContext)
+  const owner = user?._id ?? 'guest'
+  const [entries, setEntries] = useState([])
+  const [reload, setReload] = useState(0)
+
+  useEffect(() => {
+    let cancelled = false
+    imageHistory.list(owner).then((list) => {
+      if (!cancelled) {
+        setEntries(list.map((entry) => ({...entry, thumbUrl: URL.createObjectURL(entry.thumb || entry.blob)})))
+      }
+    })
+    return () => {
+      cancelled = true
+    }
+  }, [owner, historyVersion, reload])
+
+  // Release the thumbnail URLs of the previous listing.
+  useEffect(() => {
+    return () => entries.forEach((entry) => URL.revokeObjectURL(entry.thumbUrl))
+  }, [entries])
+
+  const pick = (entry) => {
+    // Viewing an entry counts as using it for the LRU.
+    imageHistory.find(owner, entry.prompt)
+    onSelect(entry)
+  }
+
+  const removeEntry = async (entry) => {
+    await imageHistory.remove(owner, entry.key)
+    setReload((count) => count + 1)
+  }
+
+  const clearAll = async () => {
+    await imageHistory.clear(owner)
+    setReload((count) => count + 1)
+  }
+
+  if (!entries.length) {
+    return null
+  }
+
+  return (
+    <div className='w-full max-w-3xl mx-auto mb-16'>
+      <div className='flex items-center justify-between mb-4'>
+        <h2 className='text-xl font-medium text-neutral-800'>Your history</h2>
+        <button onClick={clearAll} className='text-sm text-gray-500 hover:text-red-600 cursor-pointer'>Clear history</button>
+      </div>
+      <div className='grid grid-cols-3 sm:grid-cols-5 gap-3'>
+        {entries.map((entry) => (
+          <div key={entry.key} className='relative group'>
+            <img
+              src={entry.thumbUrl}
+              alt={entry.prompt}
+              title={entry.prompt}
+              width={160}
+              height={160}
+              loading='lazy'
+              decoding='async'
+              onClick={() => pick(entry)}
+              className='w-full aspect-square object-cover rounded cursor-pointer hover:scale-105 transition-all duration-300'
+            />
+            <button
+              onClick={() => removeEntry(entry)}
+              aria-label='Remove from history'
+              className='absolute top-1 right-1 hidden group-hover:flex items-center justify-center w-6 h-6 rounded-full bg-black/60 text-white text-xs cursor-pointer'
+            >
+              ✕
+            </button>
+          </div>
+        ))}
+      </div>
+    </div>
+  )
+}
+
+export default ImageHistory
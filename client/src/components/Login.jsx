@@ -3,7 +3,7 @@ import { assets } from '../assets/assets';
 import { useState } from 'react';
 import { useEffect } from 'react';
 import { AppContext } from '../context/AppContext';
-import { motion } from 'framer-motion';
+import { m } from 'framer-motion';
 import axios from "axios"
 import { toast } from 'react-toastify';
 
@@ -65,7 +65,7 @@ const Login = () => {
   },[])
   return (
     <div className='fixed top-0 left-0 right-0 bottom-0 z-10 backdrop-blur-sm bg-black/30 flex justify-center items-center'>
-        <motion.form
+        <m.form
         onSubmit={onSubmitHandler}
         className='relative bg-white p-12 sm:p-16 rounded-xl text-slate-500 w-full max-w-md sm:max-w-lg'
         initial={{ opacity: 0.2, y: 100 }} 
@@ -98,7 +98,7 @@ const Login = () => {
             <p className='text-center'>Already have an account? <span className='text-blue-600 cursor-pointer' onClick={()=> setState('Log In')}>Log In</span></p>}
 
             <img onClick={()=> setShowLogin(false)} src={assets.cross_icon} alt="" className='absolute top-5 right-5 cursor-pointer' />
-        </motion.form>
+        </m.form>
     </div>
   );
 };
@@ -0,0 +1,13 @@
+import React from 'react'
+
+// Suspense fallback while a route's chunk downloads. It takes the page's
+// height so the footer does not jump when the page arrives.
+const PageLoader = () => {
+  return (
+    <div className='min-h-[80vh] flex justify-center items-center' role='status' aria-label='Loading'>
+      <div className='w-10 h-10 rounded-full border-4 border-neutral-300 border-t-[#1abc9c] animate-spin'></div>
+    </div>
+  )
+}
+
+export default PageLoader
@@ -0,0 +1,16 @@
+import React from 'react'
+
+// Renders an image from responsiveImage() in assets.js as a <picture>, so the
+// browser picks AVIF or WebP at the width given by `sizes`. Pass `as` to swap
+// the inner <img> for another component, e.g. m.img.
+const ResponsiveImage = ({image, sizes, alt = '', as: Img = 'img', loading = 'lazy', ...props}) => {
+  return (
+    <picture>
+      <source type="image/avif" srcSet={image.avif} sizes={sizes} />
+      <source type="image/webp" srcSet={image.webp} sizes={sizes} />
+      <Img src={image.src} alt={alt} loading={loading} decoding="async" {...props} />
+    </picture>
+  )
+}
+
+export default ResponsiveImage
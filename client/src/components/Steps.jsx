@@ -1,11 +1,11 @@
 import React from 'react'
 import { stepsData } from '../assets/assets'
-import {motion} from 'framer-motion'
+import {m} from 'framer-motion'
 
 
 const Steps = () => {
   return (
-    <motion.div className='flex flex-col justify-center items-center'
+    <m.div className='flex flex-col justify-center items-center'
     initial={{opacity:0.2, y:100}}
     whileInView={{opacity:1, y:0}}
     transition={{duration:1}}
@@ -21,7 +21,7 @@ const Steps = () => {
             {stepsData.map((item,index)=> (
                 <div key={index}
                 className='flex items-center gap-4 p-5 px-8 bg-white/20 shadow-md border rounded-2xl cursor-pointer hover:scale-[1.02] transition-all duration-300'>
-                    <img width={40} src={item.icon} alt="" />
+                    <img width={40} height={40} src={item.icon} alt="" loading='lazy' decoding='async' />
                     <div>
                         <h2 className='text-xl font-medium'>{item.title}</h2>
                         <p className='text-gray-500'>{item.description}</p>
@@ -29,7 +29,7 @@ const Steps = () => {
                 </div>
             ))}
         </div>
-    </motion.div>
+    </m.div>
   )
 }
 
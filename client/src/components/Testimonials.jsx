@@ -1,10 +1,10 @@
 import React from 'react'
 import { assets, testimonialsData } from '../assets/assets'
-import {motion} from 'framer-motion'
+import {m} from 'framer-motion'
 
 const Testimonials = () => {
   return (
-    <motion.div className='flex flex-col justify-center items-center my-20 py-12'
+    <m.div className='flex flex-col justify-center items-center my-20 py-12'
     initial={{opacity:0.2, y:100}}
     whileInView={{opacity:1, y:0}}
     transition={{duration:1}}
@@ -18,12 +18,12 @@ const Testimonials = () => {
                 testimonialsData.map((item,index)=>(
                     <div key={index} className='bg-white/20 p-12 rounded-lg shadow-md order w-80 m-auto cursor-pointer hover:scale-[1.02] transition-all'>
                         <div className='flex flex-col items-center'>
-                            <img src={assets.profile_icon} alt="" className='rounded-full w-14'/>
+                            <img src={assets.profile_icon} alt="" className='rounded-full w-14' width={56} height={56} loading='lazy' decoding='async'/>
                             <h2 className='text-xl font-semibold mt-3'>{item.name}</h2>
                             <p className='text-gray-700 mb-4'>{item.location}</p>
                             <div className='flex mb-4'>
                                 {Array(item.stars).fill().map((items,index)=>(
-                                    <img src={assets.rating_star} alt="" key={index} />
+                                    <img src={assets.rating_star} alt="" key={index} loading='lazy' decoding='async' />
                                 ))}
                             </div>
                             <div>
@@ -34,7 +34,7 @@ const Testimonials = () => {
                 ))
             }
         </div>
-    </motion.div>
+    </m.div>
   )
 }
 
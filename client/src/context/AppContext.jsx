@@ -1,9 +1,24 @@
-import { createContext, useEffect, useState } from "react";
+import { createContext, useEffect, useRef, useState } from "react";
 import axios from "axios"
 import { toast } from "react-toastify";
 import {useNavigate} from 'react-router-dom'
+import imageHistory from "../utils/imageHistory";
 export const AppContext = createContext()
 
+// crypto.randomUUID only exists in secure contexts; test stacks reach the app
+// over plain http (http://server:3000), so build a v4 UUID from
+// getRandomValues there, which is available everywhere.
+const newIdempotencyKey = () => {
+    if(crypto.randomUUID){
+        return crypto.randomUUID();
+    }
+    const bytes = crypto.getRandomValues(new Uint8Array(16));
+    bytes[6] = (bytes[6] & 0x0f) | 0x40;
+    bytes[8] = (bytes[8] & 0x3f) | 0x80;
+    const hex = [...bytes].map((byte) => byte.toString(16).padStart(2, '0')).join('');
+    return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+}
+
 export const AppContextProvider = (props)=> {
     const [user, setUser] = useState(()=>{
         const storedUser = localStorage.getItem('user');
@@ -19,40 +34,150 @@ export const AppContextProvider = (props)=> {
     const [showLogin, setShowLogin] = useState(false);
     const [token, setToken] = useState(localStorage.getItem('token'));
     const [credit, setCredit] = useState(false)
+    // Bumped whenever an image is added to the local history, so the gallery reloads.
+    const [historyVersion, setHistoryVersion] = useState(0)
 
-    const backendUrl = import.meta.env.VITE_BACKEND_URL;
+    // Empty when the client is served by the API server itself (same origin).
+    const backendUrl = import.meta.env.VITE_BACKEND_URL ?? '';
 
     const navigate = useNavigate();
 
-    const loadCreditsData = async () => {
-        try {
-            const {data} = await axios.get(backendUrl + '/credits', {headers: {token}});
-            if(data.success){
-                setCredit(data.credits);
+    // Overlapping refreshes share one GET /credits instead of each sending their own.
+    const creditsRequest = useRef(null);
+
+    const loadCreditsData = () => {
+        if(!creditsRequest.current){
+            creditsRequest.current = (async () => {
+                try {
+                    const {data} = await axios.get(backendUrl + '/credits', {headers: {token}});
+                    if(data.success){
+                        setCredit(data.credits);
+                    }
+                } catch (error) {
+                    console.log(error);
+                    toast.error(error.message);
+                } finally {
+                    creditsRequest.current = null;
+                }
+            })();
+        }
+        return creditsRequest.current;
+    }
+
+    const isFinished = (job) => job.status === 'succeeded' || job.status === 'failed';
+
+    // Reads the job's Server-Sent Events stream. fetch is used instead of
+    // EventSource because the token travels in a header.
+    const streamJobEvents = async (jobId) => {
+        const response = await fetch(`${backendUrl}/image/jobs/${jobId}/events`, {headers: {token}});
+        if(!response.ok || !response.body){
+            throw new Error('Job events unavailable');
+        }
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        while(true){
+            const {value, done} = await reader.read();
+            if(done){
+                throw new Error('Job event stream closed');
+            }
+            buffer += value;
+            let boundary;
+            while((boundary = buffer.indexOf('\n\n')) !== -1){
+                const message = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                const dataLine = message.split('\n').find(line => line.startsWith('data: '));
+                if(!dataLine){
+                    continue;
+                }
+                const job = JSON.parse(dataLine.slice(6));
+                if(isFinished(job)){
+                    reader.cancel();
+                    return job;
+                }
             }
-        } catch (error) {
-            console.log(error);
-            toast.error(error.message);
         }
     }
 
+    const pollJob = async (jobId) => {
+        let delay = 500;
+        while(true){
+            const {data} = await axios.get(`${backendUrl}/image/jobs/${jobId}`, {headers: {token}});
+            if(!data.success){
+                throw new Error(data.message);
+            }
+            if(isFinished(data.job)){
+                return data.job;
+            }
+            await new Promise(resolve => setTimeout(resolve, delay));
+            delay = Math.min(delay * 1.5, 3000);
+        }
+    }
+
+    const waitForJob = async (jobId) => {
+        try {
+            return await streamJobEvents(jobId);
+        } catch {
+            return pollJob(jobId);
+        }
+    }
+
+    // Submits a generation job, waits for it over SSE (falling back to polling)
+    // and downloads the PNG, which is also kept in the IndexedDB history.
+    // Returns an object URL for the image; the caller revokes it once it is no
+    // longer shown.
     const generateImages = async (prompt) => {
+        // A prompt this user already generated is served from the local history:
+        // no request and no credit.
+        const owner = user?._id ?? 'guest';
+        const stored = await imageHistory.find(owner, prompt);
+        if(stored){
+            toast.info("Shown from your history, no credit used.");
+            return URL.createObjectURL(stored.blob);
+        }
         try {
-            const {data} = await axios.post(backendUrl + '/image/generate-image', {prompt}, {headers: {token}});
-            if(data.success){
-                loadCreditsData();
-                return data.resultImage;
-            }else{
-                console.log(data);
+            // A fresh key per attempt; the server refuses to charge twice for the same key.
+            const idempotencyKey = newIdempotencyKey();
+            const {data} = await axios.post(backendUrl + '/image/jobs', {prompt}, {
+                headers: {token, 'Idempotency-Key': idempotencyKey}
+            });
+            if(!data.success){
                 toast.error(data.message);
-                loadCreditsData();
-                if(data.creditBalance === 0 || data.credits === 0){
+                if(data.credits !== undefined){
+                    setCredit(data.credits);
+                }
+                if(data.credits === 0){
+                    setTimeout(() => navigate('/pricing'), 100);
+                }
+                return;
+            }
+            // The submit response is authoritative for the balance: the credit is already reserved.
+            setCredit(data.job.creditBalance);
+
+            const job = await waitForJob(data.jobId);
+            if(job.status === 'failed'){
+                console.log(job);
+                toast.error(job.message);
+                setCredit(job.creditBalance);
+                if(job.creditBalance === 0){
                     setTimeout(() => navigate('/pricing'), 100);
                 }
+                return;
             }
+
+            const response = await axios.get(`${backendUrl}/image/jobs/${job.id}/result`, {
+                headers: {token, Accept: 'image/png'},
+                responseType: 'blob'
+            });
+            setCredit(job.creditBalance);
+            imageHistory.save(owner, prompt, response.data).then((entry) => {
+                if(entry){
+                    setHistoryVersion((version) => version + 1);
+                }
+            });
+            return URL.createObjectURL(response.data);
             
         } catch (error) {
-            toast.error(error.message)
+            toast.error(error.response?.data?.message || error.message)
         }
     }
 
@@ -62,7 +187,7 @@ export const AppContextProvider = (props)=> {
         }
     },[token])
     const value = {
-        user, setUser, showLogin, setShowLogin, backendUrl, token, setToken, credit, setCredit, loadCreditsData, generateImages
+        user, setUser, showLogin, setShowLogin, backendUrl, token, setToken, credit, setCredit, loadCreditsData, generateImages, historyVersion
     }
 
     return (
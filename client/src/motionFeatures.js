@@ -0,0 +1,6 @@
+// The animation features used by the m.* components, loaded in their own chunk
+// after first render (see LazyMotion in App.jsx). domAnimation covers animate,
+// whileInView and the hover/tap gestures; nothing here uses drag or layout.
+import { domAnimation } from 'framer-motion'
+
+export default domAnimation
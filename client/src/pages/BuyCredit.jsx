@@ -1,13 +1,13 @@
 import React, { useContext } from 'react';
 import { assets, plans } from '../assets/assets';
 import { AppContext } from '../context/AppContext';
-import { motion } from 'framer-motion';
+import { m } from 'framer-motion';
 
 const BuyCredit = () => {
   const { user } = useContext(AppContext);
 
   return (
-    <motion.div
+    <m.div
       className='min-h-[80vh] text-center pt-14 mb-10'
       initial={{ opacity: 0.2, y: 100 }} 
       animate={{ opacity: 1, y: 0 }} 
@@ -18,7 +18,7 @@ const BuyCredit = () => {
 
       <div className='flex flex-wrap gap-6 justify-center'>
         {plans.map((item, index) => (
-          <motion.div
+          <m.div
             key={index}
             className='bg-white drop-shadow-sm p-12 rounded-lg py-12 px-8 text-gray-800 hover:scale-105 transition-all duration-500'
             whileHover={{ scale: 1.05 }} 
@@ -34,10 +34,10 @@ const BuyCredit = () => {
                 {user ? 'Purchase Now' : 'Get Started'}
               </button>
             </div>
-          </motion.div>
+          </m.div>
         ))}
       </div>
-    </motion.div>
+    </m.div>
   );
 };
 
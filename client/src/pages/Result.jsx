@@ -1,7 +1,8 @@
-import React, { memo, useContext, useState } from 'react';
+import React, { memo, useContext, useEffect, useState } from 'react';
 import { assets } from '../assets/assets';
-import { motion } from 'framer-motion';
+import { m } from 'framer-motion';
 import { AppContext } from '../context/AppContext';
+import ImageHistory from '../components/ImageHistory';
 
 const Result = memo(() => {
   const [image, setImage] = useState(assets.sample_img_1);
@@ -10,6 +11,15 @@ const Result = memo(() => {
   const [input, setInput] = useState('');
   const {generateImages} = useContext(AppContext);
 
+  // Generated images are object URLs; release the previous one when it is replaced.
+  useEffect(() => {
+    return () => {
+      if (image.startsWith('blob:')) {
+        URL.revokeObjectURL(image);
+      }
+    };
+  }, [image]);
+
   const onSubmitHandler = async (e) => {
     e.preventDefault();
     setLoading(true);
@@ -27,8 +37,17 @@ const Result = memo(() => {
     }, 2000); 
   };
 
+  // Shows an earlier generation from the local history: no request, no credit.
+  const showFromHistory = (entry) => {
+    setImage(URL.createObjectURL(entry.blob));
+    setInput(entry.prompt);
+    setIsImageLoaded(true);
+    window.scrollTo({top: 0, behavior: 'smooth'});
+  };
+
   return (
-    <motion.form
+    <>
+    <m.form
       onSubmit={onSubmitHandler}
       className="flex flex-col min-h-[90vh] justify-center items-center"
       initial={{ opacity: 0.2, y: 100 }} 
@@ -79,14 +98,16 @@ const Result = memo(() => {
           </p>
           <a
             href={image}
-            download
+            download="texmage.png"
             className="bg-zinc-900 px-10 py-3 rounded-full cursor-pointer"
           >
             Download
           </a>
         </div>
       )}
-    </motion.form>
+    </m.form>
+    <ImageHistory onSelect={showFromHistory} />
+    </>
   );
 });
 
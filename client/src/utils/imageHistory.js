@@ -0,0 +1,181 @@
+// Generated images kept in IndexedDB so that a prompt the user already paid for
+// is shown again without a request or a credit. Images are stored as Blobs
+// (never data URLs) together with a small WebP thumbnail for the gallery, keyed
+// by the owner and a SHA-256 of the normalized prompt. The store is an LRU
+// capped by total bytes (VITE_IMAGE_HISTORY_MB, default 50) and entry count.
+// Every call degrades to a miss/no-op when IndexedDB is unavailable.
+
+const DB_NAME = 'texmage'
+const DB_VERSION = 1
+const STORE = 'images'
+const MAX_BYTES = Number(import.meta.env.VITE_IMAGE_HISTORY_MB || 50) * 1024 * 1024
+const MAX_ENTRIES = Number(import.meta.env.VITE_IMAGE_HISTORY_MAX_ENTRIES || 200)
+const THUMB_WIDTH = 160
+
+// Same folding as the server's prompt validator, so prompts the server treats
+// as equal share one entry.
+const normalizePrompt = (prompt) => prompt
+  .normalize('NFKC')
+  .replace(/[\p{Cc}\p{Cf}]/gu, ' ')
+  .replace(/\s+/g, ' ')
+  .trim()
+
+const hex = (buffer) => [...new Uint8Array(buffer)].map((byte) => byte.toString(16).padStart(2, '0')).join('')
+
+// crypto.subtle only exists in secure contexts; plain-http test hosts fall
+// back to a 53-bit string hash, which is plenty for one user's history.
+const hashPrompt = async (prompt) => {
+  const text = normalizePrompt(prompt)
+  if (globalThis.crypto?.subtle) {
+    return hex(await crypto.subtle.digest('SHA-256', new TextEncoder().encode(text)))
+  }
+  let h1 = 0xdeadbeef, h2 = 0x41c6ce57
+  for (let i = 0; i < text.length; i++) {
+    const ch = text.charCodeAt(i)
+    h1 = Math.imul(h1 ^ ch, 2654435761)
+    h2 = Math.imul(h2 ^ ch, 1597334677)
+  }
+  h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909)
+  h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909)
+  return (4294967296 * (2097151 & h2) + (h1 >>> 0)).toString(16)
+}
+
+const promisify = (request) => new Promise((resolve, reject) => {
+  request.onsuccess = () => resolve(request.result)
+  request.onerror = () => reject(request.error)
+})
+
+let dbPromise = null
+
+const openDb = () => {
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve, reject) => {
+      if (!globalThis.indexedDB) {
+        return reject(new Error('IndexedDB unavailable'))
+      }
+      const request = indexedDB.open(DB_NAME, DB_VERSION)
+      request.onupgradeneeded = () => {
+        const store = request.result.createObjectStore(STORE, {keyPath: ['owner', 'key']})
+        store.createIndex('lastUsedAt', 'lastUsedAt')
+        store.createIndex('owner', ['owner', 'lastUsedAt'])
+      }
+      request.onsuccess = () => resolve(request.result)
+      request.onerror = () => reject(request.error)
+    }).catch((error) => {
+      dbPromise = null
+      throw error
+    })
+  }
+  return dbPromise
+}
+
+// Runs fn(store) in one transaction and resolves once it has committed.
+const withStore = async (mode, fn) => {
+  const db = await openDb()
+  const tx = db.transaction(STORE, mode)
+  const committed = new Promise((resolve, reject) => {
+    tx.oncomplete = resolve
+    tx.onabort = tx.onerror = () => reject(tx.error)
+  })
+  const result = await fn(tx.objectStore(STORE))
+  await committed
+  return result
+}
+
+const quietly = async (fallback, fn) => {
+  try {
+    return await fn()
+  } catch (error) {
+    console.log(error)
+    return fallback
+  }
+}
+
+const makeThumbnail = async (blob) => {
+  try {
+    const bitmap = await createImageBitmap(blob, {resizeWidth: THUMB_WIDTH, resizeQuality: 'medium'})
+    const canvas = document.createElement('canvas')
+    canvas.width = bitmap.width
+    canvas.height = bitmap.height
+    canvas.getContext('2d').drawImage(bitmap, 0, 0)
+    bitmap.close()
+    return await new Promise((resolve) => canvas.toBlob(resolve, 'image/webp', 0.8))
+  } catch {
+    return null
+  }
+}
+
+// Drops least recently used entries (of any owner) until the caps hold.
+const evict = (store) => new Promise((resolve, reject) => {
+  const entries = []
+  const request = store.index('lastUsedAt').openCursor()
+  request.onerror = () => reject(request.error)
+  request.onsuccess = () => {
+    const cursor = request.result
+    if (cursor) {
+      entries.push({id: cursor.primaryKey, size: cursor.value.size})
+      return cursor.continue()
+    }
+    let total = entries.reduce((sum, entry) => sum + entry.size, 0)
+    let count = entries.length
+    for (const entry of entries) {
+      if (total <= MAX_BYTES && count <= MAX_ENTRIES) {
+        break
+      }
+      store.delete(entry.id)
+      total -= entry.size
+      count--
+    }
+    resolve()
+  }
+})
+
+// The stored image for this prompt, or null. A hit becomes the most recently used.
+const find = (owner, prompt) => quietly(null, async () => {
+  const key = await hashPrompt(prompt)
+  return withStore('readwrite', async (store) => {
+    const entry = await promisify(store.get([owner, key]))
+    if (entry) {
+      entry.lastUsedAt = Date.now()
+      store.put(entry)
+    }
+    return entry || null
+  })
+})
+
+const save = (owner, prompt, blob) => quietly(null, async () => {
+  const [key, thumb] = await Promise.all([hashPrompt(prompt), makeThumbnail(blob)])
+  const now = Date.now()
+  const entry = {
+    owner, key, blob, thumb,
+    prompt: normalizePrompt(prompt),
+    size: blob.size + (thumb?.size || 0),
+    createdAt: now,
+    lastUsedAt: now,
+  }
+  await withStore('readwrite', async (store) => {
+    store.put(entry)
+    await evict(store)
+  })
+  return entry
+})
+
+// The owner's entries, most recently used first. Blobs in IndexedDB records
+// are references, so listing does not read the images into memory.
+const list = (owner) => quietly([], () => withStore('readonly', (store) => {
+  const range = IDBKeyRange.bound([owner, 0], [owner, Infinity])
+  return promisify(store.index('owner').getAll(range)).then((entries) => entries.reverse())
+}))
+
+const remove = (owner, key) => quietly(null, () => withStore('readwrite', (store) => {
+  store.delete([owner, key])
+}))
+
+const clear = (owner) => quietly(null, async () => {
+  const entries = await list(owner)
+  await withStore('readwrite', (store) => {
+    entries.forEach((entry) => store.delete([owner, entry.key]))
+  })
+})
+
+export default {find, save, list, remove, clear, normalizePrompt}
@@ -1,10 +1,39 @@
 import { defineConfig } from 'vite'
 import react from '@vitejs/plugin-react'
 import tailwindcss from '@tailwindcss/vite'
+import bundleBudget from './scripts/bundle-budget.js'
+
+// React and the router change far less often than the app, so they get a
+// chunk of their own that stays cached across deploys.
+const VENDOR_PACKAGES = /[\\/]node_modules[\\/](react|react-dom|react-router|react-router-dom|scheduler)[\\/]/
 
 // https://vite.dev/config/
 export default defineConfig({
   plugins: [react(),
-    tailwindcss()
+    tailwindcss(),
+    // Gzipped KB per chunk; see scripts/bundle-budget.js.
+    bundleBudget({
+      initial: 140,
+      budgets: {
+        'index': 55,
+        'react-vendor': 90,
+        'motionFeatures': 30,
+        'Result': 6,
+        'BuyCredit': 6,
+        'Login': 6,
+        'index.css': 12,
+      },
+    }),
   ],
+  build: {
+    rollupOptions: {
+      output: {
+        manualChunks(id) {
+          if (VENDOR_PACKAGES.test(id)) {
+            return 'react-vendor'
+          }
+        },
+      },
+    },
+  },
 })
@@ -0,0 +1,230 @@
+"""
+Local stand-in for the ClipDrop text-to-image API.
+
+Serves POST /text-to-image/v1 like the real API (multipart form with a
+`prompt` field, `x-api-key` header, PNG body on success) so the image path of
+the Texmage server can be benchmarked and tested offline. Point the server at
+it with:
+
+    CLIPDROP_API_URL=http://localhost:4000/text-to-image/v1
+
+Behaviour is configurable from the command line or at runtime:
+
+    --latency      fixed:800 | uniform:200:2000 | normal:900:250 | lognormal:800:0.5   (ms)
+    --payload-kb   size of every PNG returned (padded with a private chunk)
+    --error-rate   fraction of requests answered with one of --error-codes
+    --drip-rate    fraction of successful responses streamed slowly
+    --drip-bps     bytes per second for slow-drip responses
+
+    POST /__stub/config   JSON body with any of the option names above (underscored)
+    GET  /__stub/stats    request counters
+    POST /__stub/reset    reset counters
+
+PNGs are deterministic: the same prompt always produces the same bytes.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+import struct
+import sys
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+from aiohttp import web
+
+ERROR_MESSAGES = {
+    400: "Bad request",
+    402: "Not enough credits",
+    429: "Too many requests, please retry later",
+    500: "Internal server error",
+    502: "Bad gateway",
+    503: "Service unavailable",
+}
+
+
+def parse_latency(spec):
+    """Turn a latency spec such as 'uniform:200:2000' into a sampler returning seconds"""
+    kind, *params = spec.split(':')
+    values = [float(p) for p in params]
+    if kind == 'fixed':
+        return lambda rng: values[0] / 1000
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == 'normal':
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1])) / 1000
+    if kind == 'lognormal':
+        # median in ms and sigma of the underlying normal
+        median, sigma = values
+        return lambda rng: median * rng.lognormvariate(0, sigma) / 1000
+    raise ValueError(f"Unknown latency distribution '{kind}'")
+
+
+def _png_chunk(chunk_type, data):
+    body = chunk_type + data
+    return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body) & 0xffffffff)
+
+
+@lru_cache(maxsize=256)
+def render_png(prompt, width, height, payload_bytes):
+    """
+    Build a deterministic PNG for a prompt.
+
+    The image is a gradient coloured by the prompt hash; a private 'stUB'
+    ancillary chunk pads the file to exactly payload_bytes when that is
+    larger than the encoded image.
+    """
+    digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+    r, g, b = digest[0], digest[1], digest[2]
+    rows = bytearray()
+    for y in range(height):
+        rows.append(0)  # filter type: none
+        shade = (y * 255) // max(1, height - 1)
+        for x in range(width):
+            rows.extend(((r + shade) & 0xff, (g + x) & 0xff, b))
+
+    signature = b'\x89PNG\r\n\x1a\n'
+    header = _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+    image = _png_chunk(b'IDAT', zlib.compress(bytes(rows), 6))
+    end = _png_chunk(b'IEND', b'')
+
+    size = len(signature) + len(header) + len(image) + len(end)
+    padding = b''
+    if payload_bytes > size + 12:
+        seed = random.Random(digest)
+        filler = seed.randbytes(payload_bytes - size - 12)
+        padding = _png_chunk(b'stUB', filler)
+    return signature + header + padding + image + end
+
+
+class StubState:
+    """Mutable stub configuration and counters"""
+
+    def __init__(self, args):
+        self.rng = random.Random(args.seed)
+        self.stats = Counter()
+        self.configure(vars(args))
+
+    def configure(self, options):
+        if options.get('latency'):
+            self.latency_spec = options['latency']
+            self.sample_latency = parse_latency(self.latency_spec)
+        for name in ('payload_kb', 'width', 'height', 'error_rate', 'drip_rate', 'drip_bps'):
+            if options.get(name) is not None:
+                setattr(self, name, options[name])
+        if options.get('error_codes'):
+            codes = options['error_codes']
+            self.error_codes = [int(c) for c in (codes.split(',') if isinstance(codes, str) else codes)]
+
+    def describe(self):
+        return {
+            'latency': self.latency_spec,
+            'payload_kb': self.payload_kb,
+            'width': self.width,
+            'height': self.height,
+            'error_rate': self.error_rate,
+            'error_codes': self.error_codes,
+            'drip_rate': self.drip_rate,
+            'drip_bps': self.drip_bps,
+        }
+
+
+async def text_to_image(request):
+    state = request.app['state']
+    state.stats['requests'] += 1
+
+    form = await request.post()
+    prompt = form.get('prompt')
+    if not request.headers.get('x-api-key'):
+        state.stats['status_403'] += 1
+        return web.json_response({'error': 'Missing API key'}, status=403)
+    if not prompt:
+        state.stats['status_400'] += 1
+        return web.json_response({'error': 'Missing prompt'}, status=400)
+
+    await asyncio.sleep(state.sample_latency(state.rng))
+
+    if state.error_codes and state.rng.random() < state.error_rate:
+        status = state.rng.choice(state.error_codes)
+        state.stats[f'status_{status}'] += 1
+        headers = {'Retry-After': '1'} if status == 429 else {}
+        return web.json_response({'error': ERROR_MESSAGES.get(status, 'Error')}, status=status, headers=headers)
+
+    png = render_png(prompt, state.width, state.height, int(state.payload_kb * 1024))
+    headers = {
+        'Content-Type': 'image/png',
+        'x-remaining-credits': '1000',
+        'x-credits-consumed': '1',
+    }
+
+    if state.drip_rate and state.rng.random() < state.drip_rate:
+        state.stats['slow_drip'] += 1
+        response = web.StreamResponse(status=200, headers=headers)
+        response.content_length = len(png)
+        await response.prepare(request)
+        chunk_size = 4096
+        delay = chunk_size / max(1, state.drip_bps)
+        for offset in range(0, len(png), chunk_size):
+            await response.write(png[offset:offset + chunk_size])
+            await asyncio.sleep(delay)
+        await response.write_eof()
+        state.stats['status_200'] += 1
+        return response
+
+    state.stats['status_200'] += 1
+    return web.Response(body=png, headers=headers)
+
+
+async def update_config(request):
+    state = request.app['state']
+    state.configure(await request.json())
+    return web.json_response(state.describe())
+
+
+async def get_stats(request):
+    state = request.app['state']
+    return web.json_response({'config': state.describe(), 'stats': dict(state.stats)})
+
+
+async def reset_stats(request):
+    request.app['state'].stats.clear()
+    return web.json_response({'success': True})
+
+
+def create_app(args):
+    app = web.Application(client_max_size=1024 ** 2)
+    app['state'] = StubState(args)
+    app.router.add_post('/text-to-image/v1', text_to_image)
+    app.router.add_post('/__stub/config', update_config)
+    app.router.add_get('/__stub/stats', get_stats)
+    app.router.add_post('/__stub/reset', reset_stats)
+    return app
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Local ClipDrop text-to-image stand-in")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=4000)
+    parser.add_argument('--latency', default='fixed:0', help="latency distribution in ms (default: fixed:0)")
+    parser.add_argument('--payload-kb', type=float, default=512, help="PNG size in KB (default: 512)")
+    parser.add_argument('--width', type=int, default=64, help="encoded image width")
+    parser.add_argument('--height', type=int, default=64, help="encoded image height")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument('--error-codes', default='429,500,503', help="status codes to inject")
+    parser.add_argument('--drip-rate', type=float, default=0.0, help="fraction of responses streamed slowly")
+    parser.add_argument('--drip-bps', type=int, default=64 * 1024, help="slow-drip speed in bytes/s")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for latency and failures")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    print(f"ClipDrop stub listening on http://{args.host}:{args.port}/text-to-image/v1")
+    web.run_app(create_app(args), host=args.host, port=args.port, print=None)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""
+Load generator for the Texmage Express API.
+
+Replays a weighted mix of the API routes with many asyncio virtual users
+sharing one pooled keep-alive connection pool, then reports p50/p95/p99
+latency, throughput and error rate per route.
+
+Routes (see server/routes/userRoute.js and server/routes/imageRoute.js):
+    signup    POST /signup
+    login     POST /login
+    credits   GET  /credits                (token header)
+    generate  POST /image/generate-image   (token header)
+
+Every virtual user signs up once to get a token, then loops over the mix
+until the run ends. Run it against a local stack only; the server's image
+route must point at a ClipDrop stand-in, never the real API.
+
+Usage:
+    python load_generator.py --users 1000 --duration 60
+    python load_generator.py --mix credits=10,login=2,generate=1 --json report.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import string
+import sys
+import time
+from collections import Counter, defaultdict
+
+import aiohttp
+
+DEFAULT_MIX = "signup=1,login=4,credits=10,generate=2"
+PASSWORD = "LoadTest123"  # loginValidator caps passwords at 12 characters
+
+
+def parse_mix(mix):
+    """Parse 'route=weight,...' into a {route: weight} dict"""
+    weights = {}
+    for part in mix.split(','):
+        route, _, weight = part.partition('=')
+        route = route.strip()
+        if route not in ROUTES:
+            raise ValueError(f"Unknown route '{route}'. Choose from: {', '.join(ROUTES)}")
+        weights[route] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def random_email():
+    suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=12))
+    return f"load_{suffix}@example.com"
+
+
+class RouteStats:
+    """Latency samples and outcomes for one route"""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = Counter()
+
+    @property
+    def count(self):
+        return len(self.latencies)
+
+    def summary(self, elapsed):
+        ordered = sorted(self.latencies)
+        error_count = sum(self.errors.values())
+        return {
+            'requests': self.count,
+            'throughput_rps': self.count / elapsed if elapsed else 0.0,
+            'error_rate': error_count / self.count if self.count else 0.0,
+            'p50_ms': percentile(ordered, 50),
+            'p95_ms': percentile(ordered, 95),
+            'p99_ms': percentile(ordered, 99),
+            'max_ms': ordered[-1] if ordered else 0.0,
+            'errors': dict(self.errors.most_common(5)),
+        }
+
+
+class VirtualUser:
+    """One simulated client with its own account and token"""
+
+    def __init__(self, session, base_url, stats):
+        self.session = session
+        self.base_url = base_url
+        self.stats = stats
+        self.email = random_email()
+        self.token = None
+
+    async def request(self, route, method, path, **kwargs):
+        """Send one request, record its latency and classify the outcome"""
+        started = time.perf_counter()
+        error = None
+        data = None
+        try:
+            async with self.session.request(method, self.base_url + path, **kwargs) as response:
+                body = await response.read()
+                if response.status >= 400:
+                    error = f"http_{response.status}"
+                elif response.content_type == 'application/json':
+                    data = json.loads(body)
+                    if data.get('success') is False:
+                        error = data.get('message') or 'success=false'
+        except asyncio.TimeoutError:
+            error = 'timeout'
+        except aiohttp.ClientError as e:
+            error = type(e).__name__
+        self.stats[route].latencies.append((time.perf_counter() - started) * 1000)
+        if error:
+            self.stats[route].errors[error] += 1
+        return data
+
+    async def signup(self):
+        self.email = random_email()
+        data = await self.request('signup', 'POST', '/signup',
+                                  json={'name': 'Load Tester', 'email': self.email, 'password': PASSWORD})
+        if data and data.get('token'):
+            self.token = data['token']
+
+    async def login(self):
+        data = await self.request('login', 'POST', '/login', json={'email': self.email, 'password': PASSWORD})
+        if data and data.get('token'):
+            self.token = data['token']
+
+    async def credits(self):
+        await self.request('credits', 'GET', '/credits', headers={'token': self.token or ''})
+
+    async def generate(self):
+        prompt = random.choice(PROMPTS)
+        await self.request('generate', 'POST', '/image/generate-image',
+                           json={'prompt': prompt}, headers={'token': self.token or ''})
+
+
+ROUTES = {
+    'signup': VirtualUser.signup,
+    'login': VirtualUser.login,
+    'credits': VirtualUser.credits,
+    'generate': VirtualUser.generate,
+}
+
+PROMPTS = [
+    "a lighthouse on a cliff at sunset",
+    "a cat astronaut floating in space",
+    "an isometric city made of candy",
+    "a watercolor fox in a snowy forest",
+]
+
+
+async def run_user(session, base_url, stats, weights, deadline, think_time):
+    """Sign up once, then replay the weighted route mix until the deadline"""
+    user = VirtualUser(session, base_url, stats)
+    await user.signup()
+    routes, route_weights = zip(*weights.items())
+    while time.monotonic() < deadline:
+        route = random.choices(routes, route_weights)[0]
+        await ROUTES[route](user)
+        if think_time:
+            await asyncio.sleep(random.uniform(0, think_time))
+
+
+async def run_load(args):
+    """Run the configured load and return (stats, elapsed seconds)"""
+    weights = parse_mix(args.mix)
+    stats = defaultdict(RouteStats)
+    connector = aiohttp.TCPConnector(limit=args.connections, keepalive_timeout=args.keepalive)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        started = time.monotonic()
+        deadline = started + args.ramp_up + args.duration
+        tasks = []
+        for _ in range(args.users):
+            tasks.append(asyncio.create_task(
+                run_user(session, args.base_url, stats, weights, deadline, args.think_time)))
+            # Spread user start-up evenly over the ramp-up window
+            if args.ramp_up:
+                await asyncio.sleep(args.ramp_up / args.users)
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - started
+
+    return stats, elapsed
+
+
+def print_report(stats, elapsed):
+    """Print a per-route latency/throughput/error table"""
+    print("\n" + "=" * 92)
+    print(f"{'route':<10}{'requests':>10}{'rps':>10}{'errors':>9}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'max ms':>11}")
+    print("=" * 92)
+    for route in ROUTES:
+        if route not in stats:
+            continue
+        s = stats[route].summary(elapsed)
+        print(f"{route:<10}{s['requests']:>10}{s['throughput_rps']:>10.1f}{s['error_rate']:>9.1%}"
+              f"{s['p50_ms']:>11.1f}{s['p95_ms']:>11.1f}{s['p99_ms']:>11.1f}{s['max_ms']:>11.1f}")
+        for reason, count in s['errors'].items():
+            print(f"{'':<10}  ↳ {count} × {reason}")
+    total = sum(s.count for s in stats.values())
+    print("=" * 92)
+    print(f"Total: {total} requests in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f} req/s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Texmage API")
+    parser.add_argument('--base-url', default='http://localhost:3000', help="API base URL")
+    parser.add_argument('--users', type=int, default=100, help="number of virtual users")
+    parser.add_argument('--duration', type=float, default=30, help="seconds of steady load after ramp-up")
+    parser.add_argument('--ramp-up', type=float, default=5, help="seconds over which users start")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"route weights (default: {DEFAULT_MIX})")
+    parser.add_argument('--connections', type=int, default=200, help="max pooled keep-alive connections")
+    parser.add_argument('--keepalive', type=float, default=30, help="keep-alive timeout in seconds")
+    parser.add_argument('--timeout', type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument('--think-time', type=float, default=0, help="max random pause between requests")
+    parser.add_argument('--json', dest='json_path', help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    stats, elapsed = asyncio.run(run_load(args))
+    print_report(stats, elapsed)
+
+    if args.json_path:
+        report = {
+            'config': vars(args),
+            'elapsed_s': elapsed,
+            'routes': {route: stats[route].summary(elapsed) for route in ROUTES if route in stats},
+        }
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
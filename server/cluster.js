@@ -0,0 +1,133 @@
+import 'dotenv/config'
+import cluster from 'node:cluster';
+import os from 'node:os';
+import { fileURLToPath } from 'node:url';
+import logger from './utils/logger.js';
+
+// Cluster supervisor: forks CLUSTER_WORKERS copies of server.js (default: one
+// per core) that share the listening port. Crashed workers are replaced with
+// backoff. SIGHUP replaces the workers one at a time, each new worker listening
+// before the old one drains, so the port is never left unserved. SIGTERM and
+// SIGINT drain every worker and exit.
+
+const config = {
+    workers: Number(process.env.CLUSTER_WORKERS) || os.availableParallelism(),
+    // Must leave workers enough time for their own SHUTDOWN_TIMEOUT_MS.
+    stopTimeoutMs: Number(process.env.SHUTDOWN_TIMEOUT_MS || 8000) + 2000,
+    crashWindowMs: 10000,
+    maxRespawnDelayMs: 30000,
+};
+
+cluster.setupPrimary({exec: fileURLToPath(new URL('./server.js', import.meta.url))});
+
+const workerStates = new Map();
+const retiring = new Set();
+let quickCrashes = 0;
+let shuttingDown = false;
+let restarting = false;
+
+const snapshot = () => [...workerStates.values()];
+
+const fork = () => {
+    // Workers size their MongoDB pools from the worker count (see config/mongodb.js).
+    const worker = cluster.fork({CLUSTER_WORKER_COUNT: String(config.workers)});
+    workerStates.set(worker.id, {workerId: worker.id, pid: worker.process.pid, state: "starting", startedAt: Date.now()});
+    worker.on('message', (message) => {
+        if(message?.type === "texmage:heartbeat"){
+            workerStates.set(worker.id, {...workerStates.get(worker.id), ...message.report, lastHeartbeatAt: Date.now()});
+        }else if(message?.type === "texmage:cluster-state-request"){
+            worker.send({type: "texmage:cluster-state", requestId: message.requestId, workers: snapshot()});
+        }
+    });
+    return worker;
+};
+
+cluster.on('exit', (worker, code, signal) => {
+    const {startedAt} = workerStates.get(worker.id) || {};
+    workerStates.delete(worker.id);
+    if(retiring.delete(worker) || shuttingDown){
+        return;
+    }
+    quickCrashes = Date.now() - startedAt < config.crashWindowMs ? quickCrashes + 1 : 0;
+    const delay = quickCrashes ? Math.min(config.maxRespawnDelayMs, 1000 * 2 ** (quickCrashes - 1)) : 0;
+    logger.error("Worker exited unexpectedly", {workerPid: worker.process.pid, code, signal, respawnInMs: delay});
+    setTimeout(() => {
+        if(!shuttingDown){
+            fork();
+        }
+    }, delay);
+});
+
+// A worker that exits before listening is marked as retiring so the 'exit'
+// handler does not respawn it: a broken replacement would only crash-loop, and
+// the old worker it was meant to replace keeps serving. The mark has to be set
+// in the worker's own 'exit' listener, which runs before the cluster's.
+const waitUntilListening = (worker) => new Promise((resolve, reject) => {
+    const onExit = () => {
+        retiring.add(worker);
+        reject(new Error("Worker exited before listening"));
+    };
+    worker.once('exit', onExit);
+    worker.once('listening', () => {
+        worker.off('exit', onExit);
+        resolve();
+    });
+});
+
+// Asks a worker to drain and waits for it to exit, killing it if it takes too long.
+const stopWorker = (worker) => new Promise((resolve) => {
+    retiring.add(worker);
+    const timer = setTimeout(() => worker.kill('SIGKILL'), config.stopTimeoutMs);
+    worker.once('exit', () => {
+        clearTimeout(timer);
+        resolve();
+    });
+    if(worker.isConnected()){
+        worker.send({type: "texmage:shutdown"});
+    }else{
+        worker.kill('SIGTERM');
+    }
+});
+
+const rollingRestart = async () => {
+    if(restarting || shuttingDown){
+        return;
+    }
+    restarting = true;
+    logger.info("Rolling restart started", {workers: Object.keys(cluster.workers).length});
+    for(const worker of Object.values(cluster.workers)){
+        if(shuttingDown){
+            break;
+        }
+        const replacement = fork();
+        try {
+            await waitUntilListening(replacement);
+        } catch (error) {
+            // Keep the old worker serving; the new code is probably broken.
+            logger.error("Rolling restart aborted", {error: error.message});
+            break;
+        }
+        await stopWorker(worker);
+    }
+    restarting = false;
+    logger.info("Rolling restart finished");
+};
+
+const shutdown = async (signal) => {
+    if(shuttingDown){
+        return;
+    }
+    shuttingDown = true;
+    logger.info("Cluster shutting down", {signal});
+    await Promise.all(Object.values(cluster.workers).map(stopWorker));
+    process.exit(0);
+};
+
+process.on('SIGTERM', () => shutdown('SIGTERM'));
+process.on('SIGINT', () => shutdown('SIGINT'));
+process.on('SIGHUP', rollingRestart);
+
+for(let i = 0; i < config.workers; i++){
+    fork();
+}
+logger.info("Cluster supervisor started", {workers: config.workers});
@@ -1,14 +1,68 @@
 import mongoose from "mongoose";
+import logger from "../utils/logger.js";
+
+// MONGO_MAX_POOL_SIZE is the connection budget for the whole server. Under
+// cluster.js it is split between the workers, so adding workers does not
+// multiply the connections MongoDB has to hold open.
+const workerCount = Number(process.env.CLUSTER_WORKER_COUNT || 1);
+const maxPoolSize = Math.max(2, Math.ceil(Number(process.env.MONGO_MAX_POOL_SIZE || 100) / workerCount));
+
+const options = {
+    maxPoolSize,
+    minPoolSize: Math.min(maxPoolSize, Number(process.env.MONGO_MIN_POOL_SIZE || 2)),
+    maxIdleTimeMS: Number(process.env.MONGO_MAX_IDLE_TIME_MS || 60000),
+    // How long a query waits for a free pooled connection before failing.
+    waitQueueTimeoutMS: Number(process.env.MONGO_WAIT_QUEUE_TIMEOUT_MS || 5000),
+    serverSelectionTimeoutMS: Number(process.env.MONGO_SERVER_SELECTION_TIMEOUT_MS || 5000),
+    connectTimeoutMS: Number(process.env.MONGO_CONNECT_TIMEOUT_MS || 10000),
+    socketTimeoutMS: Number(process.env.MONGO_SOCKET_TIMEOUT_MS || 45000),
+    // Index builds on a large collection are not something to start implicitly
+    // on every production boot; verifyIndexes() below handles them explicitly.
+    autoIndex: process.env.MONGO_AUTO_INDEX ? process.env.MONGO_AUTO_INDEX === 'true' : process.env.NODE_ENV !== 'production',
+};
+
+// Compares each model's declared indexes with the ones in the database.
+// Missing indexes are built before the server starts taking traffic (unless
+// MONGO_BUILD_INDEXES=false, in which case they are only reported); indexes
+// that exist but are no longer declared are reported and left alone.
+const verifyIndexes = async () => {
+    for(const model of Object.values(mongoose.models)){
+        const collection = model.collection.collectionName;
+        let diff;
+        try {
+            diff = await model.diffIndexes();
+        } catch (error) {
+            // 26: the collection does not exist yet, so every index is missing.
+            if(error.code !== 26){
+                throw error;
+            }
+            diff = {toCreate: model.schema.indexes(), toDrop: []};
+        }
+        if(diff.toDrop.length){
+            logger.warn("Undeclared indexes found", {collection, indexes: diff.toDrop});
+        }
+        if(!diff.toCreate.length){
+            continue;
+        }
+        if(process.env.MONGO_BUILD_INDEXES === 'false'){
+            logger.error("Declared indexes are missing", {collection, indexes: diff.toCreate});
+            continue;
+        }
+        logger.info("Building missing indexes", {collection, indexes: diff.toCreate});
+        await model.createIndexes();
+    }
+};
 
 const connectDB = async () => {
     try {
-        await mongoose.connect(`${process.env.MONGODB_URI}/texmage`);
-        console.log("Database connection successful");
+        await mongoose.connect(`${process.env.MONGODB_URI}/texmage`, options);
+        logger.info("Database connection successful", {maxPoolSize, autoIndex: options.autoIndex});
+        await verifyIndexes();
     } catch (error) {
-        console.error("Database connection failed", error);
-        process.exit(0);
+        logger.error("Database connection failed", {error});
+        process.exit(1);
         
     }
 };
 
-export default connectDB;
\ No newline at end of file
+export default connectDB;
@@ -1,41 +1,278 @@
-import axios from "axios";
-import userModel from "../models/userSchema.js";
-import FormData from "form-data";
+import mongoose from "mongoose";
+import { pipeline } from "node:stream";
+import imageCache from "../utils/imageCache.js";
+import imageGenerator from "../utils/imageGenerator.js";
+import clipdropClient from "../utils/clipdropClient.js";
+import credits from "../utils/credits.js";
+import jobModel from "../models/jobSchema.js";
+import generationQueue from "../workers/generationQueue.js";
+import metrics from "../utils/metrics.js";
+import promptMiddleware from "../middlewares/prompt-middleware.js";
+
+const JOB_EVENTS_POLL_MS = Number(process.env.JOB_EVENTS_POLL_MS || 1000);
+
+// Clients that send `Accept: image/png` (or `?format=binary`) get the PNG streamed
+// straight through from ClipDrop, with the new balance in the X-Credit-Balance header.
+// Everyone else keeps the JSON response with a base64 data URL.
+const wantsBinary = (req) => req.query.format === 'binary' || req.accepts(['application/json', 'image/png']) === 'image/png';
+
+const sendImage = (res, image, creditBalance, binary, cacheStatus) => {
+    res.set('X-Cache', cacheStatus);
+    if(binary){
+        res.set({'Content-Type': 'image/png', 'X-Credit-Balance': String(creditBalance)});
+        return res.send(image);
+    }
+    const encodeDone = metrics.generationStageDuration.startTimer({stage: 'base64_encode'});
+    const resultImage = `data:image/png;base64,${image.toString('base64')}`;
+    encodeDone();
+    const serializeDone = metrics.generationStageDuration.startTimer({stage: 'json_serialize'});
+    const body = JSON.stringify({success: true, message: "Image generated", creditBalance, resultImage});
+    serializeDone();
+    return res.type('json').send(body);
+};
+
+const duplicateRequest = (res) => res.status(409).json({success: false, message: "Duplicate request."});
+
+// Pipes the upstream PNG to the client while keeping a copy of the chunks for the
+// cache and for identical requests that join while it streams. A stream that
+// breaks part-way refunds the credit.
+const streamImage = (req, res, upstream, upstreamHeaders, reservation, cacheKey, flight) => {
+    res.set({'Content-Type': 'image/png', 'X-Credit-Balance': String(reservation.creditBalance), 'X-Cache': 'MISS'});
+    if(upstreamHeaders['content-length']){
+        res.set('Content-Length', upstreamHeaders['content-length']);
+    }
+
+    const chunks = [];
+    let size = 0;
+    upstream.on('data', (chunk) => {
+        size += chunk.length;
+        if(size <= imageCache.maxEntryBytes){
+            chunks.push(chunk);
+        }
+    });
+
+    const done = metrics.generationStageDuration.startTimer({stage: 'upstream_stream'});
+    pipeline(upstream, res, (error) => {
+        done();
+        if(error){
+            req.log.warn("Image stream failed", {error: error.message});
+            flight.reject(error);
+            credits.refundCredit(reservation).catch((refundError) => req.log.error("Credit refund failed", {error: refundError}));
+            return;
+        }
+        metrics.upstreamResponseBytes.observe({}, size);
+        credits.completeReservation(reservation);
+        promptMiddleware.recordPrompt(req.userId, req.body.prompt);
+        if(size > imageCache.maxEntryBytes){
+            return flight.reject(new Error("Image too large to share"));
+        }
+        const image = Buffer.concat(chunks, size);
+        flight.resolve(image);
+        imageCache.set(cacheKey, image);
+    });
+};
 
 const generateImages = async (req, res) => {
     try {
         
         const userId = req.userId;
         const prompt = req.body.prompt;
+        const binary = wantsBinary(req);
+        const idempotencyKey = req.get('Idempotency-Key');
 
-        const user = await userModel.findById(userId);
+        if(!binary){
+            const result = await imageGenerator.generateImage(userId, prompt, idempotencyKey);
+            if(result.duplicate){
+                return duplicateRequest(res);
+            }
+            if(!result.success){
+                return res.json(result.failure);
+            }
+            promptMiddleware.recordPrompt(userId, prompt);
+            return sendImage(res, result.image, result.creditBalance, false, result.cacheStatus);
+        }
 
-        if(!user || !prompt) {
-            return res.json({success: false, message: "Missing details"});
+        const prepared = await imageGenerator.prepareGeneration(userId, prompt, idempotencyKey);
+        if(prepared.duplicate){
+            return duplicateRequest(res);
         }
-        if(user.creditBalance === 0 || userModel.creditBalance < 0){
-            return res.json({success: false, message: "You have no credits left.", credits: user.creditBalance});
+        if(prepared.failure){
+            return res.json(prepared.failure);
         }
 
-        const formData = new FormData();
-        formData.append('prompt', prompt); 
-        const {data} = await axios.post("https://clipdrop-api.co/text-to-image/v1", formData, {
-            headers: {
-                'x-api-key': process.env.CLIPDROP_KEY,
-           },
-           responseType: 'arraybuffer'
-        });
-        const base64image = Buffer.from(data, 'binary').toString('base64');
-        const resultImage = `data:image/png;base64,${base64image}`;
+        const {reservation, cacheKey, cached} = prepared;
+        if(cached){
+            await credits.completeReservation(reservation);
+            promptMiddleware.recordPrompt(userId, prompt);
+            return sendImage(res, cached, reservation.creditBalance, true, 'HIT');
+        }
 
-        await userModel.findByIdAndUpdate(user._id, {creditBalance: user.creditBalance-1});
+        // An identical prompt is already being generated: wait for it instead of calling ClipDrop again.
+        const inflight = imageGenerator.inflightImages.join(cacheKey);
+        if(inflight){
+            try {
+                // If the shared request fails, this one falls back to its own fetch.
+                const image = await inflight.catch(() => imageGenerator.fetchImage(prompt, cacheKey).then((result) => result.image));
+                await credits.completeReservation(reservation);
+                promptMiddleware.recordPrompt(userId, prompt);
+                return sendImage(res, image, reservation.creditBalance, true, 'JOINED');
+            } catch (error) {
+                await credits.refundCredit(reservation);
+                throw error;
+            }
+        }
 
-        res.json({success: true, message: "Image generated", creditBalance: user.creditBalance - 1, resultImage});
+        const flight = imageGenerator.inflightImages.begin(cacheKey);
+        let upstream;
+        try {
+            upstream = await clipdropClient.textToImage(prompt, 'stream');
+        } catch (error) {
+            flight.reject(error);
+            await credits.refundCredit(reservation);
+            throw error;
+        }
+        return streamImage(req, res, upstream.data, upstream.headers, reservation, cacheKey, flight);
 
     } catch (error) {
-        console.error(error);
-        res.json({success: false, message: "Error generarting image.", creditBalance: user.creditBalance - 1, resultImage});
+        if(error.code === 'CIRCUIT_OPEN'){
+            return res.status(503).set('Retry-After', String(error.retryAfterSeconds)).json({success: false, message: error.message});
+        }
+        req.log.error("Image generation failed", {error: error.message, upstreamStatus: error.response?.status});
+        res.json({success: false, message: "Error generarting image."});
+    }
+};
+
+const serializeJob = (job) => ({
+    id: job._id,
+    status: job.status,
+    prompt: job.prompt,
+    message: job.message,
+    creditBalance: job.creditBalance,
+    cacheStatus: job.cacheStatus,
+    createdAt: job.createdAt,
+    updatedAt: job.updatedAt,
+});
+
+// Fields serializeJob reads; status reads fetch only these, as plain objects.
+const JOB_FIELDS = {status: 1, prompt: 1, message: 1, creditBalance: 1, cacheStatus: 1, createdAt: 1, updatedAt: 1};
+
+const findUserJob = (req, projection = JOB_FIELDS) => {
+    if(!mongoose.isValidObjectId(req.params.id)){
+        return null;
     }
+    return jobModel.findOne({_id: req.params.id, userId: req.userId}, projection).lean();
+};
+
+// Reserves the credit up front so the queue never holds more work than the user can pay for.
+const submitJob = async (req, res) => {
+    try {
+        const prompt = req.body.prompt;
+        const prepared = await imageGenerator.prepareGeneration(req.userId, prompt, req.get('Idempotency-Key'));
+        if(prepared.duplicate){
+            if(!prepared.duplicate.jobId){
+                return duplicateRequest(res);
+            }
+            const existing = await jobModel.findById(prepared.duplicate.jobId, JOB_FIELDS).lean();
+            if(!existing){
+                // The job has expired; its reservation is about to.
+                return duplicateRequest(res);
+            }
+            return res.status(202).json({success: true, jobId: existing._id, job: serializeJob(existing)});
+        }
+        if(prepared.failure){
+            return res.json(prepared.failure);
+        }
+
+        const {reservation} = prepared;
+        const {job, error} = await generationQueue.enqueue(req.userId, prompt, reservation);
+        if(error){
+            await credits.refundCredit(reservation);
+            return res.status(error.status).json({success: false, message: error.message});
+        }
+        await credits.completeReservation(reservation, {jobId: job._id});
+        res.status(202).json({success: true, jobId: job._id, job: serializeJob(job)});
+    } catch (error) {
+        req.log.error("Generation job request failed", {error});
+        res.status(500).json({success: false, message: "Internal server error."});
+    }
+};
+
+const getJob = async (req, res) => {
+    try {
+        const job = await findUserJob(req);
+        if(!job){
+            return res.status(404).json({success: false, message: "Job not found."});
+        }
+        res.json({success: true, job: serializeJob(job)});
+    } catch (error) {
+        req.log.error("Generation job request failed", {error});
+        res.status(500).json({success: false, message: "Internal server error."});
+    }
+};
+
+const getJobResult = async (req, res) => {
+    try {
+        const job = await findUserJob(req, {...JOB_FIELDS, result: 1});
+        if(!job){
+            return res.status(404).json({success: false, message: "Job not found."});
+        }
+        if(job.status !== "succeeded"){
+            return res.status(409).json({success: false, message: "Image is not ready.", job: serializeJob(job)});
+        }
+        // Lean documents hold binary fields as BSON Binary.
+        sendImage(res, Buffer.from(job.result.buffer), job.creditBalance, wantsBinary(req), job.cacheStatus);
+    } catch (error) {
+        req.log.error("Generation job request failed", {error});
+        res.status(500).json({success: false, message: "Internal server error."});
+    }
+};
+
+// Server-Sent Events stream of a job's status. Updates from workers in this
+// process are pushed immediately; jobs run by separate worker processes are
+// picked up by polling MongoDB.
+const jobEvents = async (req, res) => {
+    const job = await findUserJob(req);
+    if(!job){
+        return res.status(404).json({success: false, message: "Job not found."});
+    }
+
+    res.set({
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'Connection': 'keep-alive',
+        'X-Accel-Buffering': 'no',
+    });
+    res.flushHeaders();
+
+    let lastStatus = null;
+    let closed = false;
+    const send = (current) => {
+        if(closed || !current || current.status === lastStatus){
+            return;
+        }
+        lastStatus = current.status;
+        res.write(`event: status\ndata: ${JSON.stringify(serializeJob(current))}\n\n`);
+        if(generationQueue.isFinished(current)){
+            close();
+            res.end();
+        }
+    };
+
+    const unsubscribe = generationQueue.onJobUpdate(job._id, send);
+    const poll = setInterval(() => {
+        jobModel.findById(job._id, JOB_FIELDS).lean().then(send).catch((error) => req.log.warn("Job status poll failed", {error: error.message}));
+    }, JOB_EVENTS_POLL_MS);
+    const heartbeat = setInterval(() => res.write(': ping\n\n'), 15000);
+
+    const close = () => {
+        closed = true;
+        unsubscribe();
+        clearInterval(poll);
+        clearInterval(heartbeat);
+    };
+    req.on('close', close);
+
+    send(job);
 };
 
-export default generateImages;
\ No newline at end of file
+export default {generateImages, submitJob, getJob, getJobResult, jobEvents};
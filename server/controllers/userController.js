@@ -1,5 +1,9 @@
+import crypto from "node:crypto";
 import userModel from "../models/userSchema.js";
 
+// The password hashing pool refuses work when it is saturated.
+const serverBusy = (res, error) => res.status(503).set('Retry-After', '1').json({success: false, message: error.message});
+
 const registerUser = async (req, res) => {
     try {
         const {name, email, password} = req.body;
@@ -8,7 +12,7 @@ const registerUser = async (req, res) => {
             return res.status(400).json({success: false, message: "Missing Details"});
         }
 
-        const userExists = await userModel.findOne({email: email});
+        const userExists = await userModel.exists({email: email});
         if(userExists){
             return res.status(400).json({success: false, message: "User already exists."}); 
         }
@@ -24,11 +28,14 @@ const registerUser = async (req, res) => {
                 user: { _id: newUser._id, name: newUser.name, email: newUser.email } 
             });
         } catch (error){
-            console.error("Error creating user ",error);
+            if(error.status === 503){
+                return serverBusy(res, error);
+            }
+            req.log.error("Error creating user", {error});
             return res.status(400).json({success: false, message: "Server error."});
         }
     } catch (error) {
-        console.error(error);
+        req.log.error("Signup failed", {error});
         return res.status(500).json({success: false, message: "Internal server error."}); 
     }
 };
@@ -36,14 +43,16 @@ const registerUser = async (req, res) => {
 const login = async (req, res) => {
         const {email, password} = req.body;
 
-        const userExists = await userModel.findOne({email: email});
+        // Hydrated (not lean) because a successful login may re-hash and save the password.
+        const userExists = await userModel.findOne({email: email}, {name: 1, email: 1, password: 1});
         if(!userExists){
-            res.status(400).json({success: false, message: "Invalid Credentials."});
+            return res.status(400).json({success: false, message: "Invalid Credentials."});
         }
 
         try {
             const validUser = await userExists.comparePassword(password);
             if(validUser){
+                userExists.upgradePasswordHash(password).catch((error) => req.log.error("Password rehash failed", {error}));
                 res.status(200).json({
                     success: true, 
                     message: "Login Successful", 
@@ -54,20 +63,26 @@ const login = async (req, res) => {
             }
             
         } catch (error) {
-            console.error(error);
+            if(error.status === 503){
+                return serverBusy(res, error);
+            }
+            req.log.error("Login failed", {error});
             res.status(500).json({success: false, message: "Internal server error."});
         }
 }
 
 const userCredits = async (req, res) => {
     try {
-        const userId = req.userId;
-        console.log("user id: ", userId);
-        
-        const User = await userModel.findById(userId); 
-        res.json({success: true, credits: User.creditBalance, name: User.name});
+        // userAuth already attached the (cached, lean, projected) user record.
+        const {creditBalance, name} = req.user;
+        const nameHash = crypto.createHash('sha1').update(name).digest('base64url').slice(0, 10);
+        res.set({'ETag': `W/"${creditBalance}-${nameHash}"`, 'Cache-Control': 'private, no-cache'});
+        if(req.fresh){
+            return res.status(304).end();
+        }
+        res.json({success: true, credits: creditBalance, name});
     } catch (error) {
-        console.error(error);
+        req.log.error("Loading credits failed", {error});
         res.json({success: false, message: error.message});
     }
 }
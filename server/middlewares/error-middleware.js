@@ -1,7 +1,14 @@
+import logger from "../utils/logger.js";
+
 const errorMiddleware = (err, req, res, next) => {
     const status = err.status || 500;
     const msg = err.message || "BACKEND ERROR";
     const extraInfo = err.extraDetails || "Error from backend";
+    const log = req.log || logger;
+
+    if(status >= 500){
+        log.error("Unhandled error", {error: err, method: req.method, path: req.path});
+    }
 
     return res.status(status).json({message: msg, details: extraInfo});
 };
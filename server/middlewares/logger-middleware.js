@@ -0,0 +1,44 @@
+import crypto from "node:crypto";
+import logger from "../utils/logger.js";
+
+// Gives every request an id (reusing an incoming X-Request-Id), a child logger
+// on req.log, and one access-log line when the response finishes. Access lines
+// are sampled per route with LOG_SAMPLE_RATES, e.g. "/credits=0.01,/login=0.1";
+// routes not listed use LOG_SAMPLE_RATE (default 1). 5xx responses are always logged.
+
+const parseSampleRates = (value = "") => Object.fromEntries(
+    value.split(",")
+        .map((pair) => pair.split("="))
+        .filter(([route, rate]) => route && rate !== undefined)
+        .map(([route, rate]) => [route.trim(), Number(rate)])
+);
+
+const sampleRates = parseSampleRates(process.env.LOG_SAMPLE_RATES);
+const defaultSampleRate = Number(process.env.LOG_SAMPLE_RATE ?? 1);
+
+const routeOf = (req) => req.route ? `${req.baseUrl}${req.route.path}` : req.baseUrl + req.path;
+
+const requestLogger = (req, res, next) => {
+    const started = process.hrtime.bigint();
+    req.id = req.get('X-Request-Id') || crypto.randomUUID();
+    req.log = logger.child({requestId: req.id});
+    res.set('X-Request-Id', req.id);
+
+    res.on('finish', () => {
+        const route = routeOf(req);
+        const rate = sampleRates[route] ?? defaultSampleRate;
+        if(res.statusCode < 500 && Math.random() >= rate){
+            return;
+        }
+        req.log.info("request", {
+            method: req.method,
+            route,
+            status: res.statusCode,
+            durationMs: Number(process.hrtime.bigint() - started) / 1e6,
+            userId: req.userId,
+        });
+    });
+    next();
+};
+
+export default requestLogger;
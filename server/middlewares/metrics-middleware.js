@@ -0,0 +1,28 @@
+import metrics from "../utils/metrics.js";
+
+// Records every request in the per-route duration histogram and tracks how many
+// are in flight. Routes are labelled by their Express pattern (/image/jobs/:id),
+// and anything that matched no route is grouped as "unmatched" to keep the
+// number of series bounded.
+
+const routeLabel = (req) => req.route ? `${req.baseUrl}${req.route.path}` : 'unmatched';
+
+const requestMetrics = (req, res, next) => {
+    const done = metrics.httpRequestDuration.startTimer();
+    metrics.httpRequestsInFlight.inc();
+
+    let finished = false;
+    const finish = () => {
+        if(finished){
+            return;
+        }
+        finished = true;
+        metrics.httpRequestsInFlight.dec();
+        done({method: req.method, route: routeLabel(req), status: res.statusCode});
+    };
+    res.on('finish', finish);
+    res.on('close', finish);
+    next();
+};
+
+export default requestMetrics;
@@ -0,0 +1,99 @@
+import crypto from "node:crypto";
+import fs from "node:fs";
+import { fileURLToPath } from "node:url";
+import createMatcher from "../utils/ahoCorasick.js";
+import createLruCache from "../utils/lruCache.js";
+import metrics from "../utils/metrics.js";
+import logger from "../utils/logger.js";
+import jobModel from "../models/jobSchema.js";
+
+// Checks on an already validated and normalized prompt (see
+// validators/promptValidator.js), run before a credit is reserved or the image
+// provider is called: a blocklist matched by an Aho-Corasick automaton, and a
+// per-user cap on repeating the same prompt within a short window. Only
+// successful generations count toward that cap, so retrying after running out
+// of credits, a rate limit or an upstream error is never blocked.
+
+const config = {
+    blocklistFile: process.env.PROMPT_BLOCKLIST_FILE || fileURLToPath(new URL("../config/prompt-blocklist.txt", import.meta.url)),
+    duplicateLimit: Number(process.env.PROMPT_DUPLICATE_LIMIT || 3),
+    duplicateWindowMs: Number(process.env.PROMPT_DUPLICATE_WINDOW_SECONDS || 60) * 1000,
+};
+
+const loadBlocklist = (file) => fs.readFileSync(file, "utf8")
+    .split("\n")
+    .map((line) => line.trim())
+    .filter((line) => line && !line.startsWith("#"));
+
+const blocklist = createMatcher(loadBlocklist(config.blocklistFile));
+const rejected = metrics.counter("prompt_rejected_total", "Generation requests rejected before reaching the provider");
+
+// userId -> Map(prompt hash -> timestamps of recent generations) for
+// /generate-image, which finishes in this process. Queued jobs are counted
+// from MongoDB instead, since any worker process may run them.
+const recentPrompts = createLruCache({
+    maxEntries: Number(process.env.PROMPT_DUPLICATE_MAX_USERS || 10000),
+    ttlMs: config.duplicateWindowMs,
+});
+
+const promptKey = (prompt) => crypto.createHash("sha1").update(prompt.toLowerCase()).digest("base64");
+
+const recentTimes = (userId, key, now) => (recentPrompts.get(userId)?.get(key) || []).filter((time) => now - time < config.duplicateWindowMs);
+
+// Called once an image for the prompt has been delivered.
+const recordPrompt = (userId, prompt) => {
+    if(!config.duplicateLimit){
+        return;
+    }
+    const key = promptKey(prompt);
+    const now = Date.now();
+    const prompts = recentPrompts.get(userId) || new Map();
+    prompts.set(key, [...recentTimes(userId, key, now), now]);
+    recentPrompts.set(userId, prompts);
+};
+
+const succeededJobs = async (userId, prompt, since) => {
+    const jobs = await jobModel.find(
+        {userId, status: "succeeded", updatedAt: {$gte: since}},
+        {prompt: 1}
+    ).lean();
+    const folded = prompt.toLowerCase();
+    return jobs.filter((job) => job.prompt.toLowerCase() === folded).length;
+};
+
+// PROMPT_DUPLICATE_LIMIT=0 turns the check off.
+const isRepeatedTooOften = async (userId, prompt) => {
+    if(!config.duplicateLimit){
+        return false;
+    }
+    const now = Date.now();
+    const generated = recentTimes(userId, promptKey(prompt), now).length;
+    if(generated >= config.duplicateLimit){
+        return true;
+    }
+    const queued = await succeededJobs(userId, prompt, new Date(now - config.duplicateWindowMs));
+    return generated + queued >= config.duplicateLimit;
+};
+
+const promptGuard = async (req, res, next) => {
+    const {prompt} = req.body;
+
+    if(blocklist.find(prompt)){
+        rejected.inc({reason: "blocklist"});
+        return res.status(400).json({success: false, message: "This prompt is not allowed."});
+    }
+    const repeated = await isRepeatedTooOften(req.userId, prompt).catch((error) => {
+        // Not worth failing a paid request over.
+        logger.warn("Duplicate prompt check failed", {error: error.message});
+        return false;
+    });
+    if(repeated){
+        rejected.inc({reason: "duplicate"});
+        return res.status(429)
+            .set("Retry-After", String(Math.ceil(config.duplicateWindowMs / 1000)))
+            .json({success: false, message: "You just generated this prompt. Try something different."});
+    }
+    next();
+};
+
+export default {promptGuard, recordPrompt};
@@ -0,0 +1,73 @@
+import rateLimitStore from "../utils/rateLimitStore.js";
+import metrics from "../utils/metrics.js";
+import logger from "../utils/logger.js";
+
+// Token-bucket rate limiting per route. Each route names its limits for up to
+// three scopes, checked most specific first:
+//
+//     rateLimit("login", {ip: {capacity: 10, perMinute: 10}, global: {...}})
+//
+//   user   - one bucket per authenticated user (use after userAuth)
+//   ip     - one bucket per client address (set TRUST_PROXY behind a proxy)
+//   global - one bucket for the whole route
+//
+// Any limit can be overridden with RATE_LIMIT_<ROUTE>_<SCOPE>=capacity:perMinute,
+// or switched off with the value "off". RATE_LIMIT_ENABLED=false disables all of them.
+// Buckets live in memory unless RATE_LIMIT_STORE=mongo shares them between
+// processes, which is the default under the cluster supervisor.
+
+const enabled = process.env.RATE_LIMIT_ENABLED !== 'false';
+const store = rateLimitStore.createStore();
+const rejected = metrics.counter("rate_limited_total", "Requests rejected by the rate limiter");
+
+const SCOPES = {
+    user: (req) => req.userId,
+    ip: (req) => req.ip,
+    global: () => "all",
+};
+
+const resolveLimit = (name, scope, limit) => {
+    const override = process.env[`RATE_LIMIT_${name}_${scope}`.toUpperCase().replace(/-/g, '_')];
+    if(override === 'off'){
+        return null;
+    }
+    if(override){
+        const [capacity, perMinute] = override.split(':').map(Number);
+        limit = {capacity, perMinute};
+    }
+    return limit && {capacity: limit.capacity, refillPerSecond: limit.perMinute / 60};
+};
+
+const rateLimit = (name, limits) => {
+    const checks = Object.keys(SCOPES)
+        .map((scope) => ({scope, limit: resolveLimit(name, scope, limits[scope])}))
+        .filter(({limit}) => limit);
+
+    if(!enabled || !checks.length){
+        return (req, res, next) => next();
+    }
+
+    return async (req, res, next) => {
+        try {
+            for(const {scope, limit} of checks){
+                const subject = SCOPES[scope](req);
+                if(!subject){
+                    continue;
+                }
+                const {allowed, retryAfterMs} = await store.take(`${name}:${scope}:${subject}`, limit);
+                if(!allowed){
+                    rejected.inc({route: name, scope});
+                    return res.status(429)
+                        .set('Retry-After', String(Math.max(1, Math.ceil(retryAfterMs / 1000))))
+                        .json({success: false, message: "Too many requests. Try again later."});
+                }
+            }
+        } catch (error) {
+            // A broken shared store should not take the API down with it.
+            (req.log || logger).warn("Rate limit store unavailable", {error: error.message});
+        }
+        next();
+    };
+};
+
+export default rateLimit;
@@ -0,0 +1,132 @@
+import fs from "node:fs";
+import path from "node:path";
+import { pipeline } from "node:stream";
+import { fileURLToPath } from "node:url";
+import logger from "../utils/logger.js";
+
+// Serves the built client (client/dist) from the API process. The directory is
+// indexed once at startup. Files precompressed by the client build (.br, .gz)
+// are sent when the browser accepts them. Vite's content-hashed files under
+// /assets/ are cached for a year as immutable; index.html is revalidated on
+// every load, so a deploy takes effect immediately. Paths without an extension
+// that the browser requests as HTML get index.html, for client-side routes.
+
+const config = {
+    enabled: process.env.SERVE_CLIENT !== 'false',
+    root: path.resolve(process.env.CLIENT_DIST_DIR || fileURLToPath(new URL("../../client/dist", import.meta.url))),
+};
+
+const CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".mjs": "text/javascript; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".json": "application/json; charset=utf-8",
+    ".map": "application/json; charset=utf-8",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+    ".ico": "image/x-icon",
+    ".woff2": "font/woff2",
+    ".txt": "text/plain; charset=utf-8",
+    ".webmanifest": "application/manifest+json",
+};
+
+const IMMUTABLE = "public, max-age=31536000, immutable";
+const REVALIDATE = "no-cache";
+const SHORT_LIVED = "public, max-age=3600";
+
+const describe = (file) => {
+    const {size, mtimeMs} = fs.statSync(file);
+    return {file, size, etag: `"${size.toString(16)}-${Math.floor(mtimeMs).toString(16)}"`};
+};
+
+const buildIndex = (root) => {
+    const files = new Map();
+    const walk = (dir) => {
+        for(const entry of fs.readdirSync(dir, {withFileTypes: true})){
+            const full = path.join(dir, entry.name);
+            if(entry.isDirectory()){
+                walk(full);
+            }else if(!full.endsWith(".br") && !full.endsWith(".gz")){
+                const urlPath = "/" + path.relative(root, full).split(path.sep).join("/");
+                const variant = (ext) => fs.existsSync(full + ext) ? describe(full + ext) : null;
+                files.set(urlPath, {
+                    ...describe(full),
+                    type: CONTENT_TYPES[path.extname(full).toLowerCase()] || "application/octet-stream",
+                    cacheControl: urlPath.startsWith("/assets/") ? IMMUTABLE : urlPath === "/index.html" ? REVALIDATE : SHORT_LIVED,
+                    br: variant(".br"),
+                    gzip: variant(".gz"),
+                });
+            }
+        }
+    };
+    walk(root);
+    return files;
+};
+
+const lookup = (files, req) => {
+    let urlPath;
+    try {
+        urlPath = decodeURIComponent(req.path);
+    } catch {
+        return null;
+    }
+    if(urlPath.endsWith("/")){
+        urlPath += "index.html";
+    }
+    const asset = files.get(urlPath);
+    if(asset){
+        return asset;
+    }
+    const isClientRoute = !path.extname(urlPath) && req.accepts(["json", "html"]) === "html";
+    return isClientRoute ? files.get("/index.html") : null;
+};
+
+const createStaticHandler = () => {
+    if(!config.enabled || !fs.existsSync(path.join(config.root, "index.html"))){
+        logger.info("Client build not served", {root: config.root, enabled: config.enabled});
+        return (req, res, next) => next();
+    }
+    const files = buildIndex(config.root);
+    logger.info("Serving client build", {root: config.root, files: files.size});
+
+    return (req, res, next) => {
+        if(req.method !== "GET" && req.method !== "HEAD"){
+            return next();
+        }
+        const asset = lookup(files, req);
+        if(!asset){
+            return next();
+        }
+
+        const encoding = req.acceptsEncodings(["br", "gzip", "identity"]);
+        const variant = (encoding === "br" || encoding === "gzip") && asset[encoding] ? asset[encoding] : asset;
+        res.set({
+            "Content-Type": asset.type,
+            "Content-Length": String(variant.size),
+            "Cache-Control": asset.cacheControl,
+            "ETag": variant.etag,
+            "Vary": "Accept-Encoding",
+        });
+        if(variant !== asset){
+            res.set("Content-Encoding", encoding);
+        }
+        if(req.fresh){
+            return res.status(304).end();
+        }
+        if(req.method === "HEAD"){
+            return res.end();
+        }
+        pipeline(fs.createReadStream(variant.file), res, (error) => {
+            if(error && error.code !== "ERR_STREAM_PREMATURE_CLOSE"){
+                req.log.warn("Static file stream failed", {file: variant.file, error: error.message});
+            }
+        });
+    };
+};
+
+export default createStaticHandler;
@@ -1,4 +1,26 @@
 import jwt from "jsonwebtoken";
+import createLruCache from "../utils/lruCache.js";
+import userCache from "../utils/userCache.js";
+
+// Tokens that already passed jwt.verify, mapped to their userId. Entries never
+// outlive the token's own `exp`.
+const verifiedTokens = createLruCache({
+    maxEntries: Number(process.env.TOKEN_CACHE_MAX_ENTRIES || 10000),
+    ttlMs: Number(process.env.TOKEN_CACHE_TTL_SECONDS || 15 * 60) * 1000,
+});
+
+const verifyToken = (token) => {
+    const cached = verifiedTokens.get(token);
+    if(cached){
+        return cached;
+    }
+    const tokenDecode = jwt.verify(token, process.env.SECRET_KEY);
+    if(tokenDecode.userId){
+        const ttl = tokenDecode.exp ? tokenDecode.exp * 1000 - Date.now() : undefined;
+        verifiedTokens.set(token, {userId: tokenDecode.userId}, ttl);
+    }
+    return tokenDecode;
+};
 
 const validate = (schema) => async (req, res, next) => {
     try {
@@ -12,7 +34,7 @@ const validate = (schema) => async (req, res, next) => {
             extraDetails: err.errors ? err.errors[0].message: "Validation Error"
         };
 
-        console.error(error);
+        req.log.debug("Validation failed", {details: error.extraDetails});
         next(error);
     }
 };
@@ -25,11 +47,15 @@ const userAuth = async (req, res, next) => {
     }
 
     try {
-        const tokenDecode = jwt.verify(token, process.env.SECRET_KEY);
-        console.log("Decoded token: ", tokenDecode);
+        const tokenDecode = verifyToken(token);
         
         if(tokenDecode.userId){
+            const user = await userCache.get(tokenDecode.userId);
+            if(!user){
+                return res.json({success: false, message: "Not authorized. login again"});
+            }
             req.userId = tokenDecode.userId;
+            req.user = user;
             return next();
         }else{
             return res.json({success: false, message: "Not authorized. login again"})
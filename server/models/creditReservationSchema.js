@@ -0,0 +1,41 @@
+import mongoose from "mongoose";
+import queryMonitor from "../utils/queryMonitor.js";
+
+// One record per Idempotency-Key a user sends with a generation request. It
+// stops a retried request from spending a second credit, and points retried
+// job submissions at the job that was already created.
+const creditReservationSchema = new mongoose.Schema({
+    userId: {
+        type: mongoose.Schema.Types.ObjectId,
+        ref: "user",
+        required: true
+    },
+    key: {
+        type: String,
+        required: true
+    },
+    status: {
+        type: String,
+        enum: ["reserved", "completed"],
+        default: "reserved"
+    },
+    jobId: {
+        type: mongoose.Schema.Types.ObjectId,
+        ref: "job"
+    },
+    // Never outlives the job it points at: jobs are kept JOB_RESULT_TTL_SECONDS
+    // after they finish (see workers/generationQueue.js), and the reservation
+    // is made before the job starts.
+    expireAt: {
+        type: Date,
+        default: () => new Date(Date.now() + Number(process.env.JOB_RESULT_TTL_SECONDS || 60 * 60) * 1000)
+    }
+});
+
+creditReservationSchema.index({userId: 1, key: 1}, {unique: true});
+creditReservationSchema.index({expireAt: 1}, {expireAfterSeconds: 0});
+
+queryMonitor.instrumentSchema(creditReservationSchema, "creditReservation");
+
+const creditReservationModel = mongoose.models.creditReservation || mongoose.model("creditReservation", creditReservationSchema);
+export default creditReservationModel;
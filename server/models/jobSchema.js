@@ -0,0 +1,48 @@
+import mongoose from "mongoose";
+import queryMonitor from "../utils/queryMonitor.js";
+
+const jobSchema = new mongoose.Schema({
+    userId: {
+        type: mongoose.Schema.Types.ObjectId,
+        ref: "user",
+        required: true
+    },
+    prompt: {
+        type: String,
+        required: true
+    },
+    status: {
+        type: String,
+        enum: ["queued", "running", "succeeded", "failed"],
+        default: "queued"
+    },
+    attempts: {
+        type: Number,
+        default: 0
+    },
+    workerId: String,
+    lockedAt: Date,
+    message: String,
+    // Balance right after the job's credit was reserved (or refunded).
+    creditBalance: Number,
+    creditCharged: Boolean,
+    // Set by the run that refunded the credit, so a requeued job is refunded once.
+    creditRefunded: Boolean,
+    idempotencyKey: String,
+    cacheStatus: String,
+    result: {
+        type: Buffer,
+        select: false
+    },
+    // Finished jobs are removed by MongoDB once this date has passed.
+    expireAt: Date
+}, {timestamps: true});
+
+jobSchema.index({status: 1, createdAt: 1});
+jobSchema.index({userId: 1, status: 1});
+jobSchema.index({expireAt: 1}, {expireAfterSeconds: 0});
+
+queryMonitor.instrumentSchema(jobSchema, "job");
+
+const jobModel = mongoose.models.job || mongoose.model("job", jobSchema);
+export default jobModel;
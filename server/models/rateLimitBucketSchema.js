@@ -0,0 +1,19 @@
+import mongoose from "mongoose";
+
+// Token bucket shared by every server process when RATE_LIMIT_STORE=mongo.
+// Buckets that have been idle long enough to refill completely are removed.
+const rateLimitBucketSchema = new mongoose.Schema({
+    key: {
+        type: String,
+        required: true
+    },
+    tokens: Number,
+    updatedAt: Date,
+    expireAt: Date
+});
+
+rateLimitBucketSchema.index({key: 1}, {unique: true});
+rateLimitBucketSchema.index({expireAt: 1}, {expireAfterSeconds: 0});
+
+const rateLimitBucketModel = mongoose.models.rateLimitBucket || mongoose.model("rateLimitBucket", rateLimitBucketSchema);
+export default rateLimitBucketModel;
@@ -1,6 +1,8 @@
 import mongoose from "mongoose";
-import bcrypt from "bcrypt";
 import jwt from "jsonwebtoken";
+import hashPool from "../utils/hashPool.js";
+import logger from "../utils/logger.js";
+import queryMonitor from "../utils/queryMonitor.js";
 
 const userSchema = new mongoose.Schema({
     name: {
@@ -9,8 +11,7 @@ const userSchema = new mongoose.Schema({
     },
     email: {
         type: String,
-        required: true,
-        unique: true
+        required: true
     },
     password: {
         type: String,
@@ -20,20 +21,26 @@ const userSchema = new mongoose.Schema({
     creditBalance: {
         type: Number,
         default: 5
+    },
+    // Whether an image served from the generation cache still costs a credit.
+    // Unset means the server-wide IMAGE_CACHE_CHARGE_HITS default applies.
+    chargeCacheHits: {
+        type: Boolean
     }
 });
 
+// Login and signup look users up by email.
+userSchema.index({email: 1}, {unique: true});
+
 userSchema.pre('save', async function (next) {
     const user = this;
 
     if (!user.isModified("password")){
-        next();
+        return next();
     }
 
     try {
-        const saltRound = await bcrypt.genSalt(10);
-        const hashedPassword = await bcrypt.hash(user.password, saltRound);
-        user.password = hashedPassword;
+        user.password = await hashPool.hash(user.password);
     } catch (error) {
         next(error);
     }
@@ -41,13 +48,23 @@ userSchema.pre('save', async function (next) {
 
 userSchema.methods.comparePassword = async function (plainPassword) {
     try {
-        return bcrypt.compare(plainPassword, this.password);
+        return await hashPool.compare(plainPassword, this.password);
     } catch (error) {
-        console.error(error);
+        logger.error("Password comparison failed", {error});
         throw error;
     }
 };
 
+// Re-hashes the password with the current cost factor if it was stored with a
+// lower one. Called after a successful login, while the plain password is known.
+userSchema.methods.upgradePasswordHash = async function (plainPassword) {
+    if (!hashPool.needsRehash(this.password)) {
+        return;
+    }
+    this.password = plainPassword;
+    await this.save();
+};
+
 userSchema.methods.generateToken = async function () {
     try {
         return jwt.sign({
@@ -60,10 +77,12 @@ userSchema.methods.generateToken = async function () {
         }
         )
     } catch (error) {
-        console.error(error);
+        logger.error("Token generation failed", {error});
         
     }
 }
 
+queryMonitor.instrumentSchema(userSchema, "user");
+
 const userModel = mongoose.models.user || mongoose.model("user", userSchema);
 export default userModel;
\ No newline at end of file
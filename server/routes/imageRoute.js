@@ -1,8 +1,27 @@
 import express from "express";
 import userMiddleware from "../middlewares/user-middleware.js";
-import generateImages from "../controllers/imageController.js";
+import imageController from "../controllers/imageController.js";
+import rateLimit from "../middlewares/rate-limit-middleware.js";
+import promptMiddleware from "../middlewares/prompt-middleware.js";
+import promptSchema from "../validators/promptValidator.js";
 const router = express.Router();
 
-router.route("/generate-image").post(userMiddleware.userAuth, generateImages);
 
-export default router;
\ No newline at end of file
+// Generation is bound by the upstream provider; status reads are cheap but polled.
+const generateLimit = rateLimit("generate", {
+    user: {capacity: 5, perMinute: 10},
+    ip: {capacity: 20, perMinute: 60},
+    global: {capacity: 50, perMinute: 600},
+});
+const jobStatusLimit = rateLimit("job-status", {user: {capacity: 60, perMinute: 600}});
+
+// Prompts are validated and screened before any credit is reserved.
+const checkPrompt = [userMiddleware.validate(promptSchema), promptMiddleware.promptGuard];
+
+router.route("/generate-image").post(userMiddleware.userAuth, generateLimit, checkPrompt, imageController.generateImages);
+router.route("/jobs").post(userMiddleware.userAuth, generateLimit, checkPrompt, imageController.submitJob);
+router.route("/jobs/:id").get(userMiddleware.userAuth, jobStatusLimit, imageController.getJob);
+router.route("/jobs/:id/result").get(userMiddleware.userAuth, jobStatusLimit, imageController.getJobResult);
+router.route("/jobs/:id/events").get(userMiddleware.userAuth, jobStatusLimit, imageController.jobEvents);
+
+export default router;
@@ -4,9 +4,16 @@ import signUpSchema from "../validators/signupValidator.js";
 import loginSchema from "../validators/loginValidator.js";
 import userController from "../controllers/userController.js";
 import userMiddleware from "../middlewares/user-middleware.js";
+import rateLimit from "../middlewares/rate-limit-middleware.js";
 
-router.route("/signup").post(userMiddleware.validate(signUpSchema),userController.registerUser);
-router.route("/login").post(userMiddleware.validate(loginSchema), userController.login);
-router.route("/credits").get(userMiddleware.userAuth, userController.userCredits);
+// Signup and login are bound by password hashing, so they are limited per
+// address and overall before any bcrypt work is queued.
+const signupLimit = rateLimit("signup", {ip: {capacity: 10, perMinute: 5}, global: {capacity: 100, perMinute: 600}});
+const loginLimit = rateLimit("login", {ip: {capacity: 10, perMinute: 10}, global: {capacity: 200, perMinute: 1200}});
+const creditsLimit = rateLimit("credits", {user: {capacity: 30, perMinute: 120}});
+
+router.route("/signup").post(signupLimit, userMiddleware.validate(signUpSchema),userController.registerUser);
+router.route("/login").post(loginLimit, userMiddleware.validate(loginSchema), userController.login);
+router.route("/credits").get(userMiddleware.userAuth, creditsLimit, userController.userCredits);
 
 export default router;
\ No newline at end of file
@@ -1,24 +1,86 @@
 import express from 'express';
+import mongoose from 'mongoose';
 import cors from 'cors';
 import 'dotenv/config' 
 import connectDB from "./config/mongodb.js"
 import userRoute from "./routes/userRoute.js"
 import imageRoute from "./routes/imageRoute.js"
 import errorMiddleware from './middlewares/error-middleware.js';
+import generationQueue from './workers/generationQueue.js';
+import requestLogger from './middlewares/logger-middleware.js';
+import logger from './utils/logger.js';
+import requestMetrics from './middlewares/metrics-middleware.js';
+import metrics from './utils/metrics.js';
+import hashPool from './utils/hashPool.js';
+import imageCache from './utils/imageCache.js';
+import imageGenerator from './utils/imageGenerator.js';
+import userCache from './utils/userCache.js';
+import clipdropClient from './utils/clipdropClient.js';
+import lifecycle from './utils/lifecycle.js';
+import createStaticHandler from './middlewares/static-middleware.js';
 
 const PORT = process.env.PORT || 3000
+const SHUTDOWN_TIMEOUT_MS = Number(process.env.SHUTDOWN_TIMEOUT_MS || 8000);
 const app = express()
 
+// Needed for per-IP rate limits behind a reverse proxy, e.g. TRUST_PROXY=1.
+if(process.env.TRUST_PROXY){
+    app.set('trust proxy', Number(process.env.TRUST_PROXY) || process.env.TRUST_PROXY);
+}
+
+app.use(requestLogger);
+app.use(requestMetrics);
+app.use(lifecycle.drainConnections);
 app.use(express.json());
-app.use(cors());
+app.use(cors({exposedHeaders: ['X-Credit-Balance', 'X-Cache', 'X-Request-Id']}));
+
+metrics.collectStats("hash_pool", "Password hashing pool", hashPool.getStats);
+metrics.collectStats("image_cache", "Generated image cache", imageCache.getStats);
+metrics.collectStats("image_inflight", "Shared upstream image requests", imageGenerator.inflightImages.getStats);
+metrics.collectStats("user_cache", "Authenticated user cache", userCache.getStats);
+metrics.collectStats("upstream", "ClipDrop client", clipdropClient.getStats);
+app.get("/metrics", metrics.handler);
+app.get("/health", lifecycle.health);
 
 app.use("/", userRoute);
 app.use("/image", imageRoute);
+// The built client, when present (client/dist or CLIENT_DIST_DIR).
+app.use(createStaticHandler());
 
 app.use(errorMiddleware);
 
+let server;
+
+// Stops accepting connections, lets in-flight requests finish (up to
+// SHUTDOWN_TIMEOUT_MS), then closes the database connection and exits.
+lifecycle.onShutdown((reason) => {
+    if(lifecycle.getState() === "draining"){
+        return;
+    }
+    lifecycle.setState("draining");
+    logger.info("Draining before shutdown", {reason});
+    generationQueue.stopWorkers();
+
+    setTimeout(() => {
+        logger.warn("Shutdown timed out with requests still open", {inFlight: metrics.httpRequestsInFlight.get()});
+        process.exit(1);
+    }, SHUTDOWN_TIMEOUT_MS).unref();
+
+    const exit = () => mongoose.disconnect().finally(() => process.exit(0));
+    if(!server){
+        return exit();
+    }
+    server.close(exit);
+    server.closeIdleConnections();
+});
+process.on('SIGTERM', () => lifecycle.requestShutdown('SIGTERM'));
+process.on('SIGINT', () => lifecycle.requestShutdown('SIGINT'));
+
 connectDB().then(()=>{
-    app.listen(PORT, ()=>{
-    console.log(`Server running on port http://localhost:${PORT}`);
+    // Set JOB_WORKERS=0 when generation jobs run in separate `npm run worker` processes.
+    generationQueue.startWorkers();
+    server = app.listen(PORT, ()=>{
+    lifecycle.setState("ready");
+    logger.info(`Server running on port http://localhost:${PORT}`);
 })
 })
\ No newline at end of file
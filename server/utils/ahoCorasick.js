@@ -0,0 +1,72 @@
+// Aho-Corasick automaton for matching many blocklist phrases in one pass over
+// the text, in time linear in the text length regardless of how many phrases
+// there are. Phrases are matched case-insensitively and only on word
+// boundaries, so "class" does not match a blocked "ass".
+
+const isWordChar = (char) => char !== undefined && /[\p{L}\p{N}]/u.test(char);
+
+const createMatcher = (phrases) => {
+    // Node 0 is the root. Each node has transitions, a failure link and the
+    // lengths of the phrases that end there (including via failure links).
+    const next = [new Map()];
+    const fail = [0];
+    const outputs = [[]];
+
+    for(const phrase of phrases){
+        const word = phrase.trim().toLowerCase();
+        if(!word){
+            continue;
+        }
+        let node = 0;
+        for(const char of word){
+            if(!next[node].has(char)){
+                next.push(new Map());
+                fail.push(0);
+                outputs.push([]);
+                next[node].set(char, next.length - 1);
+            }
+            node = next[node].get(char);
+        }
+        outputs[node].push(word);
+    }
+
+    // Breadth-first, so a node's failure target is always finished before the node.
+    const queue = [...next[0].values()];
+    for(let head = 0; head < queue.length; head++){
+        const node = queue[head];
+        for(const [char, child] of next[node]){
+            let target = fail[node];
+            while(target && !next[target].has(char)){
+                target = fail[target];
+            }
+            const candidate = next[target].get(char);
+            fail[child] = candidate !== undefined && candidate !== child ? candidate : 0;
+            outputs[child] = [...outputs[child], ...outputs[fail[child]]];
+            queue.push(child);
+        }
+    }
+
+    // Returns the first phrase found in text on word boundaries, or null.
+    const find = (text) => {
+        const chars = [...text.toLowerCase()];
+        let node = 0;
+        for(let i = 0; i < chars.length; i++){
+            const char = chars[i];
+            while(node && !next[node].has(char)){
+                node = fail[node];
+            }
+            node = next[node].get(char) ?? 0;
+            for(const word of outputs[node]){
+                const start = i - [...word].length + 1;
+                if(!isWordChar(chars[start - 1]) && !isWordChar(chars[i + 1])){
+                    return word;
+                }
+            }
+        }
+        return null;
+    };
+
+    return {find, size: next.length};
+};
+
+export default createMatcher;
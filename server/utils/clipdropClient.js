@@ -0,0 +1,181 @@
+import http from "node:http";
+import https from "node:https";
+import axios from "axios";
+import FormData from "form-data";
+import metrics from "./metrics.js";
+import logger from "./logger.js";
+
+// Client for the ClipDrop text-to-image API. Connections are kept alive in a
+// bounded pool, connects and reads time out, 429/5xx responses and network
+// errors are retried with jittered backoff, and a circuit breaker fails calls
+// fast while the provider keeps failing.
+
+const config = {
+    url: process.env.CLIPDROP_API_URL || "https://clipdrop-api.co/text-to-image/v1",
+    maxSockets: Number(process.env.CLIPDROP_MAX_SOCKETS || 32),
+    maxFreeSockets: Number(process.env.CLIPDROP_MAX_FREE_SOCKETS || 8),
+    connectTimeoutMs: Number(process.env.CLIPDROP_CONNECT_TIMEOUT_MS || 5000),
+    // Longest gap allowed between bytes once connected.
+    readTimeoutMs: Number(process.env.CLIPDROP_READ_TIMEOUT_MS || 60000),
+    maxRetries: Number(process.env.CLIPDROP_MAX_RETRIES ?? 2),
+    retryBaseMs: Number(process.env.CLIPDROP_RETRY_BASE_MS || 250),
+    retryMaxMs: Number(process.env.CLIPDROP_RETRY_MAX_MS || 4000),
+    breakerThreshold: Number(process.env.CLIPDROP_BREAKER_THRESHOLD || 5),
+    breakerCooldownMs: Number(process.env.CLIPDROP_BREAKER_COOLDOWN_SECONDS || 30) * 1000,
+};
+
+const RETRYABLE_CODES = new Set(['ECONNRESET', 'ECONNREFUSED', 'ETIMEDOUT', 'ECONNABORTED', 'EPIPE', 'EAI_AGAIN', 'UPSTREAM_CONNECT_TIMEOUT']);
+
+// Agents that destroy a socket which has not finished connecting (including
+// the TLS handshake) within connectTimeoutMs.
+const withConnectTimeout = (Agent, connectedEvent) => class extends Agent {
+    createConnection(options, callback) {
+        const socket = super.createConnection(options, callback);
+        const timer = setTimeout(() => {
+            const error = new Error(`Upstream connect timed out after ${config.connectTimeoutMs}ms`);
+            error.code = 'UPSTREAM_CONNECT_TIMEOUT';
+            socket.destroy(error);
+        }, config.connectTimeoutMs);
+        socket.once(connectedEvent, () => clearTimeout(timer));
+        socket.once('close', () => clearTimeout(timer));
+        return socket;
+    }
+};
+
+const agentOptions = {keepAlive: true, maxSockets: config.maxSockets, maxFreeSockets: config.maxFreeSockets, scheduling: 'lifo'};
+const HttpAgent = withConnectTimeout(http.Agent, 'connect');
+const HttpsAgent = withConnectTimeout(https.Agent, 'secureConnect');
+
+const client = axios.create({
+    httpAgent: new HttpAgent(agentOptions),
+    httpsAgent: new HttpsAgent(agentOptions),
+    timeout: config.readTimeoutMs,
+    maxRedirects: 0,
+});
+
+// Circuit breaker: closed -> open after breakerThreshold consecutive failures;
+// open -> half-open after the cooldown, letting a single probe through;
+// the probe's outcome closes or re-opens the circuit.
+const breaker = {state: 'closed', failures: 0, openedAt: 0, probing: false};
+const BREAKER_STATES = {closed: 0, 'half-open': 1, open: 2};
+const breakerGauge = metrics.gauge("upstream_circuit_state", "ClipDrop circuit breaker state (0 closed, 1 half-open, 2 open)");
+const retryCounter = metrics.counter("upstream_retries_total", "ClipDrop requests retried, by reason");
+breakerGauge.set({}, 0);
+
+const setBreakerState = (state) => {
+    if(breaker.state !== state){
+        logger.warn("ClipDrop circuit state changed", {from: breaker.state, to: state});
+    }
+    breaker.state = state;
+    breakerGauge.set({}, BREAKER_STATES[state]);
+};
+
+const circuitOpenError = () => {
+    const error = new Error("Image provider is unavailable. Try again shortly.");
+    error.code = 'CIRCUIT_OPEN';
+    error.status = 503;
+    error.retryAfterSeconds = Math.max(1, Math.ceil((breaker.openedAt + config.breakerCooldownMs - Date.now()) / 1000));
+    return error;
+};
+
+const acquirePermit = () => {
+    if(breaker.state === 'open'){
+        if(Date.now() - breaker.openedAt < config.breakerCooldownMs){
+            throw circuitOpenError();
+        }
+        setBreakerState('half-open');
+    }
+    if(breaker.state === 'half-open'){
+        if(breaker.probing){
+            throw circuitOpenError();
+        }
+        breaker.probing = true;
+    }
+};
+
+const recordSuccess = () => {
+    breaker.failures = 0;
+    breaker.probing = false;
+    setBreakerState('closed');
+};
+
+const recordFailure = () => {
+    breaker.failures++;
+    breaker.probing = false;
+    if(breaker.state === 'half-open' || breaker.failures >= config.breakerThreshold){
+        breaker.openedAt = Date.now();
+        setBreakerState('open');
+    }
+};
+
+const isRetryable = (error) => {
+    const status = error.response?.status;
+    if(status){
+        return status === 429 || status >= 500;
+    }
+    return RETRYABLE_CODES.has(error.code);
+};
+
+// Full-jitter exponential backoff, or the provider's Retry-After when it sent
+// one, capped at retryMaxMs either way.
+const retryDelay = (error, attempt) => {
+    const retryAfter = Number(error.response?.headers?.['retry-after']);
+    if(retryAfter > 0){
+        return Math.min(retryAfter * 1000, config.retryMaxMs);
+    }
+    return Math.random() * Math.min(config.retryMaxMs, config.retryBaseMs * 2 ** attempt);
+};
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+const postPrompt = (prompt, responseType) => {
+    const formData = new FormData();
+    formData.append('prompt', prompt);
+    return client.post(config.url, formData, {
+        headers: {'x-api-key': process.env.CLIPDROP_KEY},
+        responseType,
+    });
+};
+
+// Requests an image for a prompt. responseType is 'arraybuffer' or 'stream';
+// a stream response is returned as soon as its headers arrive. Throws the last
+// upstream error once retries are exhausted, or a CIRCUIT_OPEN error (status
+// 503, retryAfterSeconds) without calling the provider.
+const textToImage = async (prompt, responseType) => {
+    for(let attempt = 0; ; attempt++){
+        acquirePermit();
+        const done = metrics.upstreamDuration.startTimer();
+        metrics.upstreamInFlight.inc();
+        try {
+            const response = await postPrompt(prompt, responseType);
+            done({status: response.status});
+            recordSuccess();
+            if(responseType !== 'stream'){
+                metrics.upstreamResponseBytes.observe({}, response.data.byteLength);
+            }
+            return response;
+        } catch (error) {
+            done({status: error.response?.status || error.code || 'error'});
+            // A 'stream' error body holds its pooled socket until it is consumed
+            // or destroyed; nothing reads it, so release the socket right away.
+            error.response?.data?.destroy?.();
+            if(!isRetryable(error)){
+                // The request itself was rejected (bad prompt, key, quota); the provider is fine.
+                breaker.probing = false;
+                throw error;
+            }
+            recordFailure();
+            if(attempt >= config.maxRetries || breaker.state === 'open'){
+                throw error;
+            }
+            retryCounter.inc({reason: String(error.response?.status || error.code)});
+            await sleep(retryDelay(error, attempt));
+        } finally {
+            metrics.upstreamInFlight.dec();
+        }
+    }
+};
+
+const getStats = () => ({circuitState: breaker.state, consecutiveFailures: breaker.failures});
+
+export default {textToImage, getStats, config};
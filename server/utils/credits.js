@@ -0,0 +1,90 @@
+import userModel from "../models/userSchema.js";
+import creditReservationModel from "../models/creditReservationSchema.js";
+import userCache from "./userCache.js";
+
+// Credit accounting for image generation. A credit is taken with one
+// conditional $inc before any upstream work starts, so concurrent requests can
+// never spend the same credit, and is given back if the generation fails.
+
+const CHARGE_CACHE_HITS = process.env.IMAGE_CACHE_CHARGE_HITS !== 'false';
+
+const chargesCacheHits = (user) => user.chargeCacheHits ?? CHARGE_CACHE_HITS;
+
+// Users whose policy makes a cache hit cost a credit, as a query filter.
+const cacheHitChargeFilter = () => CHARGE_CACHE_HITS ? {chargeCacheHits: {$ne: false}} : {chargeCacheHits: true};
+
+const claimIdempotencyKey = async (userId, key) => {
+    try {
+        await creditReservationModel.create({userId, key});
+        return null;
+    } catch (error) {
+        if(error.code === 11000){
+            return creditReservationModel.findOne({userId, key}).lean();
+        }
+        throw error;
+    }
+};
+
+const releaseIdempotencyKey = (reservation) => {
+    if(reservation.key){
+        return creditReservationModel.deleteOne({userId: reservation.userId, key: reservation.key});
+    }
+};
+
+// Returns {reservation}, {failure} with the response body, or {duplicate} when
+// the idempotency key was already used.
+const reserveCredit = async (userId, {cacheHit = false, idempotencyKey} = {}) => {
+    if(idempotencyKey){
+        const duplicate = await claimIdempotencyKey(userId, idempotencyKey);
+        if(duplicate){
+            return {duplicate};
+        }
+    }
+
+    const filter = {_id: userId, creditBalance: {$gt: 0}, ...(cacheHit ? cacheHitChargeFilter() : {})};
+    const charged = await userModel.findOneAndUpdate(filter, {$inc: {creditBalance: -1}}, {new: true, projection: {creditBalance: 1}}).lean();
+    if(charged){
+        userCache.setCreditBalance(userId, charged.creditBalance);
+        return {reservation: {userId, key: idempotencyKey, charged: true, creditBalance: charged.creditBalance}};
+    }
+
+    // Nothing was charged: the user is missing, out of credits, or gets this cache hit for free.
+    const user = await userModel.findById(userId, {creditBalance: 1, chargeCacheHits: 1}).lean();
+    if(user && cacheHit && !chargesCacheHits(user)){
+        return {reservation: {userId, key: idempotencyKey, charged: false, creditBalance: user.creditBalance}};
+    }
+
+    await releaseIdempotencyKey({userId, key: idempotencyKey});
+    if(!user){
+        return {failure: {success: false, message: "Missing details"}};
+    }
+    return {failure: {success: false, message: "You have no credits left.", credits: user.creditBalance}};
+};
+
+// Gives a reserved credit back and frees the idempotency key so the client can retry.
+// Returns the balance after the refund.
+const refundCredit = async (reservation) => {
+    if(reservation.refunded){
+        return reservation.creditBalance;
+    }
+    reservation.refunded = true;
+    await releaseIdempotencyKey(reservation);
+    if(!reservation.charged){
+        return reservation.creditBalance;
+    }
+    const updated = await userModel.findByIdAndUpdate(reservation.userId, {$inc: {creditBalance: 1}}, {new: true, projection: {creditBalance: 1}}).lean();
+    reservation.creditBalance = updated ? updated.creditBalance : reservation.creditBalance + 1;
+    userCache.setCreditBalance(reservation.userId, reservation.creditBalance);
+    return reservation.creditBalance;
+};
+
+const completeReservation = (reservation, update = {}) => {
+    if(reservation.key){
+        return creditReservationModel.updateOne(
+            {userId: reservation.userId, key: reservation.key},
+            {$set: {status: "completed", ...update}}
+        );
+    }
+};
+
+export default {reserveCredit, refundCredit, completeReservation};
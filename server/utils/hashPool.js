@@ -0,0 +1,115 @@
+import os from "node:os";
+import { Worker } from "node:worker_threads";
+import bcrypt from "bcrypt";
+import logger from "./logger.js";
+
+// Dedicated worker-thread pool for bcrypt. Hashing is CPU-bound; running it
+// here keeps a login storm from filling libuv's threadpool, which the rest of
+// the server needs for DNS and file I/O. When too many hashes are waiting, new
+// ones are refused with a 503 instead of queueing without bound.
+
+const config = {
+    size: Number(process.env.HASH_POOL_SIZE || Math.max(1, Math.min(4, os.availableParallelism() - 1))),
+    queueLimit: Number(process.env.HASH_QUEUE_LIMIT || 200),
+    rounds: Number(process.env.BCRYPT_ROUNDS || 10),
+};
+
+const workerUrl = new URL("../workers/hashWorker.js", import.meta.url);
+const workers = [];
+const idle = [];
+const queue = [];
+const pending = new Map();
+let nextId = 0;
+
+const stats = {completed: 0, failed: 0, rejected: 0, totalWaitMs: 0, totalRunMs: 0};
+
+const dispatch = () => {
+    while(idle.length && queue.length){
+        const worker = idle.pop();
+        const task = queue.shift();
+        task.startedAt = performance.now();
+        stats.totalWaitMs += task.startedAt - task.queuedAt;
+        worker.currentTask = task;
+        worker.ref();
+        pending.set(task.id, task);
+        worker.postMessage({id: task.id, op: task.op, args: task.args});
+    }
+};
+
+const spawnWorker = () => {
+    const worker = new Worker(workerUrl);
+    worker.on('message', ({id, result, error}) => {
+        const task = pending.get(id);
+        pending.delete(id);
+        worker.currentTask = null;
+        worker.unref();
+        idle.push(worker);
+        if(task){
+            stats.totalRunMs += performance.now() - task.startedAt;
+            if(error){
+                stats.failed++;
+                task.reject(new Error(error));
+            }else{
+                stats.completed++;
+                task.resolve(result);
+            }
+        }
+        dispatch();
+    });
+    worker.on('error', (error) => {
+        logger.error("Hash worker crashed", {error});
+    });
+    worker.on('exit', () => {
+        workers.splice(workers.indexOf(worker), 1);
+        const idleIndex = idle.indexOf(worker);
+        if(idleIndex !== -1){
+            idle.splice(idleIndex, 1);
+        }
+        if(worker.currentTask){
+            pending.delete(worker.currentTask.id);
+            stats.failed++;
+            worker.currentTask.reject(new Error("Hash worker exited"));
+        }
+        spawnWorker();
+        dispatch();
+    });
+    // Idle workers must not keep the process alive; busy ones are ref'd in dispatch().
+    worker.unref();
+    workers.push(worker);
+    idle.push(worker);
+};
+
+const run = (op, args) => {
+    if(!workers.length){
+        for(let i = 0; i < config.size; i++){
+            spawnWorker();
+        }
+    }
+    if(queue.length >= config.queueLimit){
+        stats.rejected++;
+        const error = new Error("Server busy. Try again shortly.");
+        error.status = 503;
+        return Promise.reject(error);
+    }
+    return new Promise((resolve, reject) => {
+        queue.push({id: nextId++, op, args, resolve, reject, queuedAt: performance.now()});
+        dispatch();
+    });
+};
+
+const hash = (password, rounds = config.rounds) => run('hash', {password, rounds});
+
+const compare = (password, hashed) => run('compare', {password, hash: hashed});
+
+// True when a stored hash was made with fewer rounds than currently configured.
+const needsRehash = (hashed) => bcrypt.getRounds(hashed) < config.rounds;
+
+const getStats = () => ({
+    ...stats,
+    size: workers.length,
+    busy: workers.length - idle.length,
+    queueDepth: queue.length,
+    queueLimit: config.queueLimit,
+});
+
+export default {hash, compare, needsRehash, getStats};
@@ -0,0 +1,199 @@
+import crypto from "node:crypto";
+import fs from "node:fs/promises";
+import os from "node:os";
+import path from "node:path";
+import logger from "./logger.js";
+
+// Two-tier cache of generated images, keyed by a hash of the normalized prompt
+// plus generation parameters. The memory tier is an LRU bounded by total bytes;
+// the disk tier survives restarts and is shared by every process on the host.
+// Both tiers expire entries after a TTL and evict least-recently-used entries
+// when they grow past their size limit.
+
+const MB = 1024 * 1024;
+
+const config = {
+    enabled: process.env.IMAGE_CACHE_ENABLED !== 'false',
+    memoryMaxBytes: Number(process.env.IMAGE_CACHE_MEMORY_MB || 64) * MB,
+    memoryTtlMs: Number(process.env.IMAGE_CACHE_MEMORY_TTL_SECONDS || 60 * 60) * 1000,
+    diskDir: process.env.IMAGE_CACHE_DIR || path.join(os.tmpdir(), "texmage-image-cache"),
+    diskMaxBytes: Number(process.env.IMAGE_CACHE_DISK_MB || 1024) * MB,
+    diskTtlMs: Number(process.env.IMAGE_CACHE_DISK_TTL_SECONDS || 7 * 24 * 60 * 60) * 1000,
+    // Largest single image worth caching; bigger responses are passed through untouched.
+    maxEntryBytes: Number(process.env.IMAGE_CACHE_MAX_ENTRY_MB || 8) * MB,
+};
+
+const stats = {memoryHits: 0, diskHits: 0, misses: 0, writes: 0, evictions: 0};
+
+const normalizePrompt = (prompt) => prompt.normalize('NFKC').trim().replace(/\s+/g, ' ').toLowerCase();
+
+const keyFor = (prompt, params = {}) => {
+    const sortedParams = Object.keys(params).sort().map((name) => [name, params[name]]);
+    return crypto
+        .createHash('sha256')
+        .update(JSON.stringify({prompt: normalizePrompt(prompt), params: sortedParams}))
+        .digest('hex');
+};
+
+// Memory tier: Map iteration order doubles as recency order.
+const memory = new Map();
+let memoryBytes = 0;
+
+const memoryDelete = (key) => {
+    const entry = memory.get(key);
+    if(entry){
+        memory.delete(key);
+        memoryBytes -= entry.buffer.length;
+    }
+};
+
+const memoryGet = (key) => {
+    const entry = memory.get(key);
+    if(!entry){
+        return null;
+    }
+    if(entry.expiresAt <= Date.now()){
+        memoryDelete(key);
+        return null;
+    }
+    memory.delete(key);
+    memory.set(key, entry);
+    return entry.buffer;
+};
+
+const memorySet = (key, buffer) => {
+    memoryDelete(key);
+    memory.set(key, {buffer, expiresAt: Date.now() + config.memoryTtlMs});
+    memoryBytes += buffer.length;
+    for(const oldestKey of memory.keys()){
+        if(memoryBytes <= config.memoryMaxBytes){
+            break;
+        }
+        memoryDelete(oldestKey);
+        stats.evictions++;
+    }
+};
+
+// Disk tier: one file per key, with an in-memory index of size and last access.
+const diskIndex = new Map();
+let diskBytes = 0;
+let diskReady = null;
+
+const diskPath = (key) => path.join(config.diskDir, `${key}.png`);
+
+const initDisk = () => {
+    if(!diskReady){
+        diskReady = (async () => {
+            await fs.mkdir(config.diskDir, {recursive: true});
+            for(const file of await fs.readdir(config.diskDir)){
+                if(!file.endsWith('.png')){
+                    continue;
+                }
+                const {size, mtimeMs} = await fs.stat(path.join(config.diskDir, file));
+                diskIndex.set(file.slice(0, -4), {size, createdAt: mtimeMs, lastAccess: mtimeMs});
+                diskBytes += size;
+            }
+        })().catch((error) => {
+            logger.warn("Image cache disk tier unavailable", {error: error.message});
+            config.diskMaxBytes = 0;
+        });
+    }
+    return diskReady;
+};
+
+const diskDelete = async (key) => {
+    const entry = diskIndex.get(key);
+    if(entry){
+        diskIndex.delete(key);
+        diskBytes -= entry.size;
+        await fs.rm(diskPath(key), {force: true});
+    }
+};
+
+const diskGet = async (key) => {
+    await initDisk();
+    const entry = diskIndex.get(key);
+    if(!entry){
+        return null;
+    }
+    if(entry.createdAt + config.diskTtlMs <= Date.now()){
+        await diskDelete(key);
+        return null;
+    }
+    try {
+        const buffer = await fs.readFile(diskPath(key));
+        entry.lastAccess = Date.now();
+        return buffer;
+    } catch {
+        diskIndex.delete(key);
+        diskBytes -= entry.size;
+        return null;
+    }
+};
+
+const diskSet = async (key, buffer) => {
+    await initDisk();
+    if(!config.diskMaxBytes){
+        return;
+    }
+    const tmpPath = `${diskPath(key)}.${process.pid}.tmp`;
+    await fs.writeFile(tmpPath, buffer);
+    await fs.rename(tmpPath, diskPath(key));
+    const previous = diskIndex.get(key);
+    diskBytes += buffer.length - (previous ? previous.size : 0);
+    const now = Date.now();
+    diskIndex.set(key, {size: buffer.length, createdAt: now, lastAccess: now});
+
+    if(diskBytes > config.diskMaxBytes){
+        const byAccess = [...diskIndex.entries()].sort((a, b) => a[1].lastAccess - b[1].lastAccess);
+        for(const [oldestKey] of byAccess){
+            if(diskBytes <= config.diskMaxBytes){
+                break;
+            }
+            await diskDelete(oldestKey);
+            stats.evictions++;
+        }
+    }
+};
+
+const get = async (key) => {
+    if(!config.enabled){
+        return null;
+    }
+    const fromMemory = memoryGet(key);
+    if(fromMemory){
+        stats.memoryHits++;
+        return fromMemory;
+    }
+    const fromDisk = await diskGet(key);
+    if(fromDisk){
+        stats.diskHits++;
+        memorySet(key, fromDisk);
+        return fromDisk;
+    }
+    stats.misses++;
+    return null;
+};
+
+const set = async (key, buffer) => {
+    if(!config.enabled || buffer.length > config.maxEntryBytes){
+        return;
+    }
+    stats.writes++;
+    memorySet(key, buffer);
+    try {
+        await diskSet(key, buffer);
+    } catch (error) {
+        logger.warn("Image cache disk write failed", {error: error.message});
+    }
+};
+
+const getStats = () => ({
+    ...stats,
+    memoryEntries: memory.size,
+    memoryBytes,
+    diskEntries: diskIndex.size,
+    diskBytes,
+});
+
+export default {keyFor, normalizePrompt, get, set, getStats, maxEntryBytes: config.maxEntryBytes};
@@ -0,0 +1,74 @@
+import imageCache from "./imageCache.js";
+import credits from "./credits.js";
+import createSingleFlight from "./singleFlight.js";
+import metrics from "./metrics.js";
+import clipdropClient from "./clipdropClient.js";
+
+// Shared generation steps used by the synchronous /generate-image route and by
+// the background job workers.
+
+// Identical prompts that arrive while one is already being generated share its
+// upstream call. Each requester still reserves and pays for its own credit.
+const inflightImages = createSingleFlight();
+
+// Checks the cache and reserves a credit before any upstream work. Returns
+// {reservation, cacheKey, cached}, {failure} with the response body, or
+// {duplicate} for a repeated idempotency key.
+const prepareGeneration = async (userId, prompt, idempotencyKey) => {
+    if(!prompt) {
+        return {failure: {success: false, message: "Missing details"}};
+    }
+
+    const cacheKey = imageCache.keyFor(prompt);
+    const lookupDone = metrics.generationStageDuration.startTimer({stage: 'cache_lookup'});
+    const cached = await imageCache.get(cacheKey);
+    lookupDone();
+    const reserveDone = metrics.generationStageDuration.startTimer({stage: 'reserve_credit'});
+    const {reservation, failure, duplicate} = await credits.reserveCredit(userId, {cacheHit: Boolean(cached), idempotencyKey});
+    reserveDone();
+    if(duplicate || failure){
+        return {duplicate, failure};
+    }
+    return {reservation, cacheKey, cached};
+};
+
+// Returns the image for a prompt from the cache, from an identical request
+// already in flight, or from ClipDrop (caching the result).
+const fetchImage = async (prompt, cacheKey = imageCache.keyFor(prompt)) => {
+    const cached = await imageCache.get(cacheKey);
+    if(cached){
+        return {image: cached, cacheStatus: 'HIT'};
+    }
+    const done = metrics.generationStageDuration.startTimer({stage: 'upstream'});
+    const {promise, joined} = inflightImages.run(cacheKey, async () => {
+        const {data} = await clipdropClient.textToImage(prompt, 'arraybuffer');
+        const image = Buffer.from(data);
+        imageCache.set(cacheKey, image);
+        return image;
+    });
+    const image = await promise;
+    done();
+    return {image, cacheStatus: joined ? 'JOINED' : 'MISS'};
+};
+
+// Fully buffered generation: returns {success, image, creditBalance, cacheStatus},
+// or the failure/duplicate result of prepareGeneration. The credit is refunded
+// and the error rethrown if the upstream call fails.
+const generateImage = async (userId, prompt, idempotencyKey) => {
+    const prepared = await prepareGeneration(userId, prompt, idempotencyKey);
+    if(!prepared.reservation){
+        return prepared;
+    }
+
+    const {reservation, cacheKey, cached} = prepared;
+    try {
+        const {image, cacheStatus} = cached ? {image: cached, cacheStatus: 'HIT'} : await fetchImage(prompt, cacheKey);
+        await credits.completeReservation(reservation);
+        return {success: true, image, creditBalance: reservation.creditBalance, cacheStatus};
+    } catch (error) {
+        await credits.refundCredit(reservation);
+        throw error;
+    }
+};
+
+export default {prepareGeneration, fetchImage, generateImage, inflightImages};
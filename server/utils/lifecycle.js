@@ -0,0 +1,103 @@
+import cluster from "node:cluster";
+import crypto from "node:crypto";
+import mongoose from "mongoose";
+import metrics from "./metrics.js";
+
+// Process state for health checks and graceful shutdown. A process is
+// "starting" until it listens, "ready" while serving, and "draining" once it
+// has been asked to stop. Under cluster.js each worker also sends its state to
+// the supervisor, so /health can report every worker in the cluster.
+
+const HEARTBEAT_MS = Number(process.env.CLUSTER_HEARTBEAT_MS || 5000);
+const CLUSTER_STATE_TIMEOUT_MS = 500;
+
+let state = "starting";
+const shutdownListeners = [];
+const pendingStateRequests = new Map();
+
+const MONGO_STATES = ["disconnected", "connected", "connecting", "disconnecting"];
+
+const report = () => ({
+    pid: process.pid,
+    workerId: cluster.isWorker ? cluster.worker.id : null,
+    state,
+    mongo: MONGO_STATES[mongoose.connection.readyState] || "unknown",
+    inFlight: metrics.httpRequestsInFlight.get(),
+    uptimeSeconds: Math.round(process.uptime()),
+    rssBytes: process.memoryUsage().rss,
+});
+
+const sendHeartbeat = () => {
+    if(process.connected){
+        process.send({type: "texmage:heartbeat", report: report()});
+    }
+};
+
+const setState = (next) => {
+    state = next;
+    if(cluster.isWorker){
+        sendHeartbeat();
+    }
+};
+
+const getState = () => state;
+
+// Registers the function that drains this process; the supervisor triggers it
+// with a shutdown message, signals trigger it directly.
+const onShutdown = (listener) => shutdownListeners.push(listener);
+
+const requestShutdown = (reason) => {
+    for(const listener of shutdownListeners){
+        listener(reason);
+    }
+};
+
+if(cluster.isWorker){
+    setInterval(sendHeartbeat, HEARTBEAT_MS).unref();
+    process.on("message", (message) => {
+        if(message?.type === "texmage:shutdown"){
+            requestShutdown("supervisor");
+        }else if(message?.type === "texmage:cluster-state"){
+            pendingStateRequests.get(message.requestId)?.(message.workers);
+        }
+    });
+}
+
+// Asks the supervisor for the last known state of every worker; null when not
+// clustered or when the supervisor does not answer in time.
+const clusterState = () => new Promise((resolve) => {
+    if(!cluster.isWorker || !process.connected){
+        return resolve(null);
+    }
+    const requestId = crypto.randomUUID();
+    const done = (workers) => {
+        clearTimeout(timer);
+        pendingStateRequests.delete(requestId);
+        resolve(workers);
+    };
+    const timer = setTimeout(() => done(null), CLUSTER_STATE_TIMEOUT_MS);
+    pendingStateRequests.set(requestId, done);
+    process.send({type: "texmage:cluster-state-request", requestId});
+});
+
+// GET /health: 200 while this process is ready and connected to MongoDB, 503
+// otherwise, so load balancers stop routing to a draining worker.
+const health = async (req, res) => {
+    const self = report();
+    const healthy = self.state === "ready" && self.mongo === "connected";
+    const workers = await clusterState();
+    res.status(healthy ? 200 : 503)
+        .set("Cache-Control", "no-store")
+        .json({success: healthy, status: healthy ? "ok" : "unavailable", worker: self, workers});
+};
+
+// Responses sent while draining close their keep-alive connection, so clients
+// reconnect to a worker that is staying up.
+const drainConnections = (req, res, next) => {
+    if(state === "draining"){
+        res.set("Connection", "close");
+    }
+    next();
+};
+
+export default {setState, getState, onShutdown, requestShutdown, report, health, drainConnections};
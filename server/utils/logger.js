@@ -0,0 +1,118 @@
+import fs from "node:fs";
+
+// Leveled JSON-lines logger. Lines are buffered and written with async
+// fs.write, so logging never blocks the event loop the way console.log does
+// when stdout is a pipe. Short writes and EAGAIN are retried from where they
+// stopped. If the writer falls behind, the buffer is capped; lines dropped for
+// that or for a failed write are reported with the next write.
+
+const LEVELS = {debug: 10, info: 20, warn: 30, error: 40};
+
+const config = {
+    level: LEVELS[process.env.LOG_LEVEL] ?? LEVELS.info,
+    fd: 1,
+    flushIntervalMs: Number(process.env.LOG_FLUSH_INTERVAL_MS || 50),
+    maxBufferBytes: Number(process.env.LOG_MAX_BUFFER_KB || 1024) * 1024,
+};
+
+let buffer = [];
+let bufferedBytes = 0;
+let dropped = 0;
+let writing = false;
+let flushTimer = null;
+// Tail of a batch the fd did not take yet (EAGAIN or a short write on a
+// non-blocking pipe). It goes out before anything newer, so lines stay whole.
+let pending = null;
+
+const countLines = (chunk) => chunk.toString().split("\n").length - 1;
+
+const writeChunk = (chunk) => {
+    writing = true;
+    fs.write(config.fd, chunk, (error, bytesWritten) => {
+        writing = false;
+        if(error){
+            if(error.code === "EAGAIN"){
+                pending = chunk;
+                return scheduleFlush();
+            }
+            dropped += countLines(chunk);
+        }else if(bytesWritten < chunk.length){
+            return writeChunk(chunk.subarray(bytesWritten));
+        }
+        if(buffer.length){
+            scheduleFlush();
+        }
+    });
+};
+
+const flush = () => {
+    flushTimer = null;
+    if(writing || (!buffer.length && !pending)){
+        return;
+    }
+    if(dropped){
+        buffer.push(JSON.stringify({time: new Date().toISOString(), level: "warn", msg: "Log lines dropped", dropped}) + "\n");
+        dropped = 0;
+    }
+    const batch = Buffer.from(buffer.join(""));
+    const chunk = pending ? Buffer.concat([pending, batch]) : batch;
+    pending = null;
+    buffer = [];
+    bufferedBytes = 0;
+    writeChunk(chunk);
+};
+
+const scheduleFlush = () => {
+    if(!flushTimer){
+        flushTimer = setTimeout(flush, config.flushIntervalMs);
+        flushTimer.unref();
+    }
+};
+
+// Whatever is still buffered is written synchronously on the way out.
+const flushSync = () => {
+    if(buffer.length || pending){
+        try {
+            fs.writeSync(config.fd, Buffer.concat([pending || Buffer.alloc(0), Buffer.from(buffer.join(""))]));
+        } catch {
+            // Nothing left to report to.
+        }
+        pending = null;
+        buffer = [];
+        bufferedBytes = 0;
+    }
+};
+process.on('exit', flushSync);
+
+const serializeError = (error) => ({name: error.name, message: error.message, stack: error.stack, status: error.status});
+
+const write = (level, bindings, msg, fields) => {
+    if(LEVELS[level] < config.level){
+        return;
+    }
+    const entry = {time: new Date().toISOString(), level, msg, ...bindings};
+    for(const [key, value] of Object.entries(fields || {})){
+        entry[key] = value instanceof Error ? serializeError(value) : value;
+    }
+    const line = JSON.stringify(entry) + "\n";
+    if(bufferedBytes + line.length > config.maxBufferBytes && level !== "error"){
+        dropped++;
+        return;
+    }
+    buffer.push(line);
+    bufferedBytes += line.length;
+    scheduleFlush();
+};
+
+const createLogger = (bindings = {}) => ({
+    debug: (msg, fields) => write("debug", bindings, msg, fields),
+    info: (msg, fields) => write("info", bindings, msg, fields),
+    warn: (msg, fields) => write("warn", bindings, msg, fields),
+    error: (msg, fields) => write("error", bindings, msg, fields),
+    isLevelEnabled: (level) => LEVELS[level] >= config.level,
+    child: (extra) => createLogger({...bindings, ...extra}),
+});
+
+const logger = createLogger({pid: process.pid});
+
+export default logger;
@@ -0,0 +1,42 @@
+// Small bounded LRU map with per-entry expiry. Map iteration order doubles as
+// recency order, so the first key is always the least recently used.
+
+const createLruCache = ({maxEntries = 1000, ttlMs = 60 * 1000} = {}) => {
+    const entries = new Map();
+    const stats = {hits: 0, misses: 0, evictions: 0};
+
+    const get = (key) => {
+        const entry = entries.get(key);
+        if(!entry){
+            stats.misses++;
+            return undefined;
+        }
+        if(entry.expiresAt <= Date.now()){
+            entries.delete(key);
+            stats.misses++;
+            return undefined;
+        }
+        entries.delete(key);
+        entries.set(key, entry);
+        stats.hits++;
+        return entry.value;
+    };
+
+    // ttl overrides the default expiry for this entry (never beyond it).
+    const set = (key, value, ttl = ttlMs) => {
+        entries.delete(key);
+        entries.set(key, {value, expiresAt: Date.now() + Math.min(ttl, ttlMs)});
+        if(entries.size > maxEntries){
+            entries.delete(entries.keys().next().value);
+            stats.evictions++;
+        }
+    };
+
+    const remove = (key) => entries.delete(key);
+
+    const getStats = () => ({...stats, size: entries.size});
+
+    return {get, set, delete: remove, getStats};
+};
+
+export default createLruCache;
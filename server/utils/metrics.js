@@ -0,0 +1,181 @@
+import { monitorEventLoopDelay } from "node:perf_hooks";
+
+// Minimal Prometheus registry: counters, gauges and histograms with labels,
+// rendered in the text exposition format by GET /metrics. Components with
+// their own getStats() are exported through collectors evaluated at scrape time.
+
+const PREFIX = "texmage_";
+const DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30];
+const BYTE_BUCKETS = [16384, 65536, 262144, 524288, 1048576, 2097152, 4194304, 8388608];
+
+const metrics = [];
+const collectors = [];
+
+const escapeLabel = (value) => String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+
+const formatLabels = (labels) => {
+    const pairs = Object.entries(labels).map(([name, value]) => `${name}="${escapeLabel(value)}"`);
+    return pairs.length ? `{${pairs.join(',')}}` : '';
+};
+
+const snakeCase = (name) => name.replace(/([a-z0-9])([A-Z])/g, '$1_$2').toLowerCase();
+
+const register = (metric) => {
+    metrics.push(metric);
+    return metric;
+};
+
+const counter = (name, help) => {
+    const values = new Map();
+    return register({
+        inc: (labels = {}, amount = 1) => {
+            const key = formatLabels(labels);
+            values.set(key, (values.get(key) || 0) + amount);
+        },
+        render: () => [
+            `# HELP ${PREFIX}${name} ${help}`,
+            `# TYPE ${PREFIX}${name} counter`,
+            ...[...values].map(([key, value]) => `${PREFIX}${name}${key} ${value}`),
+        ],
+    });
+};
+
+const gauge = (name, help) => {
+    const values = new Map();
+    const add = (labels, amount) => {
+        const key = formatLabels(labels);
+        values.set(key, (values.get(key) || 0) + amount);
+    };
+    return register({
+        set: (labels = {}, value) => values.set(formatLabels(labels), value),
+        inc: (labels = {}, amount = 1) => add(labels, amount),
+        dec: (labels = {}, amount = 1) => add(labels, -amount),
+        get: (labels = {}) => values.get(formatLabels(labels)) || 0,
+        render: () => [
+            `# HELP ${PREFIX}${name} ${help}`,
+            `# TYPE ${PREFIX}${name} gauge`,
+            ...[...values].map(([key, value]) => `${PREFIX}${name}${key} ${value}`),
+        ],
+    });
+};
+
+const histogram = (name, help, buckets = DEFAULT_BUCKETS) => {
+    const series = new Map();
+    const observe = (labels = {}, value) => {
+        const key = formatLabels(labels);
+        let entry = series.get(key);
+        if(!entry){
+            entry = {labels, counts: new Array(buckets.length).fill(0), sum: 0, count: 0};
+            series.set(key, entry);
+        }
+        const index = buckets.findIndex((bound) => value <= bound);
+        if(index !== -1){
+            entry.counts[index]++;
+        }
+        entry.sum += value;
+        entry.count++;
+    };
+
+    // Returns a function that observes the seconds elapsed since the call;
+    // labels passed to it are merged over the starting ones.
+    const startTimer = (labels = {}) => {
+        const started = process.hrtime.bigint();
+        return (extraLabels = {}) => {
+            const seconds = Number(process.hrtime.bigint() - started) / 1e9;
+            observe({...labels, ...extraLabels}, seconds);
+            return seconds;
+        };
+    };
+
+    const render = () => {
+        const lines = [`# HELP ${PREFIX}${name} ${help}`, `# TYPE ${PREFIX}${name} histogram`];
+        for(const [key, entry] of series){
+            let cumulative = 0;
+            buckets.forEach((bound, i) => {
+                cumulative += entry.counts[i];
+                lines.push(`${PREFIX}${name}_bucket${formatLabels({...entry.labels, le: bound})} ${cumulative}`);
+            });
+            lines.push(`${PREFIX}${name}_bucket${formatLabels({...entry.labels, le: '+Inf'})} ${entry.count}`);
+            lines.push(`${PREFIX}${name}_sum${key} ${entry.sum}`);
+            lines.push(`${PREFIX}${name}_count${key} ${entry.count}`);
+        }
+        return lines;
+    };
+
+    return register({observe, startTimer, render});
+};
+
+// Exposes every numeric field of a component's getStats() as a gauge named
+// <prefix>_<field>, e.g. hash_pool_queue_depth.
+const collectStats = (prefix, help, getStats) => {
+    collectors.push(() => Object.entries(getStats())
+        .filter(([, value]) => typeof value === 'number')
+        .flatMap(([field, value]) => {
+            const name = `${PREFIX}${prefix}_${snakeCase(field)}`;
+            return [`# HELP ${name} ${help}: ${field}`, `# TYPE ${name} gauge`, `${name} ${value}`];
+        }));
+};
+
+// Event-loop delay percentiles since the previous scrape.
+const loopDelay = monitorEventLoopDelay({resolution: 10});
+loopDelay.enable();
+
+collectors.push(() => {
+    const name = `${PREFIX}event_loop_lag_seconds`;
+    const lines = [`# HELP ${name} Event-loop delay since the last scrape`, `# TYPE ${name} summary`];
+    for(const quantile of [0.5, 0.9, 0.99]){
+        lines.push(`${name}{quantile="${quantile}"} ${loopDelay.percentile(quantile * 100) / 1e9}`);
+    }
+    lines.push(`${PREFIX}event_loop_lag_max_seconds ${loopDelay.max / 1e9}`);
+    loopDelay.reset();
+    return lines;
+});
+
+collectors.push(() => {
+    const {rss, heapUsed} = process.memoryUsage();
+    return [
+        `# TYPE ${PREFIX}process_resident_memory_bytes gauge`,
+        `${PREFIX}process_resident_memory_bytes ${rss}`,
+        `# TYPE ${PREFIX}process_heap_used_bytes gauge`,
+        `${PREFIX}process_heap_used_bytes ${heapUsed}`,
+    ];
+});
+
+const render = () => [
+    ...metrics.flatMap((metric) => metric.render()),
+    ...collectors.flatMap((collect) => collect()),
+].join('\n') + '\n';
+
+// Instruments shared across modules.
+
+const httpRequestDuration = histogram("http_request_duration_seconds", "HTTP request duration by route");
+const httpRequestsInFlight = gauge("http_requests_in_flight", "HTTP requests currently being handled");
+const mongoQueryDuration = histogram("mongo_query_duration_seconds", "MongoDB operation duration by model and operation");
+const upstreamDuration = histogram("upstream_request_duration_seconds", "ClipDrop time to response headers by status");
+const upstreamResponseBytes = histogram("upstream_response_bytes", "ClipDrop response body size", BYTE_BUCKETS);
+const upstreamInFlight = gauge("upstream_requests_in_flight", "ClipDrop requests currently open");
+const generationStageDuration = histogram("generation_stage_duration_seconds", "Time spent in each stage of image generation");
+
+const handler = (req, res) => {
+    const token = process.env.METRICS_TOKEN;
+    if(token && req.get('Authorization') !== `Bearer ${token}`){
+        return res.status(401).json({success: false, message: "Not Authorized."});
+    }
+    res.type('text/plain; version=0.0.4').send(render());
+};
+
+export default {
+    counter,
+    gauge,
+    histogram,
+    collectStats,
+    render,
+    handler,
+    httpRequestDuration,
+    httpRequestsInFlight,
+    mongoQueryDuration,
+    upstreamDuration,
+    upstreamResponseBytes,
+    upstreamInFlight,
+    generationStageDuration,
+};
@@ -0,0 +1,85 @@
+import metrics from "./metrics.js";
+import logger from "./logger.js";
+
+// Query instrumentation for mongoose schemas. Every query and save is timed
+// into the mongo_query_duration_seconds histogram. Queries slower than
+// MONGO_SLOW_QUERY_MS are logged with the shape of their filter (field names,
+// never values), and the first slow query of each shape is explained so that
+// collection scans are flagged. MONGO_EXPLAIN_QUERIES=true explains every new
+// shape, slow or not, which is useful when checking indexes in development.
+
+const config = {
+    slowQueryMs: Number(process.env.MONGO_SLOW_QUERY_MS || 100),
+    explainAll: process.env.MONGO_EXPLAIN_QUERIES === 'true',
+};
+
+const QUERY_OPS = ['find', 'findOne', 'findOneAndUpdate', 'updateOne', 'updateMany', 'countDocuments', 'deleteOne'];
+
+const explainedShapes = new Set();
+const collectionScans = metrics.counter("mongo_collection_scans_total", "Query shapes whose plan scans a whole collection");
+
+// {email: "a@b.c", status: {$in: [...]}} -> {"email":1,"status":{"$in":1}}
+const shapeOf = (filter) => {
+    if(!filter || typeof filter !== 'object' || Array.isArray(filter) || filter.constructor?.name === 'ObjectId'){
+        return 1;
+    }
+    return Object.fromEntries(Object.keys(filter).sort().map((key) => [key, shapeOf(filter[key])]));
+};
+
+const planStages = (plan) => plan ? [plan.stage, ...planStages(plan.inputStage), ...(plan.inputStages || []).flatMap(planStages)] : [];
+
+const explain = async (query, model, shape) => {
+    try {
+        const result = await query.model.collection.find(query.getFilter()).explain('queryPlanner');
+        const stages = planStages(result.queryPlanner?.winningPlan?.queryPlan || result.queryPlanner?.winningPlan);
+        if(stages.includes('COLLSCAN')){
+            collectionScans.inc({model});
+            logger.warn("Query scans the whole collection", {model, op: query.op, filter: shape, plan: stages});
+        }
+    } catch (error) {
+        logger.debug("Explain failed", {model, error: error.message});
+    }
+};
+
+const instrumentSchema = (schema, model) => {
+    const start = function () {
+        this._metricsTimer = metrics.mongoQueryDuration.startTimer({model});
+    };
+
+    const end = function () {
+        if(!this._metricsTimer){
+            return;
+        }
+        const op = this.op || 'save';
+        const durationMs = this._metricsTimer({op}) * 1000;
+        this._metricsTimer = null;
+        const slow = durationMs >= config.slowQueryMs;
+        if(op === 'save' || !(slow || config.explainAll)){
+            return;
+        }
+
+        const shape = JSON.stringify(shapeOf(this.getFilter()));
+        if(slow){
+            logger.warn("Slow query", {model, op, filter: shape, durationMs: Math.round(durationMs)});
+        }
+        const shapeKey = `${model}:${op}:${shape}`;
+        if(!explainedShapes.has(shapeKey)){
+            explainedShapes.add(shapeKey);
+            explain(this, model, shape);
+        }
+    };
+
+    const endWithError = function (error, result, next) {
+        end.call(this);
+        next(error);
+    };
+
+    schema.pre(QUERY_OPS, start);
+    schema.post(QUERY_OPS, end);
+    schema.post(QUERY_OPS, endWithError);
+    schema.pre('save', start);
+    schema.post('save', end);
+    schema.post('save', endWithError);
+};
+
+export default {instrumentSchema};
@@ -0,0 +1,79 @@
+import rateLimitBucketModel from "../models/rateLimitBucketSchema.js";
+import createLruCache from "./lruCache.js";
+
+// Token-bucket stores for the rate limiter. A store implements
+//
+//     take(key, {capacity, refillPerSecond}) -> Promise<{allowed, remaining, retryAfterMs}>
+//
+// refilling the bucket for the time since it was last touched and taking one
+// token if there is one. The memory store is exact for a single process; the
+// mongo store shares buckets between processes at the cost of one round trip.
+
+// Milliseconds until an idle bucket is full again; it can be forgotten after that.
+const refillMs = (tokens, {capacity, refillPerSecond}) => Math.ceil((capacity - tokens) / refillPerSecond * 1000);
+
+const result = (allowed, tokens, limit) => ({
+    allowed,
+    remaining: Math.floor(tokens),
+    retryAfterMs: allowed ? 0 : Math.ceil((1 - tokens) / limit.refillPerSecond * 1000),
+});
+
+const createMemoryStore = ({maxKeys = Number(process.env.RATE_LIMIT_MAX_KEYS || 100000)} = {}) => {
+    // An evicted bucket simply starts full again, the same as one that expired.
+    const buckets = createLruCache({maxEntries: maxKeys, ttlMs: 24 * 60 * 60 * 1000});
+
+    const take = async (key, limit) => {
+        const now = Date.now();
+        const bucket = buckets.get(key) || {tokens: limit.capacity, updatedAt: now};
+        const tokens = Math.min(limit.capacity, bucket.tokens + (now - bucket.updatedAt) / 1000 * limit.refillPerSecond);
+        const allowed = tokens >= 1;
+        const left = allowed ? tokens - 1 : tokens;
+        buckets.set(key, {tokens: left, updatedAt: now}, Math.max(1, refillMs(left, limit)));
+        return result(allowed, left, limit);
+    };
+
+    return {take, getStats: buckets.getStats};
+};
+
+const createMongoStore = () => {
+    // Refill and take happen in one atomic update pipeline, so concurrent
+    // requests from different processes never spend the same token twice.
+    const update = (key, limit) => {
+        const now = new Date();
+        const elapsedSeconds = {$divide: [{$subtract: [now, {$ifNull: ["$updatedAt", now]}]}, 1000]};
+        const refilled = {$min: [limit.capacity, {$add: [{$ifNull: ["$tokens", limit.capacity]}, {$multiply: [elapsedSeconds, limit.refillPerSecond]}]}]};
+        return rateLimitBucketModel.findOneAndUpdate({key}, [
+            {$set: {tokens: refilled, updatedAt: now}},
+            {$set: {allowed: {$gte: ["$tokens", 1]}}},
+            {$set: {
+                tokens: {$cond: ["$allowed", {$subtract: ["$tokens", 1]}, "$tokens"]},
+                expireAt: new Date(now.getTime() + refillMs(0, limit)),
+            }},
+        ], {upsert: true, new: true, lean: true, projection: {tokens: 1, allowed: 1}, strict: false});
+    };
+
+    const take = async (key, limit) => {
+        let bucket;
+        try {
+            bucket = await update(key, limit);
+        } catch (error) {
+            // Two processes upserting a new bucket at once: the loser retries against the winner's document.
+            if(error.code !== 11000){
+                throw error;
+            }
+            bucket = await update(key, limit);
+        }
+        return result(bucket.allowed, bucket.tokens, limit);
+    };
+
+    return {take};
+};
+
+// Workers forked by cluster.js would each enforce the full limit from memory,
+// multiplying it by the worker count, so they share buckets in MongoDB unless
+// RATE_LIMIT_STORE says otherwise.
+const defaultStoreType = () => Number(process.env.CLUSTER_WORKER_COUNT) > 1 ? "mongo" : "memory";
+
+const createStore = (type = process.env.RATE_LIMIT_STORE || defaultStoreType()) => type === "mongo" ? createMongoStore() : createMemoryStore();
+
+export default {createStore, createMemoryStore, createMongoStore};
@@ -0,0 +1,60 @@
+// Collapses concurrent calls for the same key onto one in-flight promise.
+// The first caller runs the work; everyone who arrives before it settles gets
+// the same result (or error). Nothing is remembered once the promise settles.
+
+const createSingleFlight = () => {
+    const inflight = new Map();
+    const stats = {started: 0, joined: 0};
+
+    const track = (key, promise) => {
+        inflight.set(key, promise);
+        const forget = () => {
+            if(inflight.get(key) === promise){
+                inflight.delete(key);
+            }
+        };
+        promise.then(forget, forget);
+        return promise;
+    };
+
+    // Returns {promise, joined}; joined is true when another caller's work was reused.
+    const run = (key, fn) => {
+        const existing = inflight.get(key);
+        if(existing){
+            stats.joined++;
+            return {promise: existing, joined: true};
+        }
+        stats.started++;
+        return {promise: track(key, Promise.resolve().then(fn)), joined: false};
+    };
+
+    const join = (key) => {
+        const existing = inflight.get(key);
+        if(existing){
+            stats.joined++;
+        }
+        return existing || null;
+    };
+
+    // Registers work that is driven elsewhere (e.g. a stream being piped to a
+    // client). Returns resolve/reject callbacks for that work's outcome.
+    const begin = (key) => {
+        let resolve;
+        let reject;
+        const promise = new Promise((res, rej) => {
+            resolve = res;
+            reject = rej;
+        });
+        stats.started++;
+        track(key, promise);
+        // Nobody may have joined; an unobserved rejection is not an error here.
+        promise.catch(() => {});
+        return {resolve, reject};
+    };
+
+    const getStats = () => ({...stats, inflight: inflight.size});
+
+    return {run, join, begin, getStats};
+};
+
+export default createSingleFlight;
@@ -0,0 +1,34 @@
+import userModel from "../models/userSchema.js";
+import createLruCache from "./lruCache.js";
+
+// Short-lived cache of the user fields authenticated routes need. Entries are
+// updated in place when this process changes a balance; the TTL bounds how
+// stale a balance changed elsewhere (another process, an admin) can get.
+
+const cache = createLruCache({
+    maxEntries: Number(process.env.USER_CACHE_MAX_ENTRIES || 10000),
+    ttlMs: Number(process.env.USER_CACHE_TTL_SECONDS || 10) * 1000,
+});
+
+const get = async (userId) => {
+    const cached = cache.get(userId);
+    if(cached){
+        return cached;
+    }
+    const user = await userModel.findById(userId, {name: 1, creditBalance: 1}).lean();
+    if(user){
+        cache.set(userId, user);
+    }
+    return user;
+};
+
+const setCreditBalance = (userId, creditBalance) => {
+    const cached = cache.get(String(userId));
+    if(cached){
+        cache.set(String(userId), {...cached, creditBalance});
+    }
+};
+
+const invalidate = (userId) => cache.delete(String(userId));
+
+export default {get, setCreditBalance, invalidate, getStats: cache.getStats};
@@ -0,0 +1,25 @@
+import z from "zod";
+
+const PROMPT_MAX_LENGTH = Number(process.env.PROMPT_MAX_LENGTH || 1000);
+
+// Unicode compatibility forms folded, control characters removed and runs of
+// whitespace collapsed, so length limits and duplicate checks see what the
+// provider would.
+const normalizePrompt = (prompt) => prompt
+    .normalize("NFKC")
+    .replace(/[\p{Cc}\p{Cf}]/gu, " ")
+    .replace(/\s+/g, " ")
+    .trim();
+
+const promptSchema = z.object({
+    prompt: z
+    .string({required_error: "Prompt is required."})
+    .transform(normalizePrompt)
+    .pipe(z
+        .string()
+        .min(3, {message: "Prompt must have atleast 3 characters"})
+        .max(PROMPT_MAX_LENGTH, {message: `Prompt can not exceed ${PROMPT_MAX_LENGTH} characters`})
+        .regex(/\p{L}/u, {message: "Prompt must contain words"}))
+});
+
+export default promptSchema;
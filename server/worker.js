@@ -0,0 +1,15 @@
+import 'dotenv/config'
+import connectDB from "./config/mongodb.js"
+import generationQueue from './workers/generationQueue.js';
+
+// Standalone generation worker process. Run as many as needed next to API
+// servers started with JOB_WORKERS=0; each drains the MongoDB job queue.
+
+connectDB().then(()=>{
+    generationQueue.startWorkers();
+})
+
+process.on('SIGTERM', () => {
+    generationQueue.stopWorkers();
+    setTimeout(() => process.exit(0), 1000).unref();
+});
@@ -0,0 +1,229 @@
+import { EventEmitter } from "node:events";
+import os from "node:os";
+import jobModel from "../models/jobSchema.js";
+import imageGenerator from "../utils/imageGenerator.js";
+import credits from "../utils/credits.js";
+import logger from "../utils/logger.js";
+
+// Image generation job queue persisted in MongoDB. A bounded number of workers
+// (in the API process, or in separate `npm run worker` processes) claim queued
+// jobs atomically, oldest first, skipping users that already have their share
+// of running jobs so one user's burst cannot starve everyone else.
+
+const config = {
+    concurrency: Number(process.env.JOB_WORKERS ?? 4),
+    pollIntervalMs: Number(process.env.JOB_POLL_INTERVAL_MS || 500),
+    maxRunningPerUser: Number(process.env.JOB_MAX_RUNNING_PER_USER || 1),
+    maxQueuedPerUser: Number(process.env.JOB_MAX_QUEUED_PER_USER || 5),
+    maxQueued: Number(process.env.JOB_MAX_QUEUED || 1000),
+    staleAfterMs: Number(process.env.JOB_STALE_AFTER_SECONDS || 120) * 1000,
+    // Claims a job gets before a worker that keeps dying or hanging on it gives up.
+    maxAttempts: Number(process.env.JOB_MAX_ATTEMPTS || 3),
+    resultTtlMs: Number(process.env.JOB_RESULT_TTL_SECONDS || 60 * 60) * 1000,
+};
+
+const workerId = `${os.hostname()}:${process.pid}`;
+const updates = new EventEmitter();
+const wakeup = new EventEmitter();
+updates.setMaxListeners(0);
+wakeup.setMaxListeners(0);
+
+let running = false;
+let staleTimer = null;
+
+const isFinished = (job) => job.status === "succeeded" || job.status === "failed";
+
+// The caller has already reserved the job's credit; it is refunded if the job fails.
+const enqueue = async (userId, prompt, reservation) => {
+    const [userPending, queued] = await Promise.all([
+        jobModel.countDocuments({userId, status: {$in: ["queued", "running"]}}),
+        jobModel.countDocuments({status: "queued"}),
+    ]);
+    if(userPending >= config.maxQueuedPerUser){
+        return {error: {status: 429, message: "Too many images in progress. Wait for one to finish."}};
+    }
+    if(queued >= config.maxQueued){
+        return {error: {status: 503, message: "Image generation is busy. Try again shortly."}};
+    }
+
+    const job = await jobModel.create({
+        userId,
+        prompt,
+        creditCharged: reservation.charged,
+        creditBalance: reservation.creditBalance,
+        idempotencyKey: reservation.key,
+    });
+    wakeup.emit("job");
+    return {job};
+};
+
+const claimNextJob = async () => {
+    const busyUsers = await jobModel.aggregate([
+        {$match: {status: "running"}},
+        {$group: {_id: "$userId", running: {$sum: 1}}},
+        {$match: {running: {$gte: config.maxRunningPerUser}}},
+    ]);
+
+    return jobModel.findOneAndUpdate(
+        {status: "queued", userId: {$nin: busyUsers.map((user) => user._id)}},
+        {$set: {status: "running", workerId, lockedAt: new Date()}, $inc: {attempts: 1}},
+        {sort: {createdAt: 1}, new: true, lean: true}
+    );
+};
+
+// Matches the job only while this run's claim on it is current. A run that
+// outlived its lock and was requeued must not overwrite or refund the newer run.
+const claimFilter = (job) => ({_id: job._id, workerId, status: "running", attempts: job.attempts});
+
+// Keeps a long upstream call from looking like a dead worker to requeueStaleJobs.
+const heartbeatMs = Math.max(1000, config.staleAfterMs / 4);
+
+const touchJob = (job) => jobModel.updateOne(claimFilter(job), {$set: {lockedAt: new Date()}})
+    .catch((error) => logger.warn("Failed to refresh generation job lock", {jobId: String(job._id), error: error.message}));
+
+const finishJob = async (job, update, filter = claimFilter(job)) => {
+    const finished = await jobModel.findOneAndUpdate(filter, {
+        $set: {...update, expireAt: new Date(Date.now() + config.resultTtlMs)},
+        $unset: {lockedAt: 1},
+    }, {new: true, lean: true});
+    if(!finished){
+        logger.warn("Generation job was reclaimed before it finished", {jobId: String(job._id)});
+        return null;
+    }
+    updates.emit(String(job._id), finished);
+    return finished;
+};
+
+// Gives the job's credit back at most once, and only while this run owns the job.
+const refundJob = async (job, filter = claimFilter(job)) => {
+    const {modifiedCount} = await jobModel.updateOne(
+        {...filter, creditRefunded: {$ne: true}},
+        {$set: {creditRefunded: true}}
+    );
+    if(!modifiedCount){
+        return job.creditBalance;
+    }
+    return credits.refundCredit({
+        userId: job.userId,
+        key: job.idempotencyKey,
+        charged: job.creditCharged,
+        creditBalance: job.creditBalance,
+    });
+};
+
+const runJob = async (job) => {
+    let generated;
+    try {
+        generated = await imageGenerator.fetchImage(job.prompt);
+    } catch (error) {
+        logger.error("Generation job failed", {jobId: String(job._id), error: error.message, upstreamStatus: error.response?.status});
+        const creditBalance = await refundJob(job).catch(() => job.creditBalance);
+        return finishJob(job, {status: "failed", message: "Error generarting image.", creditBalance});
+    }
+    // Outside the try: the image was generated and charged, so a failure to
+    // store it must not refund. The job stays running and is retried once its
+    // lock goes stale.
+    return finishJob(job, {
+        status: "succeeded",
+        message: "Image generated",
+        result: generated.image,
+        cacheStatus: generated.cacheStatus,
+    });
+};
+
+const processJob = async (job) => {
+    const heartbeat = setInterval(() => touchJob(job), heartbeatMs);
+    try {
+        return await runJob(job);
+    } finally {
+        clearInterval(heartbeat);
+    }
+};
+
+const waitForWork = () => new Promise((resolve) => {
+    const done = () => {
+        clearTimeout(timer);
+        wakeup.off("job", done);
+        resolve();
+    };
+    const timer = setTimeout(done, config.pollIntervalMs);
+    wakeup.once("job", done);
+});
+
+const runWorker = async () => {
+    while(running){
+        let job = null;
+        try {
+            job = await claimNextJob();
+        } catch (error) {
+            logger.error("Failed to claim generation job", {error: error.message});
+        }
+        if(job){
+            updates.emit(String(job._id), job);
+            try {
+                await processJob(job);
+            } catch (error) {
+                logger.error("Failed to finish generation job", {jobId: String(job._id), error: error.message});
+            }
+        }else{
+            await waitForWork();
+        }
+    }
+};
+
+// A stale job that has used up its attempts fails and is refunded instead of
+// being requeued again.
+const failExhaustedJob = async (job) => {
+    // Matches only while the job is still in the stale claim that was read.
+    const filter = {_id: job._id, status: "running", attempts: job.attempts, lockedAt: job.lockedAt};
+    logger.warn("Generation job failed after its last attempt", {jobId: String(job._id), attempts: job.attempts});
+    const creditBalance = await refundJob(job, filter).catch(() => job.creditBalance);
+    return finishJob(job, {status: "failed", message: "Error generarting image.", creditBalance}, filter);
+};
+
+// Jobs whose worker died mid-flight go back to the queue, up to maxAttempts claims.
+const requeueStaleJobs = async () => {
+    try {
+        const staleBefore = new Date(Date.now() - config.staleAfterMs);
+        await jobModel.updateMany(
+            {status: "running", lockedAt: {$lt: staleBefore}, attempts: {$lt: config.maxAttempts}},
+            {$set: {status: "queued"}, $unset: {lockedAt: 1, workerId: 1}}
+        );
+        const exhausted = await jobModel.find(
+            {status: "running", lockedAt: {$lt: staleBefore}, attempts: {$gte: config.maxAttempts}}
+        ).lean();
+        for(const job of exhausted){
+            await failExhaustedJob(job);
+        }
+    } catch (error) {
+        logger.error("Failed to requeue stale jobs", {error: error.message});
+    }
+};
+
+const startWorkers = (concurrency = config.concurrency) => {
+    if(running || concurrency <= 0){
+        return;
+    }
+    running = true;
+    requeueStaleJobs();
+    staleTimer = setInterval(requeueStaleJobs, config.staleAfterMs);
+    staleTimer.unref();
+    for(let i = 0; i < concurrency; i++){
+        runWorker();
+    }
+    logger.info("Generation workers started", {concurrency});
+};
+
+const stopWorkers = () => {
+    running = false;
+    clearInterval(staleTimer);
+    wakeup.emit("job");
+};
+
+// Subscribe to status changes of one job made by workers in this process.
+const onJobUpdate = (jobId, listener) => {
+    updates.on(String(jobId), listener);
+    return () => updates.off(String(jobId), listener);
+};
+
+export default {enqueue, startWorkers, stopWorkers, onJobUpdate, isFinished, config};
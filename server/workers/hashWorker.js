@@ -0,0 +1,21 @@
+import { parentPort } from "node:worker_threads";
+import bcrypt from "bcrypt";
+
+// Runs bcrypt on this worker thread with the synchronous API, so hashing never
+// occupies libuv's shared threadpool.
+
+parentPort.on('message', ({id, op, args}) => {
+    try {
+        let result;
+        if(op === 'hash'){
+            result = bcrypt.hashSync(args.password, args.rounds);
+        }else if(op === 'compare'){
+            result = bcrypt.compareSync(args.password, args.hash);
+        }else{
+            throw new Error(`Unknown operation: ${op}`);
+        }
+        parentPort.postMessage({id, result});
+    } catch (error) {
+        parentPort.postMessage({id, error: error.message});
+    }
+});
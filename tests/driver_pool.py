@@ -0,0 +1,223 @@
+"""
+WebDriver pool for the Texmage Selenium tests.
+
+Creating a headless Chrome is the most expensive part of a test run, so the
+driver is built once per process and reused. Between tests the browser is
+reset (cookies, localStorage, sessionStorage) instead of being restarted.
+
+The ChromeDriver discovery strategies that used to live in
+TexmageTestSuite.setUpClass are here as well. The path that worked is cached
+in the CHROMEDRIVER_PATH environment variable so that worker processes
+started by parallel_runner.py skip the discovery entirely.
+"""
+
+import os
+import threading
+import queue
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+from test_config import CHROME_OPTIONS
+
+# Optional import for webdriver-manager
+try:
+    from webdriver_manager.chrome import ChromeDriverManager
+    WEBDRIVER_MANAGER_AVAILABLE = True
+except ImportError:
+    WEBDRIVER_MANAGER_AVAILABLE = False
+
+
+DRIVER_INIT_ERROR = """
+            ============================================
+            ChromeDriver initialization failed!
+            ============================================
+            Please try one of the following solutions:
+
+            1. Install ChromeDriver manually:
+               - Download from: https://chromedriver.chromium.org/
+               - Extract chromedriver.exe to a folder in your PATH
+               - Or place it in the tests directory
+
+            2. Reinstall webdriver-manager:
+               pip install --upgrade webdriver-manager
+
+            3. Ensure Chrome browser is installed and up to date
+
+            4. Check if ChromeDriver version matches your Chrome version
+            ============================================
+            """
+
+
+def get_base_url():
+    """Get base URL from environment variable or use default"""
+    return os.getenv('BASE_URL', os.getenv('APP_URL', 'http://localhost:5173'))
+
+
+def build_chrome_options():
+    """Build headless Chrome options shared by every driver"""
+    chrome_options = Options()
+    for argument in CHROME_OPTIONS:
+        chrome_options.add_argument(argument)
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    return chrome_options
+
+
+def _resolve_webdriver_manager_path():
+    """Install ChromeDriver through webdriver-manager and return the executable path"""
+    driver_path = ChromeDriverManager().install()
+    if not os.path.exists(driver_path):
+        raise FileNotFoundError(f"ChromeDriver not found at: {driver_path}")
+
+    # On Windows, ensure it's .exe (webdriver-manager sometimes returns wrong file)
+    if os.name == 'nt' and (not driver_path.endswith('.exe') or 'THIRD_PARTY' in driver_path):
+        dir_path = os.path.dirname(driver_path)
+        for candidate in (dir_path, os.path.dirname(dir_path)):
+            possible_exe = os.path.join(candidate, 'chromedriver.exe')
+            if os.path.exists(possible_exe):
+                return possible_exe
+        raise FileNotFoundError("chromedriver.exe not found in webdriver-manager directory")
+
+    return driver_path
+
+
+def create_chrome_driver(chrome_options=None):
+    """
+    Create a headless Chrome WebDriver.
+
+    Strategies are tried in order: a cached CHROMEDRIVER_PATH, the system
+    ChromeDriver in PATH, webdriver-manager and finally common install
+    locations. The first path that works is cached for later calls.
+    """
+    chrome_options = chrome_options or build_chrome_options()
+
+    # Strategy 0: Reuse a path resolved earlier (or set by the Docker image)
+    cached_path = os.getenv('CHROMEDRIVER_PATH')
+    if cached_path and os.path.exists(cached_path):
+        try:
+            return webdriver.Chrome(service=Service(cached_path), options=chrome_options)
+        except Exception as e:
+            print(f"⚠ Cached ChromeDriver at {cached_path} failed: {str(e)}")
+
+    # Strategy 1: Try system ChromeDriver in PATH first (most reliable)
+    try:
+        print("Attempting to use system ChromeDriver...")
+        driver = webdriver.Chrome(options=chrome_options)
+        print("✓ ChromeDriver initialized using system PATH")
+        return driver
+    except Exception as e:
+        print(f"⚠ System ChromeDriver failed: {str(e)}")
+
+    # Strategy 2: Try webdriver-manager if system driver failed
+    if WEBDRIVER_MANAGER_AVAILABLE:
+        try:
+            print("Attempting to use webdriver-manager...")
+            driver_path = _resolve_webdriver_manager_path()
+            driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+            os.environ['CHROMEDRIVER_PATH'] = driver_path
+            print("✓ ChromeDriver initialized using webdriver-manager")
+            return driver
+        except Exception as e:
+            print(f"⚠ webdriver-manager failed: {str(e)}")
+
+    # Strategy 3: Try with explicit chromedriver path (common locations)
+    possible_paths = [
+        os.path.join(os.getcwd(), 'chromedriver.exe'),
+        os.path.join(os.path.expanduser('~'), 'chromedriver.exe'),
+        'C:\\chromedriver\\chromedriver.exe',
+        'C:\\Program Files\\chromedriver\\chromedriver.exe',
+    ]
+    for driver_path in possible_paths:
+        if os.path.exists(driver_path):
+            try:
+                print(f"Attempting to use ChromeDriver at: {driver_path}")
+                driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+                os.environ['CHROMEDRIVER_PATH'] = driver_path
+                print(f"✓ ChromeDriver initialized from: {driver_path}")
+                return driver
+            except Exception as e:
+                print(f"⚠ Failed to use ChromeDriver at {driver_path}: {str(e)}")
+
+    raise RuntimeError(DRIVER_INIT_ERROR)
+
+
+def reset_driver(driver, base_url):
+    """
+    Reset browser state between tests without restarting Chrome.
+
+    Storage can only be cleared for the origin that is currently loaded, so
+    the driver is moved onto the app origin first if needed.
+    """
+    driver.delete_all_cookies()
+    if not driver.current_url.startswith(base_url):
+        driver.get(base_url)
+    driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+
+
+class DriverPool:
+    """
+    A fixed-size pool of pre-warmed headless Chrome drivers.
+
+    Drivers are started once (and navigated to the app so the first test does
+    not pay for a cold page load) and handed out with acquire()/release().
+    """
+
+    def __init__(self, size=1, base_url=None):
+        self.size = size
+        self.base_url = base_url or get_base_url()
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start and pre-warm every driver in the pool"""
+        with self._lock:
+            while len(self._drivers) < self.size:
+                driver = create_chrome_driver()
+                driver.get(self.base_url)
+                self._drivers.append(driver)
+                self._idle.put(driver)
+        return self
+
+    def acquire(self, timeout=None):
+        """Take a clean driver out of the pool"""
+        if not self._drivers:
+            self.start()
+        driver = self._idle.get(timeout=timeout)
+        reset_driver(driver, self.base_url)
+        return driver
+
+    def release(self, driver):
+        """Return a driver to the pool for reuse"""
+        self._idle.put(driver)
+
+    def close(self):
+        """Quit every driver in the pool"""
+        with self._lock:
+            for driver in self._drivers:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+            self._drivers = []
+            self._idle = queue.Queue()
+
+
+# Process-wide pool. parallel_runner.py starts it in each worker process;
+# when the suite is run directly it is started lazily by the first test class.
+_process_pool = None
+
+
+def get_process_pool():
+    """Return the pool shared by every test class in this process"""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = DriverPool(size=1)
+    return _process_pool
+
+
+def is_process_pool_managed():
+    """True when a runner owns the process pool and will close it itself"""
+    return os.getenv('TEXMAGE_POOLED_DRIVER') == '1'
@@ -0,0 +1,155 @@
+"""
+Parallel runner for the Texmage Selenium test suite.
+
+The test_XX_* methods of TexmageTestSuite are sharded round-robin across N
+worker processes. Each worker starts one pre-warmed headless Chrome when it
+boots and reuses it for every test in its shard; browser state is reset
+between tests instead of restarting Chrome. Logged-in sessions for
+@authenticated tests are created through the API once, before the workers
+start, and shared with them through the sessions cache file.
+
+Usage:
+    python parallel_runner.py              # one worker per CPU core
+    python parallel_runner.py -n 4         # four workers
+    TEST_WORKERS=4 python parallel_runner.py
+    python parallel_runner.py --stack      # start the local test stack first (see stack.py)
+"""
+
+import argparse
+import io
+import multiprocessing
+import multiprocessing.util
+import os
+import sys
+import time
+import unittest
+
+
+def get_test_names():
+    """Return the test method names of the suite in definition order"""
+    from test_texmage import TexmageTestSuite
+    return list(unittest.TestLoader().getTestCaseNames(TexmageTestSuite))
+
+
+def seed_sessions(test_names):
+    """Create the API sessions the workers will share, if any test needs one"""
+    from test_texmage import TexmageTestSuite
+    from sessions import SEEDED_ENV, SessionError, SessionStore, is_authenticated_test
+
+    if not any(is_authenticated_test(TexmageTestSuite(name)) for name in test_names):
+        return
+    try:
+        SessionStore().seed()
+        # Spawned workers inherit the environment and trust the cache file.
+        os.environ[SEEDED_ENV] = '1'
+    except SessionError as error:
+        print(f"⚠ Could not seed API sessions, authenticated tests will retry: {error}")
+
+
+def shard_tests(test_names, workers):
+    """Split test names round-robin into at most `workers` non-empty shards"""
+    shards = [test_names[i::workers] for i in range(workers)]
+    return [shard for shard in shards if shard]
+
+
+def _init_worker():
+    """Start this worker's driver pool once, before any test runs"""
+    os.environ['TEXMAGE_POOLED_DRIVER'] = '1'
+    from driver_pool import get_process_pool
+    pool = get_process_pool().start()
+    # Quit Chrome when the worker exits after pool.close()/join()
+    multiprocessing.util.Finalize(None, pool.close, exitpriority=10)
+
+
+def _run_shard(test_names):
+    """Run one shard of tests on this worker's pooled driver"""
+    from test_texmage import TexmageTestSuite
+
+    suite = unittest.TestSuite(TexmageTestSuite(name) for name in test_names)
+    stream = io.StringIO()
+    started = time.perf_counter()
+    result = unittest.TextTestRunner(stream=stream, verbosity=2).run(suite)
+
+    return {
+        'pid': os.getpid(),
+        'tests': test_names,
+        'tests_run': result.testsRun,
+        'failures': [(str(test), trace) for test, trace in result.failures],
+        'errors': [(str(test), trace) for test, trace in result.errors],
+        'skipped': len(result.skipped),
+        'duration': time.perf_counter() - started,
+        'output': stream.getvalue(),
+    }
+
+
+def run_parallel(workers):
+    """Run the whole suite across `workers` processes and return the shard results"""
+    test_names = get_test_names()
+    seed_sessions(test_names)
+    shards = shard_tests(test_names, workers)
+    print(f"Running {sum(len(s) for s in shards)} tests across {len(shards)} worker(s)")
+
+    context = multiprocessing.get_context('spawn')
+    pool = context.Pool(processes=len(shards), initializer=_init_worker)
+    try:
+        results = pool.map(_run_shard, shards, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+def print_summary(results, elapsed):
+    """Print per-shard output and an overall summary, mirroring test_texmage.py"""
+    for shard in results:
+        print("\n" + "-" * 60)
+        print(f"Worker {shard['pid']} ({shard['duration']:.1f}s): {', '.join(shard['tests'])}")
+        print("-" * 60)
+        print(shard['output'])
+
+    tests_run = sum(shard['tests_run'] for shard in results)
+    failures = sum(len(shard['failures']) for shard in results)
+    errors = sum(len(shard['errors']) for shard in results)
+
+    print("\n" + "=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+    print(f"Workers: {len(results)}")
+    print(f"Tests run: {tests_run}")
+    print(f"Successes: {tests_run - failures - errors}")
+    print(f"Failures: {failures}")
+    print(f"Errors: {errors}")
+    print(f"Wall time: {elapsed:.1f}s")
+    print("=" * 60)
+    return failures == 0 and errors == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Texmage Selenium suite in parallel")
+    parser.add_argument(
+        '-n', '--workers', type=int,
+        default=int(os.getenv('TEST_WORKERS', os.cpu_count() or 1)),
+        help="number of worker processes (default: TEST_WORKERS or CPU count)")
+    parser.add_argument(
+        '--stack', action='store_true',
+        help="start MongoDB, the ClipDrop stub and the server (stack.py) and test against them")
+    args = parser.parse_args(argv)
+
+    stack = None
+    if args.stack:
+        from stack import TestStack
+        stack = TestStack().start()
+        # Spawned workers inherit these.
+        os.environ.update(stack.env())
+    try:
+        started = time.perf_counter()
+        results = run_parallel(max(1, args.workers))
+        ok = print_summary(results, time.perf_counter() - started)
+    finally:
+        if stack:
+            stack.stop()
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
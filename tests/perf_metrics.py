@@ -0,0 +1,225 @@
+"""
+Front-end performance measurement for the Texmage perf budget suite.
+
+A small observer script is injected into every document through CDP
+(Page.addScriptToEvaluateOnNewDocument), so Largest Contentful Paint, layout
+shifts and long tasks are recorded from the very first frame. After a cold
+load (browser cache cleared and disabled through CDP) the page's Navigation
+Timing and Resource Timing entries and Chrome's own Performance.getMetrics
+counters are read back and flattened into one dict of numbers per load.
+
+The statistics helpers at the bottom compare repeated runs against budgets
+and against earlier runs without third-party packages.
+"""
+
+import math
+import os
+import statistics
+
+from selenium.common.exceptions import WebDriverException
+
+PERF_OBSERVER_SCRIPT = """
+(function () {
+    if (window.__texmagePerf) { return; }
+    var perf = window.__texmagePerf = {lcp: 0, cls: 0, longTasks: [], lastEntryAt: performance.now()};
+
+    function observe(type, callback) {
+        try {
+            new PerformanceObserver(function (list) {
+                list.getEntries().forEach(callback);
+                perf.lastEntryAt = performance.now();
+            }).observe({type: type, buffered: true});
+        } catch (error) {
+            // Entry type not supported by this browser.
+        }
+    }
+
+    observe('largest-contentful-paint', function (entry) {
+        perf.lcp = entry.renderTime || entry.loadTime || entry.startTime;
+    });
+    observe('layout-shift', function (entry) {
+        if (!entry.hadRecentInput) { perf.cls += entry.value; }
+    });
+    observe('longtask', function (entry) {
+        perf.longTasks.push(entry.duration);
+    });
+})();
+"""
+
+COLLECT_SCRIPT = """
+var perf = window.__texmagePerf || {lcp: 0, cls: 0, longTasks: []};
+var nav = performance.getEntriesByType('navigation')[0];
+var resources = performance.getEntriesByType('resource');
+var transfer = (nav ? nav.transferSize : 0);
+var byType = {};
+resources.forEach(function (entry) {
+    transfer += entry.transferSize || 0;
+    byType[entry.initiatorType] = (byType[entry.initiatorType] || 0) + (entry.transferSize || 0);
+});
+return {
+    ttfb_ms: nav ? nav.responseStart - nav.startTime : 0,
+    dom_content_loaded_ms: nav ? nav.domContentLoadedEventEnd - nav.startTime : 0,
+    load_ms: nav ? nav.loadEventEnd - nav.startTime : 0,
+    lcp_ms: perf.lcp,
+    cls: perf.cls,
+    long_task_count: perf.longTasks.length,
+    // Total blocking time: the part of each long task above 50ms.
+    long_task_blocking_ms: perf.longTasks.reduce(function (sum, d) { return sum + Math.max(0, d - 50); }, 0),
+    transfer_bytes: transfer,
+    script_transfer_bytes: byType.script || 0,
+    image_transfer_bytes: byType.img || 0,
+    request_count: resources.length + 1
+};
+"""
+
+# Chrome's Performance.getMetrics counters worth keeping, renamed to our units.
+CDP_METRICS = {
+    'ScriptDuration': ('script_duration_ms', 1000),
+    'LayoutDuration': ('layout_duration_ms', 1000),
+    'RecalcStyleDuration': ('style_duration_ms', 1000),
+    'JSHeapUsedSize': ('js_heap_used_bytes', 1),
+}
+
+
+def install_perf_observers(driver):
+    """Register the Web Vitals observers for every document this driver loads"""
+    if getattr(driver, '_texmage_perf_observers', False):
+        return
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': PERF_OBSERVER_SCRIPT})
+    driver.execute_cdp_cmd('Performance.enable', {})
+    driver._texmage_perf_observers = True
+
+
+def prepare_cold_load(driver):
+    """
+    Make the next navigation a first visit: no HTTP cache, and optionally a
+    throttled CPU and network (PERF_CPU_SLOWDOWN, PERF_NETWORK_KBPS,
+    PERF_NETWORK_LATENCY_MS) for steadier, more user-like numbers.
+    """
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+    driver.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': True})
+
+    cpu_slowdown = float(os.getenv('PERF_CPU_SLOWDOWN', '1'))
+    driver.execute_cdp_cmd('Emulation.setCPUThrottlingRate', {'rate': cpu_slowdown})
+
+    kbps = float(os.getenv('PERF_NETWORK_KBPS', '0'))
+    if kbps:
+        throughput = kbps * 1024 / 8
+        driver.execute_cdp_cmd('Network.emulateNetworkConditions', {
+            'offline': False,
+            'latency': float(os.getenv('PERF_NETWORK_LATENCY_MS', '40')),
+            'downloadThroughput': throughput,
+            'uploadThroughput': throughput,
+        })
+
+
+def vitals_settled(quiet_ms=1000):
+    """Condition: the page has loaded and no LCP/CLS/long-task entry arrived for quiet_ms"""
+    def _predicate(driver):
+        return driver.execute_script(
+            "var perf = window.__texmagePerf;"
+            "var nav = performance.getEntriesByType('navigation')[0];"
+            "return !!perf && !!nav && nav.loadEventEnd > 0"
+            " && (performance.now() - perf.lastEntryAt) >= arguments[0];", quiet_ms)
+    return _predicate
+
+
+def collect_page_metrics(driver):
+    """Read the current page's timings, vitals and byte counts as a flat dict"""
+    metrics = driver.execute_script(COLLECT_SCRIPT)
+    try:
+        counters = driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']
+    except WebDriverException:
+        counters = []
+    for counter in counters:
+        if counter['name'] in CDP_METRICS:
+            name, scale = CDP_METRICS[counter['name']]
+            metrics[name] = counter['value'] * scale
+    return {name: round(float(value), 4) for name, value in metrics.items()}
+
+
+# --- Statistics --------------------------------------------------------------
+
+def summarize(samples):
+    """Median, quartiles and spread of a list of numbers"""
+    ordered = sorted(samples)
+    quartiles = statistics.quantiles(ordered, n=4) if len(ordered) > 1 else [ordered[0]] * 3
+    return {
+        'median': statistics.median(ordered),
+        'p25': quartiles[0],
+        'p75': quartiles[2],
+        'min': ordered[0],
+        'max': ordered[-1],
+        'stdev': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        'n': len(ordered),
+    }
+
+
+def mann_whitney_greater(current, baseline):
+    """
+    One-sided Mann-Whitney U test that `current` tends to be larger than
+    `baseline`. Returns the p-value from the normal approximation with tie
+    correction; small samples make it conservative, which suits a build gate.
+    """
+    n1, n2 = len(current), len(baseline)
+    if not n1 or not n2:
+        return 1.0
+    combined = sorted([(value, 0) for value in current] + [(value, 1) for value in baseline])
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tie_term += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def check_budgets(summary, budgets):
+    """List the metrics whose median is over budget"""
+    violations = []
+    for metric, limit in budgets.items():
+        if metric in summary and summary[metric]['median'] > limit:
+            violations.append(f"{metric}: median {summary[metric]['median']:.4g} > budget {limit:.4g}")
+    return violations
+
+
+def check_regressions(samples, baseline_samples, regression):
+    """
+    List the metrics that got significantly worse than the baseline runs.
+    Only metrics listed in `min_delta` are checked; each must have grown by
+    more than its `min_delta` (absolute) and `tolerance` (relative to the
+    baseline median), with a Mann-Whitney p-value below `alpha`.
+    """
+    violations = []
+    for metric, min_delta in regression['min_delta'].items():
+        values = samples.get(metric)
+        baseline = baseline_samples.get(metric)
+        if not values or not baseline or len(baseline) < 3:
+            continue
+        current_median = statistics.median(values)
+        baseline_median = statistics.median(baseline)
+        delta = current_median - baseline_median
+        if delta <= min_delta:
+            continue
+        if baseline_median and delta / baseline_median <= regression['tolerance']:
+            continue
+        p_value = mann_whitney_greater(values, baseline)
+        if p_value < regression['alpha']:
+            violations.append(
+                f"{metric}: median {current_median:.4g} vs baseline {baseline_median:.4g} "
+                f"(+{delta:.4g}, p={p_value:.3f})")
+    return violations
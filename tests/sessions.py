@@ -0,0 +1,178 @@
+"""
+API-seeded login sessions for the Texmage Selenium suite.
+
+Tests that need a logged-in user but are not about the login/signup UI get
+one without touching the modal: a batch of users is created through the API
+once per run (concurrently, so bcrypt runs in parallel on the server), their
+JWTs are cached in a JSON file, and a session is written into localStorage
+as the `token` and `user` keys AppContext.jsx reads on startup.
+
+The cache survives between runs; cached sessions are checked against
+GET /credits and only missing or expired ones are recreated. parallel_runner.py
+seeds before it starts its workers, which then read the file as is.
+
+    from sessions import authenticated
+
+    @authenticated
+    def test_something_logged_in(self):
+        ...
+"""
+
+import json
+import os
+import random
+import string
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SESSIONS_FILE = os.getenv('SESSIONS_FILE', os.path.join(TESTS_DIR, '.sessions.json'))
+SESSION_USERS = int(os.getenv('SESSION_USERS', '4'))
+SEED_CONCURRENCY = int(os.getenv('SESSION_SEED_CONCURRENCY', '8'))
+SESSION_PASSWORD = 'Session123!'
+REQUEST_TIMEOUT = 15
+MAX_ATTEMPTS = 5
+
+# Set by parallel_runner.py once the cache file holds enough valid sessions.
+SEEDED_ENV = 'TEXMAGE_SESSIONS_SEEDED'
+
+
+class SessionError(RuntimeError):
+    """Raised when sessions cannot be created, usually because the API is down"""
+
+
+def get_api_url():
+    """API server URL; same as the app when the server serves the client build"""
+    return os.getenv('API_URL', os.getenv('BACKEND_URL', 'http://localhost:3000')).rstrip('/')
+
+
+def authenticated(test):
+    """Mark a test to start logged in as a seeded user instead of going through the UI"""
+    test.authenticated = True
+    return test
+
+
+def is_authenticated_test(test_case):
+    """True when the running test method was marked with @authenticated"""
+    return getattr(getattr(test_case, test_case._testMethodName), 'authenticated', False)
+
+
+def _request(method, url, body=None, token=None):
+    """
+    Send a JSON request and return (status, payload). 429 and 503 answers are
+    retried after their Retry-After, since bulk signups can hit the signup
+    rate limit or a busy password-hashing pool.
+    """
+    data = json.dumps(body).encode() if body is not None else None
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['token'] = token
+    for attempt in range(MAX_ATTEMPTS):
+        request = urllib.request.Request(url, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                return response.status, json.loads(response.read() or b'{}')
+        except urllib.error.HTTPError as error:
+            if error.code in (429, 503) and attempt + 1 < MAX_ATTEMPTS:
+                time.sleep(float(error.headers.get('Retry-After') or 1))
+                continue
+            try:
+                return error.code, json.loads(error.read() or b'{}')
+            except ValueError:
+                return error.code, {}
+        except (urllib.error.URLError, OSError) as error:
+            raise SessionError(f"API unreachable at {url}: {error}") from error
+    raise SessionError(f"{method} {url} kept being throttled")
+
+
+def create_session(api_url):
+    """Sign up a fresh user and return its {'token', 'user'} session"""
+    suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=10))
+    status, payload = _request('POST', f"{api_url}/signup", {
+        'name': f"Session_{suffix[:6]}",
+        'email': f"session_{suffix}@example.com",
+        'password': SESSION_PASSWORD,
+    })
+    if not payload.get('success'):
+        raise SessionError(f"Signup failed ({status}): {payload.get('message')}")
+    return {'token': payload['token'], 'user': payload['user']}
+
+
+def is_valid(api_url, session):
+    """The session's token is still accepted by the API"""
+    status, payload = _request('GET', f"{api_url}/credits", token=session['token'])
+    return status == 200 and bool(payload.get('success'))
+
+
+class SessionStore:
+    """A pool of logged-in users for one API, cached in SESSIONS_FILE"""
+
+    def __init__(self, api_url=None, path=SESSIONS_FILE):
+        self.api_url = api_url or get_api_url()
+        self.path = path
+        self.sessions = self._load().get(self.api_url, [])
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        cache = self._load()
+        cache[self.api_url] = self.sessions
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def seed(self, count=SESSION_USERS):
+        """Make sure at least `count` valid sessions exist, creating the missing ones in bulk"""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=SEED_CONCURRENCY) as executor:
+            checks = list(executor.map(lambda session: is_valid(self.api_url, session), self.sessions))
+            self.sessions = [session for session, ok in zip(self.sessions, checks) if ok]
+            missing = max(0, count - len(self.sessions))
+            self.sessions += list(executor.map(lambda _: create_session(self.api_url), range(missing)))
+        self._save()
+        print(f"🔑 {len(self.sessions)} API sessions ready ({missing} created) "
+              f"in {time.perf_counter() - started:.2f}s")
+        return self
+
+    def get(self, index=0):
+        """The session at `index`, wrapping around the pool"""
+        if not self.sessions:
+            raise SessionError("No sessions seeded")
+        return self.sessions[index % len(self.sessions)]
+
+
+_process_store = None
+
+
+def get_session_store():
+    """This process's session store, seeded on first use unless a runner already did"""
+    global _process_store
+    if _process_store is None:
+        store = SessionStore()
+        if not (os.getenv(SEEDED_ENV) and store.sessions):
+            store.seed()
+        _process_store = store
+    return _process_store
+
+
+def apply_session(driver, base_url, session):
+    """
+    Store a session where AppContext looks for it. The next page load starts
+    logged in; the current page is not reloaded.
+    """
+    if not driver.current_url.startswith(base_url):
+        driver.get(base_url)
+    driver.execute_script(
+        "localStorage.setItem('token', arguments[0]);"
+        "localStorage.setItem('user', JSON.stringify(arguments[1]));",
+        session['token'], session['user'])
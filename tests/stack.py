@@ -0,0 +1,413 @@
+"""
+Local test stack for the Texmage Selenium suite.
+
+Starts everything the UI tests talk to, on free ports, and only returns once
+each piece is actually ready:
+
+1. MongoDB: MONGODB_URI when given, otherwise a throwaway mongod whose data
+   lives in RAM (/dev/shm) or, without a mongod binary, a `mongo` container
+   on tmpfs. Ready when it answers a `ping` command.
+2. The ClipDrop stub from loadtest/, so image generation never calls the paid
+   API. Ready when /__stub/stats answers.
+3. The API server (node server.js), which also serves the prebuilt
+   client/dist. Ready when GET /health returns 200, i.e. it is listening and
+   connected to MongoDB.
+4. The client: ready when headless Chrome sees the React root mounted.
+
+`npm ci` runs only when a package's lockfile changed, and the client is only
+rebuilt when its lockfile, sources or build settings changed; the hashes are
+kept next to node_modules.
+
+    python stack.py -- python parallel_runner.py     # run a command against the stack
+    python stack.py                                   # start it and wait for Ctrl-C
+
+The command gets BASE_URL, APP_URL and API_URL pointing at the stack.
+parallel_runner.py --stack does the same in-process.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TESTS_DIR)
+SERVER_DIR = os.path.join(ROOT_DIR, 'server')
+CLIENT_DIR = os.path.join(ROOT_DIR, 'client')
+STUB_SCRIPT = os.path.join(ROOT_DIR, 'loadtest', 'clipdrop_stub.py')
+
+MONGO_IMAGE = os.getenv('STACK_MONGO_IMAGE', 'mongo:7.0')
+READY_TIMEOUT = float(os.getenv('STACK_READY_TIMEOUT', '60'))
+POLL_INTERVAL = 0.05
+
+# Inputs of the client build besides the lockfile; a change to any of them rebuilds dist.
+CLIENT_BUILD_INPUTS = ['src', 'public', 'scripts', 'index.html', 'vite.config.js', 'package.json']
+
+
+class StackError(RuntimeError):
+    """Raised when a part of the stack fails to start or become ready"""
+
+
+def free_port():
+    """A TCP port nothing is listening on right now"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def http_status(url, timeout=1.0):
+    """Status code of GET url, or None when nothing answers"""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+    except (urllib.error.URLError, OSError):
+        return None
+
+
+def _recv_exact(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise OSError("connection closed")
+        data += chunk
+    return data
+
+
+def mongo_ping(host, port, timeout=1.0):
+    """
+    Send {ping: 1} to MongoDB as an OP_MSG and report whether it answered ok.
+    Written against the wire protocol directly so the tests need no driver.
+    """
+    body = (b'\x10ping\x00' + struct.pack('<i', 1)
+            + b'\x02$db\x00' + struct.pack('<i', 6) + b'admin\x00')
+    document = struct.pack('<i', len(body) + 5) + body + b'\x00'
+    payload = struct.pack('<I', 0) + b'\x00' + document
+    header = struct.pack('<iiii', 16 + len(payload), 1, 0, 2013)
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.sendall(header + payload)
+            length = struct.unpack('<i', _recv_exact(sock, 4))[0]
+            reply = _recv_exact(sock, length - 4)
+    except OSError:
+        return False
+    # requestID, responseTo, opCode, flagBits and the section kind precede the document.
+    reply_document = reply[17:]
+    index = reply_document.find(b'\x01ok\x00')
+    return index != -1 and struct.unpack_from('<d', reply_document, index + 4)[0] == 1.0
+
+
+def file_digest(digest, path):
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+
+
+def tree_hash(base, entries, extra=''):
+    """sha256 over the named files and directories under base (paths and contents)"""
+    digest = hashlib.sha256(extra.encode())
+    for entry in entries:
+        path = os.path.join(base, entry)
+        if os.path.isfile(path):
+            digest.update(entry.encode())
+            file_digest(digest, path)
+            continue
+        for folder, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(folder, name)
+                digest.update(os.path.relpath(file_path, base).encode())
+                file_digest(digest, file_path)
+    return digest.hexdigest()
+
+
+def read_stamp(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def write_stamp(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(value)
+
+
+def run_step(name, command, cwd, env=None):
+    """Run a setup command, failing the stack with its output if it fails"""
+    started = time.perf_counter()
+    print(f"  … {name}")
+    result = subprocess.run(command, cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise StackError(f"{name} failed:\n{result.stdout[-2000:]}{result.stderr[-2000:]}")
+    print(f"  ✓ {name} in {time.perf_counter() - started:.1f}s")
+
+
+def ensure_node_modules(package_dir, production=False):
+    """`npm ci` unless node_modules was installed from this exact lockfile"""
+    lockfile = os.path.join(package_dir, 'package-lock.json')
+    stamp = os.path.join(package_dir, 'node_modules', '.texmage-lock-hash')
+    lock_hash = tree_hash(package_dir, ['package-lock.json'], extra=f"production={production}")
+    if read_stamp(stamp) == lock_hash:
+        print(f"  ✓ {os.path.basename(package_dir)} dependencies cached")
+        return
+    if not os.path.exists(lockfile):
+        raise StackError(f"{lockfile} is missing")
+    command = ['npm', 'ci', '--no-audit', '--no-fund'] + (['--omit=dev'] if production else [])
+    run_step(f"npm ci in {os.path.basename(package_dir)}", command, package_dir)
+    write_stamp(stamp, lock_hash)
+
+
+def ensure_client_build():
+    """Build client/dist for same-origin serving unless an identical build exists"""
+    stamp = os.path.join(CLIENT_DIR, 'node_modules', '.cache', 'texmage-build-hash')
+    build_hash = tree_hash(CLIENT_DIR, ['package-lock.json'] + CLIENT_BUILD_INPUTS, extra='VITE_BACKEND_URL=')
+    if read_stamp(stamp) == build_hash and os.path.exists(os.path.join(CLIENT_DIR, 'dist', 'index.html')):
+        print("  ✓ client build cached")
+        return
+    # An empty backend URL makes the client call the server that serves it.
+    env = dict(os.environ, VITE_BACKEND_URL='')
+    run_step("client build", ['npm', 'run', 'build'], CLIENT_DIR, env=env)
+    write_stamp(stamp, build_hash)
+
+
+class TestStack:
+    """MongoDB, the ClipDrop stub and the API server serving the client build"""
+
+    def __init__(self, mongo_uri=None, port=0, build=True, browser_check=True,
+                 stub_latency='fixed:50', log_dir=TESTS_DIR):
+        self.mongo_uri = mongo_uri or os.getenv('MONGODB_URI')
+        self.port = port or free_port()
+        self.build = build
+        self.browser_check = browser_check
+        self.stub_latency = stub_latency
+        self.log_dir = log_dir
+        self.processes = []
+        self.mongo_container = None
+        self.temp_dirs = []
+        self.timings = []
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    # --- lifecycle ------------------------------------------------------------
+
+    def start(self):
+        started = time.perf_counter()
+        print("🚀 Starting test stack")
+        try:
+            if self.build:
+                ensure_node_modules(SERVER_DIR, production=True)
+                ensure_node_modules(CLIENT_DIR)
+                ensure_client_build()
+            self._start_mongo()
+            stub_url = self._start_stub()
+            self._start_server(stub_url)
+            if self.browser_check:
+                self._check_client()
+        except BaseException:
+            self.stop()
+            raise
+        print(f"✓ Test stack ready at {self.base_url} in {time.perf_counter() - started:.1f}s")
+        return self
+
+    def stop(self):
+        """Stop everything this stack started, newest first"""
+        for process, _ in reversed(self.processes):
+            if process.poll() is None:
+                process.send_signal(signal.SIGTERM)
+        for process, log in reversed(self.processes):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            log.close()
+        self.processes = []
+        if self.mongo_container:
+            subprocess.run(['docker', 'stop', self.mongo_container], capture_output=True)
+            self.mongo_container = None
+        for path in self.temp_dirs:
+            shutil.rmtree(path, ignore_errors=True)
+        self.temp_dirs = []
+
+    def env(self):
+        """Environment for test processes run against this stack"""
+        return {'BASE_URL': self.base_url, 'APP_URL': self.base_url, 'API_URL': self.base_url}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # --- helpers --------------------------------------------------------------
+
+    def _spawn(self, name, command, cwd, env=None):
+        log_path = os.path.join(self.log_dir, f"stack-{name}.log")
+        log = open(log_path, 'w', encoding='utf-8')
+        process = subprocess.Popen(command, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+        self.processes.append((process, log))
+        return process
+
+    def _wait_ready(self, name, probe, process=None, timeout=READY_TIMEOUT):
+        """Poll probe() until it is truthy; fail early if process exits meanwhile"""
+        started = time.perf_counter()
+        while not probe():
+            if process is not None and process.poll() is not None:
+                raise StackError(f"{name}: process exited with {process.returncode}\n{self._log_tail(process)}")
+            if time.perf_counter() - started > timeout:
+                raise StackError(f"{name}: not ready after {timeout:.0f}s\n{self._log_tail(process)}")
+            time.sleep(POLL_INTERVAL)
+        seconds = time.perf_counter() - started
+        self.timings.append((name, seconds))
+        print(f"  ✓ {name} in {seconds:.2f}s")
+
+    def _log_tail(self, process, lines=30):
+        for candidate, log in self.processes:
+            if candidate is process:
+                log.flush()
+                with open(log.name, encoding='utf-8', errors='replace') as f:
+                    return ''.join(f.readlines()[-lines:])
+        return ''
+
+    # --- components -----------------------------------------------------------
+
+    def _start_mongo(self):
+        if self.mongo_uri:
+            host, port = self._mongo_address(self.mongo_uri)
+            if host:
+                self._wait_ready("MongoDB ping", lambda: mongo_ping(host, port))
+            return
+
+        port = free_port()
+        mongod = shutil.which(os.getenv('MONGOD_BIN', 'mongod'))
+        if mongod:
+            shm = '/dev/shm' if os.path.isdir('/dev/shm') else None
+            db_path = tempfile.mkdtemp(prefix='texmage-mongo-', dir=shm)
+            self.temp_dirs.append(db_path)
+            process = self._spawn('mongod', [
+                mongod, '--dbpath', db_path, '--port', str(port), '--bind_ip', '127.0.0.1',
+                '--wiredTigerCacheSizeGB', '0.25', '--quiet'], cwd=TESTS_DIR)
+        elif shutil.which('docker'):
+            process = None
+            result = subprocess.run(
+                ['docker', 'run', '--rm', '-d', '-p', f"127.0.0.1:{port}:27017", '--tmpfs', '/data/db', MONGO_IMAGE],
+                capture_output=True, text=True)
+            if result.returncode != 0:
+                raise StackError(f"Could not start a {MONGO_IMAGE} container: {result.stderr}")
+            self.mongo_container = result.stdout.strip()
+        else:
+            raise StackError("No MongoDB: set MONGODB_URI, install mongod, or install Docker")
+        self.mongo_uri = f"mongodb://127.0.0.1:{port}"
+        self._wait_ready("MongoDB ping", lambda: mongo_ping('127.0.0.1', port), process)
+
+    @staticmethod
+    def _mongo_address(uri):
+        """(host, port) of a single-host mongodb:// URI; (None, None) when it cannot be pinged directly"""
+        parts = urllib.parse.urlsplit(uri)
+        if parts.scheme != 'mongodb' or ',' in parts.netloc:
+            return None, None
+        return parts.hostname, parts.port or 27017
+
+    def _start_stub(self):
+        port = free_port()
+        process = self._spawn('clipdrop', [
+            sys.executable, STUB_SCRIPT, '--host', '127.0.0.1', '--port', str(port),
+            '--latency', self.stub_latency, '--payload-kb', '64'], cwd=os.path.dirname(STUB_SCRIPT))
+        stub = f"http://127.0.0.1:{port}"
+        self._wait_ready("ClipDrop stub", lambda: http_status(f"{stub}/__stub/stats") == 200, process)
+        return f"{stub}/text-to-image/v1"
+
+    def _start_server(self, clipdrop_url):
+        env = dict(
+            os.environ,
+            NODE_ENV='production',
+            PORT=str(self.port),
+            MONGODB_URI=self.mongo_uri,
+            CLIPDROP_API_URL=clipdrop_url,
+            CLIPDROP_KEY='stub-key',
+            SECRET_KEY=os.getenv('SECRET_KEY', 'texmage-test-secret'),
+            CLIENT_DIST_DIR=os.path.join(CLIENT_DIR, 'dist'),
+            IMAGE_CACHE_DIR=self._temp_dir('texmage-image-cache-'),
+            # The suite signs up and logs in many users from one address.
+            RATE_LIMIT_ENABLED='false',
+            PROMPT_DUPLICATE_LIMIT='0',
+        )
+        process = self._spawn('server', ['node', 'server.js'], cwd=SERVER_DIR, env=env)
+        self._wait_ready("API /health", lambda: http_status(f"{self.base_url}/health") == 200, process)
+
+    def _temp_dir(self, prefix):
+        path = tempfile.mkdtemp(prefix=prefix)
+        self.temp_dirs.append(path)
+        return path
+
+    def _check_client(self):
+        """Load the app once in headless Chrome and wait for React to mount"""
+        from driver_pool import create_chrome_driver
+        from waits import react_root_mounted
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        driver = create_chrome_driver()
+        try:
+            started = time.perf_counter()
+            driver.get(self.base_url)
+            WebDriverWait(driver, READY_TIMEOUT, poll_frequency=POLL_INTERVAL).until(
+                react_root_mounted, "React root never mounted")
+            seconds = time.perf_counter() - started
+            self.timings.append(("React root mounted", seconds))
+            print(f"  ✓ React root mounted in {seconds:.2f}s")
+        finally:
+            driver.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Start the Texmage test stack, optionally running a command against it")
+    parser.add_argument('--mongo-uri', help="use this MongoDB instead of a throwaway one (default: MONGODB_URI)")
+    parser.add_argument('--port', type=int, default=int(os.getenv('STACK_PORT', '0')),
+                        help="API server port (default: a free port)")
+    parser.add_argument('--skip-build', action='store_true', help="use node_modules and client/dist as they are")
+    parser.add_argument('--no-browser-check', action='store_true', help="skip the React-mounted check in Chrome")
+    parser.add_argument('--stub-latency', default='fixed:50', help="ClipDrop stub latency spec (default: fixed:50)")
+    parser.add_argument('command', nargs=argparse.REMAINDER, help="command to run once the stack is ready")
+    args = parser.parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ['--'] else args.command
+
+    stack = TestStack(mongo_uri=args.mongo_uri, port=args.port, build=not args.skip_build,
+                      browser_check=not args.no_browser_check, stub_latency=args.stub_latency)
+    try:
+        stack.start()
+    except StackError as error:
+        print(f"✗ {error}")
+        return 1
+    try:
+        if not command:
+            print(json.dumps(stack.env(), indent=2))
+            print("Press Ctrl-C to stop")
+            while True:
+                time.sleep(1)
+        return subprocess.run(command, cwd=TESTS_DIR, env=dict(os.environ, **stack.env())).returncode
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        stack.stop()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Performance budget suite for Texmage.
+
+Loads each page in perf_budgets.json several times from a cold cache in the
+same headless Chrome the functional suite uses, and fails when:
+
+- the median of a metric is over its checked-in budget, or
+- a metric got significantly worse than the last few recorded runs
+  (see check_regressions in perf_metrics.py).
+
+Every run writes perf-results/perf-report.json (this run's samples and
+summaries). Runs that pass are appended to perf-results/perf-trend.json, which
+later runs use as their baseline; a failing run is kept out of it so that a
+regression cannot become the baseline. PERF_ACCEPT_BASELINE=1 records the run
+anyway, to accept an intended change. Keep that directory between CI builds (archive and restore
+it) for regression detection; budgets are checked either way.
+
+Budgets are meant for the production build (served by the API server or
+`vite preview`), not the Vite dev server.
+
+    python test_perf.py
+    PERF_RUNS=9 PERF_CPU_SLOWDOWN=4 python test_perf.py
+"""
+
+import json
+import os
+import sys
+import time
+import unittest
+from datetime import datetime, timezone
+
+from driver_pool import get_process_pool, is_process_pool_managed, reset_driver
+from perf_metrics import (check_budgets, check_regressions, collect_page_metrics, install_perf_observers,
+                          prepare_cold_load, summarize, vitals_settled)
+from waits import WaitEngine
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGETS_FILE = os.getenv('PERF_BUDGETS_FILE', os.path.join(TESTS_DIR, 'perf_budgets.json'))
+RESULTS_DIR = os.getenv('PERF_RESULTS_DIR', os.path.join(TESTS_DIR, 'perf-results'))
+TREND_LIMIT = 50
+ACCEPT_BASELINE = os.getenv('PERF_ACCEPT_BASELINE') == '1'
+
+
+def load_budgets():
+    with open(BUDGETS_FILE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_trend():
+    path = os.path.join(RESULTS_DIR, 'perf-trend.json')
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def is_flagged(page_report):
+    """Whether a page went over budget or regressed in that run"""
+    return bool(page_report.get('budget_violations') or page_report.get('regressions'))
+
+
+def baseline_samples(trend, page, reports):
+    """Pool the raw samples of `page` from the last `reports` runs where it passed"""
+    passed = [report['pages'][page] for report in trend
+              if page in report.get('pages', {}) and not is_flagged(report['pages'][page])]
+    pooled = {}
+    for page_report in passed[-reports:]:
+        for metric, values in page_report.get('samples', {}).items():
+            pooled.setdefault(metric, []).extend(values)
+    return pooled
+
+
+class TexmagePerfSuite(unittest.TestCase):
+    """Web Vitals and transfer-size budgets for the main pages"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Take the same pre-warmed headless Chrome the functional suite uses"""
+        cls.config = load_budgets()
+        cls.runs = int(os.getenv('PERF_RUNS', cls.config['runs']))
+        cls.warmup_runs = int(os.getenv('PERF_WARMUP_RUNS', cls.config['warmup_runs']))
+        cls.trend = load_trend()
+        cls.report = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'commit': os.getenv('GIT_COMMIT', ''),
+            'runs': cls.runs,
+            'pages': {},
+        }
+
+        cls.pool = get_process_pool()
+        cls.base_url = cls.pool.base_url
+        cls.driver = cls.pool.acquire()
+        cls.waits = WaitEngine(cls.driver, timeout=30)
+        install_perf_observers(cls.driver)
+        print(f"Measuring {cls.base_url}: {cls.runs} runs per page after {cls.warmup_runs} warm-up")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Write the report, extend the trend with a passing run, and hand the browser back"""
+        if cls.report['pages']:
+            cls.report['passed'] = not any(is_flagged(page) for page in cls.report['pages'].values())
+            os.makedirs(RESULTS_DIR, exist_ok=True)
+            with open(os.path.join(RESULTS_DIR, 'perf-report.json'), 'w', encoding='utf-8') as f:
+                json.dump(cls.report, f, indent=2)
+            if cls.report['passed'] or ACCEPT_BASELINE:
+                with open(os.path.join(RESULTS_DIR, 'perf-trend.json'), 'w', encoding='utf-8') as f:
+                    json.dump((cls.trend + [cls.report])[-TREND_LIMIT:], f, indent=2)
+            else:
+                print("\n⚠ Run failed its budgets or regressed; not added to the trend")
+            print(f"\n📈 Performance report written to {RESULTS_DIR}")
+        if cls.driver:
+            # Leave the shared browser the way the functional tests expect it.
+            cls.driver.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': False})
+            cls.driver.execute_cdp_cmd('Emulation.setCPUThrottlingRate', {'rate': 1})
+            cls.pool.release(cls.driver)
+            if not is_process_pool_managed():
+                cls.pool.close()
+
+    def load_once(self, path):
+        """One cold load of path; returns its metrics"""
+        reset_driver(self.driver, self.base_url)
+        prepare_cold_load(self.driver)
+        self.driver.get(self.base_url.rstrip('/') + path)
+        self.waits.react_root_mounted()
+        self.waits.until("web vitals settled", vitals_settled())
+        return collect_page_metrics(self.driver)
+
+    def measure_page(self, page):
+        """Measure a page, record it in the report and assert budgets and regressions"""
+        page_config = self.config['pages'][page]
+        for _ in range(self.warmup_runs):
+            self.load_once(page_config['path'])
+
+        samples = {}
+        started = time.perf_counter()
+        for _ in range(self.runs):
+            for metric, value in self.load_once(page_config['path']).items():
+                samples.setdefault(metric, []).append(value)
+        summary = {metric: summarize(values) for metric, values in samples.items()}
+
+        regression = self.config['regression']
+        budget_violations = check_budgets(summary, page_config['budgets'])
+        regressions = check_regressions(
+            samples, baseline_samples(self.trend, page, regression['baseline_reports']), regression)
+        self.report['pages'][page] = {
+            'path': page_config['path'],
+            'samples': samples,
+            'summary': summary,
+            'budget_violations': budget_violations,
+            'regressions': regressions,
+        }
+
+        print(f"\n{page} ({page_config['path']}) in {time.perf_counter() - started:.1f}s")
+        for metric in sorted(page_config['budgets']):
+            if metric in summary:
+                stats = summary[metric]
+                print(f"  {metric:24} median {stats['median']:>12.4g}  p75 {stats['p75']:>12.4g}"
+                      f"  budget {page_config['budgets'][metric]:>12.4g}")
+        problems = budget_violations + regressions
+        for problem in problems:
+            print(f"  ⚠ {problem}")
+        self.assertFalse(problems, f"{page} performance: " + "; ".join(problems))
+        print(f"  ✓ {page} within budget")
+
+    def test_01_home_performance(self):
+        """Landing page: showcase images and entrance animations"""
+        self.measure_page('home')
+
+    def test_02_result_performance(self):
+        """Result page"""
+        self.measure_page('result')
+
+    def test_03_pricing_performance(self):
+        """Pricing page"""
+        self.measure_page('pricing')
+
+
+if __name__ == '__main__':
+    result = unittest.main(argv=sys.argv[:1] + sys.argv[1:], exit=False, verbosity=2).result
+    sys.exit(0 if result.wasSuccessful() else 1)
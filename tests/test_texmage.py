@@ -11,24 +11,19 @@ Test Requirements:
 """
 
 import unittest
-import time
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.keys import Keys
 import random
+import re
 import string
+import zlib
 
-# Optional import for webdriver-manager
-try:
-    from webdriver_manager.chrome import ChromeDriverManager
-    WEBDRIVER_MANAGER_AVAILABLE = True
-except ImportError:
-    WEBDRIVER_MANAGER_AVAILABLE = False
+from driver_pool import get_process_pool, is_process_pool_managed, reset_driver
+from sessions import SessionError, apply_session, authenticated, get_session_store, is_authenticated_test
+from waits import WaitEngine, install_request_tracker
 
 
 class TexmageTestSuite(unittest.TestCase):
@@ -36,130 +31,62 @@ class TexmageTestSuite(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        """Set up Chrome WebDriver with headless configuration"""
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')  # Run in headless mode
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        # Initialize WebDriver with multiple fallback strategies
-        cls.driver = None
-        driver_initialized = False
-        
-        # Strategy 1: Try system ChromeDriver in PATH first (most reliable)
-        if not driver_initialized:
-            try:
-                print("Attempting to use system ChromeDriver...")
-                cls.driver = webdriver.Chrome(options=chrome_options)
-                driver_initialized = True
-                print("✓ ChromeDriver initialized using system PATH")
-            except Exception as e:
-                print(f"⚠ System ChromeDriver failed: {str(e)}")
-                print("Trying webdriver-manager...")
-        
-        # Strategy 2: Try webdriver-manager if system driver failed
-        if WEBDRIVER_MANAGER_AVAILABLE and not driver_initialized:
-            try:
-                print("Attempting to use webdriver-manager...")
-                import os
-                driver_path = ChromeDriverManager().install()
-                # Verify the file exists and is valid
-                if os.path.exists(driver_path):
-                    # On Windows, ensure it's .exe (webdriver-manager sometimes returns wrong file)
-                    if os.name == 'nt':
-                        # Check if it's actually the exe file
-                        if not driver_path.endswith('.exe') or 'THIRD_PARTY' in driver_path:
-                            # Find the actual chromedriver.exe in the directory
-                            dir_path = os.path.dirname(driver_path)
-                            # Look for chromedriver.exe in the directory
-                            possible_exe = os.path.join(dir_path, 'chromedriver.exe')
-                            if os.path.exists(possible_exe):
-                                driver_path = possible_exe
-                            else:
-                                # Search parent directory
-                                parent_dir = os.path.dirname(dir_path)
-                                possible_exe = os.path.join(parent_dir, 'chromedriver.exe')
-                                if os.path.exists(possible_exe):
-                                    driver_path = possible_exe
-                                else:
-                                    raise FileNotFoundError("chromedriver.exe not found in webdriver-manager directory")
-                    
-                    service = Service(driver_path)
-                    cls.driver = webdriver.Chrome(service=service, options=chrome_options)
-                    driver_initialized = True
-                    print("✓ ChromeDriver initialized using webdriver-manager")
-                else:
-                    raise FileNotFoundError(f"ChromeDriver not found at: {driver_path}")
-            except Exception as e:
-                print(f"⚠ webdriver-manager failed: {str(e)}")
-        
-        # Strategy 3: Try with explicit chromedriver path (common locations)
-        if not driver_initialized:
-            import os
-            possible_paths = [
-                os.path.join(os.getcwd(), 'chromedriver.exe'),
-                os.path.join(os.path.expanduser('~'), 'chromedriver.exe'),
-                'C:\\chromedriver\\chromedriver.exe',
-                'C:\\Program Files\\chromedriver\\chromedriver.exe',
-            ]
-            
-            for driver_path in possible_paths:
-                if os.path.exists(driver_path):
-                    try:
-                        print(f"Attempting to use ChromeDriver at: {driver_path}")
-                        service = Service(driver_path)
-                        cls.driver = webdriver.Chrome(service=service, options=chrome_options)
-                        driver_initialized = True
-                        print(f"✓ ChromeDriver initialized from: {driver_path}")
-                        break
-                    except Exception as e:
-                        print(f"⚠ Failed to use ChromeDriver at {driver_path}: {str(e)}")
-                        continue
-        
-        # If all strategies failed, raise an error with helpful message
-        if not driver_initialized or cls.driver is None:
-            error_msg = """
-            ============================================
-            ChromeDriver initialization failed!
-            ============================================
-            Please try one of the following solutions:
-            
-            1. Install ChromeDriver manually:
-               - Download from: https://chromedriver.chromium.org/
-               - Extract chromedriver.exe to a folder in your PATH
-               - Or place it in the tests directory
-            
-            2. Reinstall webdriver-manager:
-               pip install --upgrade webdriver-manager
-            
-            3. Ensure Chrome browser is installed and up to date
-            
-            4. Check if ChromeDriver version matches your Chrome version
-            ============================================
-            """
-            raise RuntimeError(error_msg)
-        
+        """Take a pre-warmed headless Chrome WebDriver from the process pool"""
+        cls.pool = get_process_pool()
+        cls.base_url = cls.pool.base_url
+        cls.driver = cls.pool.acquire()
         cls.wait = WebDriverWait(cls.driver, 10)
-        # Get base URL from environment variable or use default
-        import os
-        cls.base_url = os.getenv('BASE_URL', os.getenv('APP_URL', 'http://localhost:5173'))
+        cls.waits = WaitEngine(cls.driver)
+        cls.wait_timings = []
+        install_request_tracker(cls.driver)
         print(f"Testing application at: {cls.base_url}")
         
     @classmethod
     def tearDownClass(cls):
-        """Clean up: close the browser"""
+        """Clean up: hand the browser back, closing it unless a runner owns the pool"""
+        if cls.wait_timings:
+            total = sum(seconds for _, seconds, _ in cls.wait_timings)
+            slowest = sorted(cls.wait_timings, key=lambda timing: timing[1], reverse=True)[:5]
+            print(f"\n⏱ Total time spent waiting: {total:.2f}s across {len(cls.wait_timings)} waits")
+            print(WaitEngine.format_timings(slowest).replace("⏱ waits", "⏱ slowest waits"))
         if cls.driver:
-            cls.driver.quit()
+            cls.pool.release(cls.driver)
+            if not is_process_pool_managed():
+                cls.pool.close()
 
     def setUp(self):
-        """Set up before each test"""
+        """Set up before each test; @authenticated tests start logged in as a seeded user"""
+        reset_driver(self.driver, self.base_url)
+        self.waits.take_timings()
+        self.session = None
+        if is_authenticated_test(self):
+            try:
+                store = get_session_store()
+            except SessionError as error:
+                self.skipTest(f"API sessions unavailable: {error}")
+            # Spread tests over the seeded users so parallel workers rarely share one.
+            self.session = store.get(zlib.crc32(self._testMethodName.encode()))
+            apply_session(self.driver, self.base_url, self.session)
         self.driver.get(self.base_url)
-        time.sleep(2)  # Wait for page to load
+        self.waits.page_ready()
+
+    def tearDown(self):
+        """Report how long each wait in this test took"""
+        timings = self.waits.take_timings()
+        self.wait_timings.extend(timings)
+        print(WaitEngine.format_timings(timings))
+
+    def open_login_modal(self):
+        """Click the navbar Login button and wait for the modal to finish animating"""
+        login_btn = self.waits.clickable((By.XPATH, "//button[contains(text(), 'Login')]"), "login button clickable")
+        login_btn.click()
+        self.waits.login_modal_visible()
+
+    def switch_to_signup(self):
+        """Switch the open login modal to the Sign Up form"""
+        signup_link = self.waits.clickable((By.XPATH, "//span[contains(text(), 'Sign Up')]"), "sign up link clickable")
+        signup_link.click()
+        self.waits.visible((By.CSS_SELECTOR, "input[placeholder*='Full Name']"), "signup form visible")
 
     def generate_random_email(self):
         """Generate a random email for testing"""
@@ -202,7 +129,8 @@ class TexmageTestSuite(unittest.TestCase):
                 EC.element_to_be_clickable((By.XPATH, "//p[contains(text(), 'Pricing')]"))
             )
             pricing_link.click()
-            time.sleep(2)
+            self.waits.url_contains("pricing")
+            self.waits.present((By.XPATH, "//h1[contains(text(), 'Choose the plan')]"), "pricing page rendered")
             
             # Verify we're on pricing page
             current_url = self.driver.current_url
@@ -216,7 +144,7 @@ class TexmageTestSuite(unittest.TestCase):
         except TimeoutException:
             # If Pricing link not visible (user might be logged in), try direct navigation
             self.driver.get(f"{self.base_url}/pricing")
-            time.sleep(2)
+            self.waits.page_ready()
             plans_heading = self.driver.find_element(By.XPATH, "//h1[contains(text(), 'Choose the plan')]")
             self.assertIsNotNone(plans_heading, "Pricing plans heading should be visible")
             print("✓ Successfully navigated to pricing page (direct)")
@@ -227,11 +155,7 @@ class TexmageTestSuite(unittest.TestCase):
         print("\n[Test 3] Testing login modal opens...")
         
         # Find and click Login button
-        login_btn = self.wait.until(
-            EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Login')]"))
-        )
-        login_btn.click()
-        time.sleep(1)
+        self.open_login_modal()
         
         # Verify login modal is displayed
         login_modal = self.wait.until(
@@ -255,23 +179,14 @@ class TexmageTestSuite(unittest.TestCase):
         print("\n[Test 4] Testing signup form validation...")
         
         # Open login modal
-        login_btn = self.wait.until(
-            EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Login')]"))
-        )
-        login_btn.click()
-        time.sleep(1)
+        self.open_login_modal()
         
         # Switch to Sign Up
-        signup_link = self.wait.until(
-            EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'Sign Up')]"))
-        )
-        signup_link.click()
-        time.sleep(1)
+        self.switch_to_signup()
         
         # Try to submit empty form
         submit_btn = self.driver.find_element(By.XPATH, "//button[contains(text(), 'Create Account')]")
         submit_btn.click()
-        time.sleep(1)
         
         # Check if form validation prevents submission (HTML5 validation)
         email_input = self.driver.find_element(By.CSS_SELECTOR, "input[type='email']")
@@ -288,11 +203,7 @@ class TexmageTestSuite(unittest.TestCase):
         print("\n[Test 5] Testing login with invalid credentials...")
         
         # Open login modal
-        login_btn = self.wait.until(
-            EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Login')]"))
-        )
-        login_btn.click()
-        time.sleep(1)
+        self.open_login_modal()
         
         # Enter invalid credentials
         email_input = self.wait.until(
@@ -314,7 +225,7 @@ class TexmageTestSuite(unittest.TestCase):
             submit_btn.click()
         except Exception:
             self.driver.execute_script("arguments[0].click();", submit_btn)
-        time.sleep(3)  # Wait for API response
+        self.waits.no_pending_requests()  # Wait for API response
         
         # Check if error toast appears (login should fail)
         # The modal might still be open or error message displayed
@@ -330,18 +241,10 @@ class TexmageTestSuite(unittest.TestCase):
         print("\n[Test 6] Testing successful user signup...")
         
         # Open login modal
-        login_btn = self.wait.until(
-            EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Login')]"))
-        )
-        login_btn.click()
-        time.sleep(1)
+        self.open_login_modal()
         
         # Switch to Sign Up
-        signup_link = self.wait.until(
-            EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'Sign Up')]"))
-        )
-        signup_link.click()
-        time.sleep(1)
+        self.switch_to_signup()
         
         # Fill signup form with random data
         name_input = self.wait.until(
@@ -361,7 +264,7 @@ class TexmageTestSuite(unittest.TestCase):
         # Submit form
         submit_btn = self.driver.find_element(By.XPATH, "//button[contains(text(), 'Create Account')]")
         submit_btn.click()
-        time.sleep(4)  # Wait for API response and redirect
+        self.waits.no_pending_requests()  # Wait for API response and follow-up credits request
         
         # Verify successful signup - check if login modal is closed
         # and user is logged in (check for profile icon or user name)
@@ -383,7 +286,7 @@ class TexmageTestSuite(unittest.TestCase):
         
         # Try to navigate to result page directly
         self.driver.get(f"{self.base_url}/result")
-        time.sleep(2)
+        self.waits.page_ready()
         
         # If not logged in, should either show login modal or redirect
         # Check if login modal appears or if we're redirected
@@ -423,8 +326,7 @@ class TexmageTestSuite(unittest.TestCase):
         except NoSuchElementException:
             # Scroll to find element
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
-            magic_text = self.driver.find_element(By.XPATH, "//h1[contains(text(), 'See the magic')]")
+            magic_text = self.waits.present((By.XPATH, "//h1[contains(text(), 'See the magic')]"), "magic section rendered")
             self.assertIsNotNone(magic_text, "Magic section should be present")
         
         # Check for footer (it's a div, not footer tag)
@@ -445,7 +347,7 @@ class TexmageTestSuite(unittest.TestCase):
         
         # Navigate to pricing page
         self.driver.get(f"{self.base_url}/pricing")
-        time.sleep(2)
+        self.waits.page_ready()
         
         # Check for "Choose the plan" heading
         plans_heading = self.wait.until(
@@ -473,14 +375,15 @@ class TexmageTestSuite(unittest.TestCase):
         
         # Navigate to pricing page first
         self.driver.get(f"{self.base_url}/pricing")
-        time.sleep(2)
+        self.waits.page_ready()
         
         # Click on logo
         logo = self.wait.until(
             EC.element_to_be_clickable((By.CSS_SELECTOR, "img[alt*='Logo']"))
         )
         logo.click()
-        time.sleep(2)
+        self.waits.url_excludes("pricing")
+        self.waits.present((By.XPATH, "//h1[contains(text(), 'Turn text to')]"), "homepage rendered")
         
         # Verify we're on homepage
         current_url = self.driver.current_url
@@ -499,11 +402,7 @@ class TexmageTestSuite(unittest.TestCase):
         print("\n[Test 11] Testing login modal close functionality...")
         
         # Open login modal
-        login_btn = self.wait.until(
-            EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Login')]"))
-        )
-        login_btn.click()
-        time.sleep(1)
+        self.open_login_modal()
         
         # Verify modal is open
         login_modal = self.wait.until(
@@ -535,11 +434,10 @@ class TexmageTestSuite(unittest.TestCase):
         else:
             # Try clicking outside modal or using Escape key
             self.driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
-        time.sleep(1)
         
         # Verify modal is closed (element should not be visible)
         try:
-            self.wait.until(EC.invisibility_of_element_located((By.XPATH, "//h1[contains(text(), 'Log In')]")))
+            self.waits.login_modal_closed()
             print("✓ Login modal closed successfully")
         except TimeoutException:
             # Modal might still be in DOM but hidden
@@ -555,11 +453,10 @@ class TexmageTestSuite(unittest.TestCase):
             EC.presence_of_element_located((By.XPATH, "//button[contains(text(), 'Generate Images')]"))
         )
         self.driver.execute_script("arguments[0].scrollIntoView(true);", generate_btn)
-        time.sleep(1)
+        self.waits.settled((By.XPATH, "//button[contains(text(), 'Generate Images')]"), "generate button settled")
         
         # Click Generate Images button
         generate_btn.click()
-        time.sleep(2)
         
         # If not logged in, login modal should appear
         try:
@@ -576,6 +473,59 @@ class TexmageTestSuite(unittest.TestCase):
             else:
                 print("⚠ Generate button behavior verified")
 
+    # Test Case 13: Test Seeded Session Is Restored
+    @authenticated
+    def test_13_session_restored_from_storage(self):
+        """Test that a stored token and user log the visitor in with their credits shown"""
+        print("\n[Test 13] Testing logged-in navbar from a stored session...")
+
+        name = self.session['user']['name']
+        greeting = self.waits.visible((By.XPATH, f"//p[contains(text(), 'Hi, {name}')]"), "user greeting visible")
+        self.assertIsNotNone(greeting, "Navbar should greet the stored user")
+
+        credits_locator = (By.XPATH, "//p[contains(text(), 'Credits left')]")
+        credits = self.waits.until(
+            "credits loaded",
+            lambda driver: re.search(r"Credits left: \d+", driver.find_element(*credits_locator).text))
+        self.assertIsNotNone(credits, "Credit balance should be loaded from the API")
+        self.assertFalse(self.driver.find_elements(By.XPATH, "//button[contains(text(), 'Login')]"),
+                         "Login button should be hidden for a logged-in user")
+        print(f"✓ Logged in as {name} ({credits.group(0)})")
+
+    # Test Case 14: Test Generate Button for Logged-in User
+    @authenticated
+    def test_14_generate_button_opens_result_when_logged_in(self):
+        """Test that Generate Images takes a logged-in user straight to the result page"""
+        print("\n[Test 14] Testing Generate Images button while logged in...")
+
+        locator = (By.XPATH, "//button[contains(text(), 'Generate Images')]")
+        generate_btn = self.waits.present(locator, "generate button present")
+        self.driver.execute_script("arguments[0].scrollIntoView(true);", generate_btn)
+        self.waits.settled(locator, "generate button settled").click()
+
+        self.waits.url_contains("/result")
+        prompt_input = self.waits.visible(
+            (By.CSS_SELECTOR, "input[placeholder*='Describe what you want to generate']"), "prompt input visible")
+        self.assertIsNotNone(prompt_input, "Result page should offer the prompt input")
+        self.assertFalse(self.driver.find_elements(By.XPATH, "//h1[contains(text(), 'Log In')]"),
+                         "Login modal should not open for a logged-in user")
+        print("✓ Generate button navigates to result page for authenticated users")
+
+    # Test Case 15: Test Logout
+    @authenticated
+    def test_15_logout(self):
+        """Test that logging out clears the session and shows the Login button again"""
+        print("\n[Test 15] Testing logout...")
+
+        self.waits.clickable((By.CSS_SELECTOR, "img[src*='profile']"), "profile icon clickable").click()
+        self.waits.clickable((By.XPATH, "//button[contains(text(), 'Logout')]"), "logout button clickable").click()
+        self.waits.visible((By.XPATH, "//button[contains(text(), 'Login')]"), "login button visible")
+
+        stored = self.driver.execute_script(
+            "return [localStorage.getItem('token'), localStorage.getItem('user')];")
+        self.assertEqual(stored, [None, None], "Logout should clear the stored session")
+        print("✓ Logout clears the session")
+
 
 if __name__ == '__main__':
     # Create test suite
@@ -0,0 +1,213 @@
+"""
+Event-driven wait layer for the Texmage Selenium tests.
+
+Instead of pacing tests with fixed time.sleep() calls, tests wait for named
+readiness conditions built on WebDriverWait/expected_conditions. Every wait
+is timed so the suite can report where its time actually goes.
+
+"No pending requests" relies on a small script injected into every page
+before the app's own scripts run. It wraps fetch and XMLHttpRequest (which
+axios uses in the browser) and keeps a counter of in-flight requests. Route
+chunks loaded through dynamic import() are not counted, so page_ready also
+waits for the Suspense fallback to go away.
+"""
+
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+
+from test_config import EXPLICIT_WAIT
+
+# Locators shared by the named conditions
+REACT_ROOT = (By.ID, "root")
+LOGIN_MODAL_HEADING = (By.XPATH, "//form//h1[contains(text(), 'Log In') or contains(text(), 'Sign Up')]")
+LOGIN_MODAL_FORM = (By.XPATH, "//form[.//h1[contains(text(), 'Log In') or contains(text(), 'Sign Up')]]")
+TOAST = (By.CSS_SELECTOR, ".Toastify__toast")
+# Suspense fallback shown while a lazily loaded route's chunk downloads
+PAGE_LOADER = (By.CSS_SELECTOR, "[role='status'][aria-label='Loading']")
+
+REQUEST_TRACKER_SCRIPT = """
+(function () {
+    if (window.__texmagePendingRequests !== undefined) { return; }
+    window.__texmagePendingRequests = 0;
+    window.__texmageLastRequestAt = 0;
+
+    function started() {
+        window.__texmagePendingRequests += 1;
+        window.__texmageLastRequestAt = Date.now();
+    }
+    function finished() {
+        window.__texmagePendingRequests = Math.max(0, window.__texmagePendingRequests - 1);
+        window.__texmageLastRequestAt = Date.now();
+    }
+
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            started();
+            return originalFetch.apply(this, arguments).finally(finished);
+        };
+    }
+
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        started();
+        this.addEventListener('loadend', finished, {once: true});
+        return originalSend.apply(this, arguments);
+    };
+})();
+"""
+
+
+def install_request_tracker(driver):
+    """Inject the fetch/XHR counter into every new document (and the current one)"""
+    if getattr(driver, '_texmage_request_tracker', False):
+        return
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': REQUEST_TRACKER_SCRIPT})
+    except (AttributeError, WebDriverException):
+        # Not a Chromium driver; the current page still gets the tracker below.
+        pass
+    driver.execute_script(REQUEST_TRACKER_SCRIPT)
+    driver._texmage_request_tracker = True
+
+
+# --- Conditions -------------------------------------------------------------
+# Each condition is a callable taking the driver, in the same style as
+# selenium's expected_conditions; it returns a truthy value once satisfied.
+
+def react_root_mounted(driver):
+    """The React app has rendered something into #root"""
+    return driver.execute_script(
+        "var root = document.getElementById('root');"
+        "return document.readyState !== 'loading' && !!root && root.children.length > 0;")
+
+
+def route_rendered(driver):
+    """No route is still showing the PageLoader while its chunk downloads"""
+    return not driver.find_elements(*PAGE_LOADER)
+
+
+def no_pending_requests(idle_ms=100):
+    """No fetch/XHR is in flight and none has started or finished for idle_ms"""
+    def _predicate(driver):
+        return driver.execute_script(
+            "var pending = window.__texmagePendingRequests || 0;"
+            "var last = window.__texmageLastRequestAt || 0;"
+            "return pending === 0 && (Date.now() - last) >= arguments[0];", idle_ms)
+    return _predicate
+
+
+def element_settled(locator):
+    """The element is visible and its bounding box has stopped moving (entrance animations done)"""
+    last_rect = {}
+
+    def _predicate(driver):
+        try:
+            element = driver.find_element(*locator)
+            if not element.is_displayed():
+                return False
+            rect = element.rect
+        except (StaleElementReferenceException, WebDriverException):
+            return False
+        settled = last_rect.get('rect') == rect
+        last_rect['rect'] = rect
+        return element if settled else False
+    return _predicate
+
+
+def url_excludes(fragment):
+    """The current URL no longer contains fragment"""
+    return lambda driver: fragment not in driver.current_url
+
+
+class WaitEngine:
+    """
+    Named, timed waits for one driver.
+
+    Every call records (name, seconds, succeeded); report() summarises them.
+    """
+
+    def __init__(self, driver, timeout=EXPLICIT_WAIT, poll_frequency=0.05):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.timings = []
+
+    def until(self, name, condition, timeout=None, message=""):
+        """Wait until condition(driver) is truthy and record how long it took"""
+        wait = WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=self.poll_frequency)
+        started = time.perf_counter()
+        try:
+            result = wait.until(condition, message or f"Timed out waiting for: {name}")
+        except Exception:
+            self.timings.append((name, time.perf_counter() - started, False))
+            raise
+        self.timings.append((name, time.perf_counter() - started, True))
+        return result
+
+    # Named readiness conditions
+
+    def react_root_mounted(self):
+        return self.until("React root mounted", react_root_mounted)
+
+    def no_pending_requests(self, idle_ms=100):
+        return self.until("no pending axios requests", no_pending_requests(idle_ms))
+
+    def route_rendered(self):
+        return self.until("route rendered", route_rendered)
+
+    def page_ready(self):
+        """React has mounted, the route's chunk has rendered and the initial requests have settled"""
+        self.react_root_mounted()
+        # The page may request data as soon as it renders.
+        self.route_rendered()
+        return self.no_pending_requests()
+
+    def login_modal_visible(self):
+        """The login/signup modal is shown and its entrance animation has finished"""
+        self.until("login modal visible", EC.visibility_of_element_located(LOGIN_MODAL_HEADING))
+        return self.until("login modal settled", element_settled(LOGIN_MODAL_FORM))
+
+    def login_modal_closed(self, timeout=None):
+        return self.until("login modal closed", EC.invisibility_of_element_located(LOGIN_MODAL_HEADING), timeout)
+
+    def toast_shown(self, timeout=None):
+        return self.until("toast shown", EC.visibility_of_element_located(TOAST), timeout)
+
+    def url_contains(self, fragment):
+        return self.until(f"url contains '{fragment}'", EC.url_contains(fragment))
+
+    def url_excludes(self, fragment):
+        return self.until(f"url excludes '{fragment}'", url_excludes(fragment))
+
+    def present(self, locator, name=None):
+        return self.until(name or f"present {locator[1]}", EC.presence_of_element_located(locator))
+
+    def visible(self, locator, name=None):
+        return self.until(name or f"visible {locator[1]}", EC.visibility_of_element_located(locator))
+
+    def clickable(self, locator, name=None):
+        return self.until(name or f"clickable {locator[1]}", EC.element_to_be_clickable(locator))
+
+    def settled(self, locator, name=None):
+        return self.until(name or f"settled {locator[1]}", element_settled(locator))
+
+    # Reporting
+
+    def take_timings(self):
+        """Return the timings recorded since the last call and start a new batch"""
+        timings, self.timings = self.timings, []
+        return timings
+
+    @staticmethod
+    def format_timings(timings):
+        """Format recorded timings as a single report line"""
+        if not timings:
+            return "⏱ no waits"
+        parts = [f"{name} {seconds:.2f}s{'' if ok else ' (timeout)'}" for name, seconds, ok in timings]
+        total = sum(seconds for _, seconds, _ in timings)
+        return f"⏱ waits {total:.2f}s: " + ", ".join(parts)